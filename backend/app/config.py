@@ -15,13 +15,82 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./tickets.db")
     
+    # Database connection pool (per engine - the app runs a sync and an async engine)
+    DB_POOL_SIZE: int = 10  # Connections kept open
+    DB_MAX_OVERFLOW: int = 20  # Extra connections allowed under load, closed when returned
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Wait this long for a free connection before erroring
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this (-1 = never)
+    DB_POOL_PRE_PING: bool = True  # Test connections on checkout so dropped ones are replaced
+    
+    # SQLite pragmas (applied to every new connection; ignored for PostgreSQL)
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL lets readers run alongside the writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Safe with WAL, far fewer fsyncs than FULL
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Wait for the write lock instead of "database is locked"
+    SQLITE_CACHE_SIZE_KB: int = 65536  # Page cache per connection
+    SQLITE_MMAP_SIZE_BYTES: int = 268435456  # Memory-map up to this much of the file (0 = off)
+    
+    # Startup (the API scales to zero, so every cold start is user-facing)
+    DB_MIGRATE_ON_STARTUP: bool = True  # Run migrations.init_db() at startup (False = run `python -m app.migrations` as a deploy step)
+    DB_POOL_PREWARM_CONNECTIONS: int = 0  # Async pool connections opened in the background at startup
+    
+    # SQL instrumentation (see app/query_tracking.py)
+    SQL_SLOW_QUERY_MS: float = 250.0  # Log statements slower than this, parameters redacted (0 = off)
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 5  # Warn when one request runs the same statement this often - likely N+1 (0 = off)
+    SQL_QUERY_BUDGET_ENFORCE: bool = False  # Raise instead of logging when a request exceeds its route's query budget (tests)
+    
     # Azure Communication Services - Using Managed Identity
     ACS_ENDPOINT: Optional[str] = os.getenv("ACS_ENDPOINT")
     ACS_SENDER_EMAIL: Optional[str] = os.getenv("ACS_SENDER_EMAIL")
     
+    # Email dispatch
+    EMAIL_MAX_CONCURRENCY: int = 8  # ACS sends in flight at once per process
+    EMAIL_SEND_TIMEOUT_SECONDS: float = 30.0  # Give up on a single send after this long
+    EMAIL_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive ACS failures before failing fast
+    EMAIL_CIRCUIT_RESET_SECONDS: float = 30.0  # How long to fail fast before trying ACS again
+    EMAIL_TOKEN_REFRESH_MARGIN_SECONDS: float = 600.0  # Refresh the ACS access token this long before it expires
+    EMAIL_CLIENT_RETRY_SECONDS: float = 5.0  # Retry a failed client init / token refresh after this, doubled per failure
+    EMAIL_CLIENT_RETRY_MAX_SECONDS: float = 300.0  # Retry delay cap
+    
+    # Email outbox workers
+    EMAIL_OUTBOX_WORKERS: int = 2  # Worker tasks started with the API (0 = run them elsewhere)
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20  # Rows claimed per worker per round
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2.0  # Idle poll interval
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 6  # Give up (FAILED) after this many sends
+    EMAIL_OUTBOX_BACKOFF_SECONDS: float = 30.0  # First retry delay, doubled per attempt
+    EMAIL_OUTBOX_BACKOFF_MAX_SECONDS: float = 3600.0  # Retry delay cap
+    EMAIL_OUTBOX_LEASE_SECONDS: float = 300.0  # Claimed rows go back to the pool if not finished by then
+    
+    # Bulk email responses
+    BULK_EMAIL_MAX_RECIPIENTS: int = 50000  # Max tickets one bulk response may target
+    
+    # Bulk ticket import (/api/tickets/import)
+    TICKET_IMPORT_BATCH_SIZE: int = 2000  # Rows inserted and committed together
+    TICKET_IMPORT_MAX_ERRORS: int = 1000  # Row errors listed in the result (all are counted)
+    
+    # Ticket export (/api/tickets/export)
+    TICKET_EXPORT_BATCH_SIZE: int = 1000  # Rows fetched from the server-side cursor (and written) at a time
+    
+    # Bulk ticket updates (/api/tickets/bulk-update)
+    BULK_UPDATE_MAX_TICKETS: int = 5000  # Max tickets one bulk update may change
+    
+    # Ticket numbers ("TAX-2025-0001")
+    TICKET_NUMBER_PREFIX: str = "TAX"
+    TICKET_NUMBER_BLOCK_SIZE: int = 100  # Numbers each process reserves at a time (unused ones are skipped)
+    
     # Company branding
     COMPANY_NAME: str = os.getenv("COMPANY_NAME", "Wrangler Tax Services")
     
+    # Ticket change stream (/api/tickets/stream)
+    TICKET_STREAM_QUEUE_SIZE: int = 100  # Events buffered per subscriber before it is evicted
+    TICKET_STREAM_HEARTBEAT_SECONDS: float = 15.0  # Keep-alive interval for idle connections
+    
+    # Ticket payload cache (GET /api/tickets/{id})
+    TICKET_CACHE_MAX_ENTRIES: int = 2000  # Least recently used tickets are evicted beyond this
+    TICKET_CACHE_TTL_SECONDS: float = 60.0  # Entries expire after this long (0 = caching off)
+    
+    # Ticket count cache (/api/tickets/counts)
+    TICKET_COUNTS_RECONCILE_SECONDS: float = 60.0  # Re-count from the database this often (0 = never)
+    
     # API Configuration
     API_V1_STR: str = "/api"
     PROJECT_NAME: str = "Case Management System"
@@ -4,12 +4,37 @@ Database configuration and setup.
 This file sets up SQLAlchemy to work with PostgreSQL.
 SQLAlchemy is an ORM (Object-Relational Mapper) - it lets us work with 
 database tables as if they were Python objects.
+
+Two engines share the same database:
+- engine / SessionLocal: blocking, for scripts, migrations and tests
+- async_engine / AsyncSessionLocal: non-blocking (aiosqlite / asyncpg),
+  used by the API routes so database I/O never blocks the event loop
+
+Pool sizes and SQLite pragmas come from config.Settings (DB_POOL_*,
+SQLITE_*), and pool_stats() reports pool usage for monitoring. Pool
+checkouts, the time spent waiting for a connection and SQL statements
+are recorded in app.metrics.
+prewarm_pool() opens pool connections ahead of the first requests.
 """
 
+import asyncio
+import logging
 import os
-from sqlalchemy import create_engine
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from .config import settings
+from .metrics import POOL_CHECKOUTS, POOL_WAIT, SQL_STATEMENTS
+from .query_tracking import instrument_engine
+
+logger = logging.getLogger(__name__)
 
 # Get database URL from environment variable, fallback to SQLite for local dev
 SQLALCHEMY_DATABASE_URL = os.getenv(
@@ -17,22 +42,194 @@ SQLALCHEMY_DATABASE_URL = os.getenv(
     "sqlite:///./tickets.db"  # Fallback for local development
 )
 
+
+class _TimedCheckout:
+    """Pool mixin recording each checkout and how long getting the connection took"""
+    
+    metrics_engine = ""
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUTS.labels(self.metrics_engine).inc()
+            POOL_WAIT.labels(self.metrics_engine).observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool for the sync engine, with checkout metrics"""
+    metrics_engine = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool for the async engine, with checkout metrics"""
+    metrics_engine = "async"
+
+
+def _pool_args(url: str) -> Dict[str, Any]:
+    """
+    Connection pool settings for an engine.
+    
+    An in-memory SQLite database lives inside its one connection, so it
+    keeps SQLAlchemy's default single-connection pool.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Configure each new SQLite connection.
+    
+    WAL lets reads proceed while a write is in progress, and busy_timeout
+    makes a second writer wait for the lock instead of failing with
+    "database is locked". cache_size is negative to mean KiB, not pages.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size={-int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_BYTES)}")
+    finally:
+        cursor.close()
+
+
 # Create database engine
 # For SQLite, we need check_same_thread=False
 # For PostgreSQL, we don't need any special connect_args
 if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
     engine = create_engine(
         SQLALCHEMY_DATABASE_URL,
-        connect_args={"check_same_thread": False}
+        connect_args={"check_same_thread": False},
+        **_pool_args(SQLALCHEMY_DATABASE_URL)
     )
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
 else:
     # PostgreSQL doesn't need special connect_args
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, **_pool_args(SQLALCHEMY_DATABASE_URL))
 
 # SessionLocal: each instance is a database session
 # We'll use this to interact with the database
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url(url: str):
+    """
+    Derive the async driver URL and connect_args from DATABASE_URL.
+    
+    sqlite:// -> sqlite+aiosqlite://, postgresql:// -> postgresql+asyncpg://.
+    asyncpg doesn't understand libpq's ?sslmode=, so it's passed as ssl= instead.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite"), {}
+    
+    if backend == "postgresql":
+        connect_args = {}
+        if "sslmode" in parsed.query:
+            connect_args["ssl"] = parsed.query["sslmode"]
+            parsed = parsed.difference_update_query(["sslmode"])
+        return parsed.set(drivername="postgresql+asyncpg"), connect_args
+    
+    raise ValueError(f"No async driver configured for database backend '{backend}'")
+
+
+# Create async database engine (same database, non-blocking driver)
+ASYNC_DATABASE_URL, _async_connect_args = _async_database_url(SQLALCHEMY_DATABASE_URL)
+# aiosqlite defaults to NullPool (a new connection per session), so file
+# databases are given a real pool like the sync engine has
+_async_pool_args = _pool_args(SQLALCHEMY_DATABASE_URL)
+if _async_pool_args:
+    _async_pool_args["poolclass"] = TimedAsyncAdaptedQueuePool
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=_async_connect_args,
+    **_async_pool_args
+)
+if async_engine.dialect.name == "sqlite":
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+# Statement counts (per request, see query_tracking, and per engine)
+instrument_engine(engine, SQL_STATEMENTS.labels("sync").inc)
+instrument_engine(async_engine.sync_engine, SQL_STATEMENTS.labels("async").inc)
+
+# AsyncSessionLocal: async sessions for the API routes
+# expire_on_commit=False so attributes stay readable after commit without
+# an implicit (and, in async code, illegal) lazy reload
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
+def _pool_status(pool: Pool) -> Dict[str, Any]:
+    """Usage numbers for one connection pool"""
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    # Only QueuePool (and its async variant) tracks usage
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            # QueuePool counts overflow from -size until the pool is full
+            overflow=max(pool.overflow(), 0),
+        )
+    return status
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Connection pool usage of both engines, for monitoring"""
+    return {
+        "sync": _pool_status(engine.pool),
+        "async": _pool_status(async_engine.sync_engine.pool),
+    }
+
+
+async def prewarm_pool(connections: int, timeout: Optional[float] = None) -> int:
+    """
+    Open up to `connections` async pool connections and return them to the pool.
+    
+    Run in the background at startup, so the first requests after a cold
+    start find connections ready instead of each paying for a connect
+    (TCP, TLS and authentication on PostgreSQL). Connections are opened one
+    after another and held until all are open, so each is a separate
+    pooled connection. Gives up after `timeout` seconds (default
+    DB_POOL_TIMEOUT_SECONDS). Returns the number of connections opened.
+    """
+    pool = async_engine.sync_engine.pool
+    if isinstance(pool, QueuePool):
+        connections = min(connections, pool.size())
+    opened: List[AsyncConnection] = []
+
+    async def open_connections() -> None:
+        for _ in range(connections):
+            opened.append(await async_engine.connect().start())
+
+    try:
+        await asyncio.wait_for(open_connections(), timeout=timeout or settings.DB_POOL_TIMEOUT_SECONDS)
+        logger.info(f"Pre-warmed the database pool with {len(opened)} connections")
+    except Exception as e:
+        logger.warning(f"Pre-warming the database pool stopped after {len(opened)} of {connections} connections: {e!r}")
+    finally:
+        for conn in opened:
+            await conn.close()
+    return len(opened)
+
+
 # Base: all database models will inherit from this
 Base = declarative_base()
 
@@ -53,3 +250,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency function to get an async database session.
+    
+    Same as get_db, but every query is awaited so the event loop keeps
+    serving other requests while this one waits on the database.
+    
+    Usage in routes:
+        async def some_route(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Ticket))
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -2,24 +2,63 @@
 Backend API for Case Management System.
 This file creates the FastAPI app and sets up:
 - CORS (so Static Web App frontend can call this API)
-- Database initialization
+- Database initialization (at startup, or as a separate deploy step)
 - API routes
 - NO static file serving (frontend is on Static Web App)
+
+Importing this module does no I/O, so a cold start only pays for the
+imports. Schema migrations run in the lifespan unless
+DB_MIGRATE_ON_STARTUP is off (then run `python -m app.migrations` before
+starting the app), and DB_POOL_PREWARM_CONNECTIONS opens database
+connections in the background while the app starts serving.
+
+Measure cold start with `python -m benchmarks.bench_startup`.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
-from .database import engine, Base
-from .routes import tickets, email
+from .config import settings
+from .database import pool_stats, prewarm_pool
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, registry
+from .migrations import init_db
+from .routes import analytics, tickets, email
+from .services.email_outbox import email_outbox
+from .services.ticket_cache import ticket_cache
+from .services.ticket_counts import ticket_counter
+from .services.ticket_events import ticket_event_hub
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare the database, start background workers with the app and stop them on shutdown"""
+    if settings.DB_MIGRATE_ON_STARTUP:
+        # Create database tables (and add columns/indexes missing from older
+        # databases) - blocking DDL, so off the event loop
+        await asyncio.to_thread(init_db)
+    prewarm = None
+    if settings.DB_POOL_PREWARM_CONNECTIONS > 0:
+        prewarm = asyncio.create_task(prewarm_pool(settings.DB_POOL_PREWARM_CONNECTIONS))
+    await ticket_counter.start(settings.TICKET_COUNTS_RECONCILE_SECONDS)
+    if settings.EMAIL_OUTBOX_WORKERS > 0:
+        await email_outbox.start(settings.EMAIL_OUTBOX_WORKERS)
+    yield
+    if prewarm is not None:
+        prewarm.cancel()
+        await asyncio.gather(prewarm, return_exceptions=True)
+    await email_outbox.stop()
+    await ticket_counter.stop()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Case Management API",
     description="Backend API for managing support tickets and cases with email notifications",
-    version="2.1.0"  # Added Azure Communication Services
+    version="2.1.0",  # Added Azure Communication Services
+    lifespan=lifespan
 )
 
 # NOTE: 2025-10-28 Trigger rebuild to ensure azure-communication-email dependency is baked into image
@@ -36,8 +75,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Pagination cursor for GET /api/tickets/
 )
 
+# Per-route latency, in-flight requests and SQL statements per request (see metrics.py)
+app.add_middleware(MetricsMiddleware)
+
+
+def _pool_connections():
+    """Connections per engine by state, for the db_pool_connections gauge"""
+    values = {}
+    for engine_name, status in pool_stats().items():
+        for state in ("checked_out", "checked_in", "overflow"):
+            if state in status:
+                values[(engine_name, state)] = status[state]
+    return values
+
+
+registry.gauge(
+    "db_pool_connections", "Pooled connections by engine and state", ("engine", "state"),
+    callback=_pool_connections
+)
+registry.gauge(
+    "ticket_stream_subscribers", "Connected ticket change stream clients",
+    callback=lambda: {(): ticket_event_hub.subscriber_count}
+)
+registry.gauge(
+    "ticket_stream_queued_events", "Change events waiting in stream subscriber queues",
+    callback=lambda: {(): ticket_event_hub.queued_events}
+)
+EMAIL_OUTBOX_BACKLOG = registry.gauge("email_outbox_backlog", "Outbox emails waiting to be sent")
+
 # Root endpoint - shows API is running
 @app.get("/")
 def root():
@@ -60,8 +128,37 @@ def health_check():
     """
     return {"status": "ok"}
 
+# Database pool health - connections in use, idle and in overflow
+@app.get("/health/db")
+def database_health():
+    """
+    Connection pool statistics for the sync and async database engines.
+    """
+    return {"status": "ok", "pools": pool_stats()}
+
+# Ticket cache health - hit/miss/eviction counters
+@app.get("/health/cache")
+def cache_health():
+    """
+    Ticket payload cache counters (entries, hits, misses, evictions, expirations).
+    """
+    return {"status": "ok", "tickets": ticket_cache.stats()}
+
+# Prometheus metrics - scrape target for in-process latency and queue depths
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Metrics in the Prometheus text format.
+    """
+    # Read from the database, so refreshed per scrape rather than via a callback
+    EMAIL_OUTBOX_BACKLOG.set(await email_outbox.backlog())
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Include ticket routes
 app.include_router(tickets.router, prefix="/api/tickets", tags=["tickets"])
 
 # Include email routes
 app.include_router(email.router, prefix="/api", tags=["email"])
+
+# Include analytics routes
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
@@ -0,0 +1,307 @@
+"""
+In-process metrics in the Prometheus text format (GET /metrics).
+
+Azure Monitor only sees the container from outside; these show where
+the time goes inside it - per route, in the connection pool, in SQL and
+in ACS. No client library: counters, gauges and histograms are small
+classes here, and /metrics renders them on demand.
+
+Recording is cheap. Each labelled series is created once and then
+updated under its own lock (uncontended in practice - the API runs on
+one event loop), so there is no registry-wide lock on the hot path.
+Gauges that describe current state (pool usage, queue depths) are read
+by callbacks when /metrics is scraped rather than kept up to date.
+
+MetricsMiddleware records per-request latency by route template (e.g.
+/api/tickets/{ticket_id}, so IDs don't explode the label set), requests
+in flight and the number of SQL statements each request ran and the
+time they took, then hands the statements to query_tracking to check
+for N+1s and the route's query budget.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .query_tracking import report_queries, track_queries
+
+# Latency buckets in seconds (Prometheus client defaults)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# Statements per request
+STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    """A named metric with a fixed set of label names and one series per label values"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()  # Only taken when a new series is created
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """The series for these label values (created on first use)"""
+        key = tuple(str(value) for value in values)
+        series = self._series.get(key)
+        if series is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {key}")
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def _samples(self) -> Iterable[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count (names end in _total)"""
+
+    kind = "counter"
+
+    def _new_series(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled series"""
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for key, series in list(self._series.items()):
+            yield "", _format_labels(self.labelnames, key), series.value
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, set directly or read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def _new_series(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def _samples(self):
+        if self.callback is not None:
+            values = self.callback()
+        else:
+            values = {key: series.value for key, series in list(self._series.items())}
+        for key, value in values.items():
+            yield "", _format_labels(self.labelnames, key), value
+
+
+class _HistogramSeries:
+    __slots__ = ("bounds", "counts", "sum", "lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last one is +Inf
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)  # First bucket with value <= bound
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_series(self) -> _HistogramSeries:
+        return _HistogramSeries(self.bounds)
+
+    def observe(self, value: float) -> None:
+        """Observe into the unlabelled series"""
+        self.labels().observe(value)
+
+    def _samples(self):
+        for key, series in list(self._series.items()):
+            with series.lock:
+                counts, total = list(series.counts), series.sum
+            names = self.labelnames + ("le",)
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), counts):
+                cumulative += count
+                yield "_bucket", _format_labels(names, key + (_format_value(bound),)), cumulative
+            yield "_sum", _format_labels(self.labelnames, key), total
+            yield "_count", _format_labels(self.labelnames, key), cumulative
+
+
+class Registry:
+    """The metrics /metrics exposes"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback=None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and the application's metrics
+registry = Registry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+HTTP_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests being handled")
+HTTP_SQL_STATEMENTS = registry.histogram(
+    "http_request_sql_statements", "SQL statements executed per HTTP request", ("method", "route"),
+    buckets=STATEMENT_BUCKETS
+)
+HTTP_SQL_SECONDS = registry.histogram(
+    "http_request_sql_seconds", "Time spent executing SQL per HTTP request", ("method", "route")
+)
+SQL_STATEMENTS = registry.counter("db_statements_total", "SQL statements executed", ("engine",))
+POOL_CHECKOUTS = registry.counter("db_pool_checkouts_total", "Connections checked out of the pool", ("engine",))
+POOL_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection (including connecting)", ("engine",)
+)
+EMAIL_SENDS = registry.counter("email_sends_total", "Email sends by outcome", ("status",))
+EMAIL_LATENCY = registry.histogram("email_send_duration_seconds", "Email send latency by outcome", ("status",))
+EMAIL_SENDS_IN_FLIGHT = registry.gauge(
+    "email_sends_in_flight", "Email sends running or waiting for a thread of the send pool"
+)
+
+# Label for requests no route matched (keeps the label set bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, in-flight requests and SQL statements and time"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        with track_queries() as queries:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                HTTP_IN_FLIGHT.dec()
+                elapsed = time.perf_counter() - start
+                route = scope.get("route")
+                template = getattr(route, "path", None) or UNMATCHED_ROUTE
+                method = scope["method"]
+                HTTP_REQUESTS.labels(method, template, status).inc()
+                HTTP_LATENCY.labels(method, template).observe(elapsed)
+                HTTP_SQL_STATEMENTS.labels(method, template).observe(queries.statements)
+                HTTP_SQL_SECONDS.labels(method, template).observe(queries.seconds)
+            report_queries(queries, f"{method} {template}", scope.get("endpoint"))
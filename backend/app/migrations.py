@@ -0,0 +1,208 @@
+"""
+Schema setup and lightweight migrations.
+
+create_all() only creates missing tables - it never touches tables that
+already exist. This module brings an existing database up to date with
+the models: it creates missing tables, adds any model columns the
+tables don't have yet, creates missing indexes and drops indexes the
+models no longer use. create_all() also sets up the full-text search
+index (see search.py). Every step is idempotent, so it is safe to run on
+every startup.
+
+On PostgreSQL, indexes on existing tables are built and dropped with
+CREATE/DROP INDEX CONCURRENTLY, so the tables stay writable while a
+large index builds. A concurrent build that fails leaves an INVALID
+index behind; the next run drops and rebuilds it.
+
+Tickets created before ticket numbers existed are numbered (in ID order,
+per creation year) on the first run.
+
+Run manually with:
+    python -m app.migrations
+"""
+
+import logging
+from itertools import groupby
+
+from sqlalchemy import Index, bindparam, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+from .database import Base, engine
+from . import models  # noqa: F401 - registers the models on Base.metadata
+from . import search  # noqa: F401 - creates the search index with the tables
+from .config import settings
+from .models import Ticket
+from .services.ticket_numbers import format_ticket_number, reserve_statement
+
+logger = logging.getLogger(__name__)
+
+# Indexes created by earlier versions of the models and since replaced
+# (see the composite indexes in models.Ticket.__table_args__)
+OBSOLETE_INDEXES = {
+    "tickets": [
+        "ix_tickets_id", "ix_tickets_title", "ix_tickets_category", "ix_tickets_priority",
+        "ix_tickets_status", "ix_tickets_customer_name", "ix_tickets_customer_email",
+        "ix_tickets_customer_id", "ix_tickets_assigned_to", "ix_tickets_department",
+        "ix_tickets_created_at", "ix_tickets_updated_at",
+    ],
+    "ticket_tombstones": ["ix_ticket_tombstones_deleted_at"],
+    "ticket_responses": [
+        "ix_ticket_responses_id", "ix_ticket_responses_ticket_id", "ix_ticket_responses_email_status",
+    ],
+}
+
+
+def _add_missing_columns(bind: Engine) -> None:
+    """ALTER TABLE ... ADD COLUMN for model columns missing from existing tables"""
+    inspector = inspect(bind)
+    preparer = bind.dialect.identifier_preparer
+    ddl_compiler = bind.dialect.ddl_compiler(bind.dialect, None)
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+
+        for column in table.columns:
+            if column.name in existing:
+                continue
+
+            column_type = column.type.compile(dialect=bind.dialect)
+            ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column_type}"
+            default = ddl_compiler.get_column_default_string(column)
+            if default is not None:
+                ddl += f" DEFAULT {default}"
+
+            logger.info(f"Adding column {table.name}.{column.name}")
+            with bind.begin() as conn:
+                conn.execute(text(ddl))
+
+
+def _invalid_indexes(bind: Engine) -> set:
+    """Names of PostgreSQL indexes left INVALID by a failed concurrent build"""
+    with bind.connect() as conn:
+        return set(conn.execute(text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE NOT i.indisvalid"
+        )).scalars())
+
+
+def _execute_online(bind: Engine, ddl: str) -> None:
+    """Run DDL outside a transaction (required for CONCURRENTLY)"""
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(ddl))
+
+
+def _create_index_concurrently(bind: Engine, index: Index) -> None:
+    """CREATE INDEX CONCURRENTLY on PostgreSQL"""
+    options = index.dialect_options["postgresql"]
+    options["concurrently"] = True
+    try:
+        _execute_online(bind, str(CreateIndex(index).compile(dialect=bind.dialect)))
+    finally:
+        options["concurrently"] = False
+
+
+def _create_missing_indexes(bind: Engine) -> None:
+    """Create model indexes that don't exist yet (e.g. on newly added columns)"""
+    inspector = inspect(bind)
+    online = bind.dialect.name == "postgresql"
+    invalid = _invalid_indexes(bind) if online else set()
+    preparer = bind.dialect.identifier_preparer
+
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in invalid:
+                logger.warning(f"Rebuilding invalid index {index.name}")
+                _execute_online(bind, f"DROP INDEX CONCURRENTLY IF EXISTS {preparer.quote(index.name)}")
+            elif index.name in existing:
+                continue
+
+            logger.info(f"Creating index {index.name}")
+            if online:
+                _create_index_concurrently(bind, index)
+            else:
+                index.create(bind=bind)
+
+
+def _drop_obsolete_indexes(bind: Engine) -> None:
+    """Drop indexes the models no longer define (after their replacements exist)"""
+    inspector = inspect(bind)
+    online = bind.dialect.name == "postgresql"
+    preparer = bind.dialect.identifier_preparer
+
+    for table_name, index_names in OBSOLETE_INDEXES.items():
+        if not inspector.has_table(table_name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+        for name in index_names:
+            if name not in existing:
+                continue
+            logger.info(f"Dropping obsolete index {name}")
+            if online:
+                _execute_online(bind, f"DROP INDEX CONCURRENTLY IF EXISTS {preparer.quote(name)}")
+            else:
+                with bind.begin() as conn:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {preparer.quote(name)}"))
+
+
+def _backfill_ticket_numbers(bind: Engine, batch_size: int = 5000) -> None:
+    """
+    Number tickets created before ticket numbers were assigned.
+
+    Numbers are reserved from the same sequences the API uses, so they
+    never collide with numbers handed out by running processes.
+    """
+    prefix = settings.TICKET_NUMBER_PREFIX
+    numbered = 0
+    while True:
+        with bind.begin() as conn:
+            tickets = conn.execute(
+                select(Ticket.id, Ticket.created_at)
+                .where(Ticket.ticket_number.is_(None))
+                .order_by(Ticket.id)
+                .limit(batch_size)
+            ).all()
+        if not tickets:
+            break
+
+        values = []
+        by_year = groupby(sorted(tickets, key=lambda t: (t.created_at.year, t.id)), key=lambda t: t.created_at.year)
+        for year, group in by_year:
+            group = list(group)
+            with bind.begin() as conn:
+                next_value = conn.execute(reserve_statement(bind.dialect.name, prefix, year, len(group))).scalar_one()
+            first = next_value - len(group)
+            values.extend(
+                {"ticket_id": ticket.id, "number": format_ticket_number(prefix, year, first + offset)}
+                for offset, ticket in enumerate(group)
+            )
+
+        with bind.begin() as conn:
+            conn.execute(
+                update(Ticket.__table__)
+                .where(Ticket.__table__.c.id == bindparam("ticket_id"))
+                .values(ticket_number=bindparam("number")),
+                values
+            )
+        numbered += len(values)
+
+    if numbered:
+        logger.info(f"Assigned ticket numbers to {numbered} existing tickets")
+
+
+def init_db(bind: Engine = engine) -> None:
+    """Create missing tables, columns and indexes, drop obsolete indexes and number old tickets"""
+    Base.metadata.create_all(bind=bind)
+    _add_missing_columns(bind)
+    _create_missing_indexes(bind)
+    _drop_obsolete_indexes(bind)
+    _backfill_ticket_numbers(bind)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    logger.info("Database schema is up to date")
@@ -5,15 +5,26 @@ Enhanced Ticket model with comprehensive fields for analytics and case managemen
 Includes TicketResponse model for tracking email communications.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, Boolean, Text, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from datetime import datetime
+from datetime import datetime, timezone
 import enum
 
 from .database import Base
 
 
+def utcnow() -> datetime:
+    """
+    Timestamp default for sortable columns.
+
+    Set from Python rather than the server so SQLite stores the same
+    microsecond-precision format that bound parameters use - otherwise
+    keyset comparisons on created_at break for rows in the same second.
+    """
+    return datetime.now(timezone.utc)
+
+
 class TicketStatus(str, enum.Enum):
     """Ticket lifecycle status"""
     NEW = "new"
@@ -40,6 +51,12 @@ class EmailStatus(str, enum.Enum):
     DELIVERED = "delivered"  # Confirmed delivery (if tracking enabled)
 
 
+class EmailType(str, enum.Enum):
+    """Kind of email a TicketResponse row represents"""
+    RESPONSE = "response"  # Agent's reply to the customer
+    CONFIRMATION = "confirmation"  # Automatic "case received" email
+
+
 class Ticket(Base):
     """
     Enhanced Ticket/Case model for comprehensive case management.
@@ -51,32 +68,48 @@ class Ticket(Base):
     - Analytics data
     """
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Composite indexes matching the API's query shapes. Each one serves
+        # a filter + ORDER BY as an index scan (no sort), with id as the
+        # keyset tie-breaker. Single-column indexes on the other columns
+        # were dropped: no query used them and each one slowed writes.
+        # Ticket list, unfiltered: ORDER BY created_at DESC, id DESC
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        # Ticket list filtered by status
+        Index("ix_tickets_status_created_at_id", "status", "created_at", "id"),
+        # Ticket list filtered by category
+        Index("ix_tickets_category_created_at_id", "category", "created_at", "id"),
+        # Ticket list filtered by category and status
+        Index("ix_tickets_category_status_created_at_id", "category", "status", "created_at", "id"),
+        # Delta sync (/changes): ORDER BY updated_at, id
+        Index("ix_tickets_updated_at_id", "updated_at", "id"),
+    )
 
     # Primary Key
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     
     # Ticket Information
     ticket_number = Column(String, unique=True, index=True, nullable=True)  # e.g., "TAX-2025-0001"
-    title = Column(String, nullable=False, index=True)
+    title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    category = Column(String, nullable=False, index=True)  # income_tax, vat, deductions, etc.
-    priority = Column(String, default=TicketPriority.MEDIUM, nullable=False, index=True)
-    status = Column(String, default=TicketStatus.NEW, nullable=False, index=True)
+    category = Column(String, nullable=False)  # income_tax, vat, deductions, etc.
+    priority = Column(String, default=TicketPriority.MEDIUM, nullable=False)
+    status = Column(String, default=TicketStatus.NEW, nullable=False)
     
     # Customer Information
-    customer_name = Column(String, nullable=True, index=True)
-    customer_email = Column(String, nullable=True, index=True)
+    customer_name = Column(String, nullable=True)
+    customer_email = Column(String, nullable=True)
     customer_phone = Column(String, nullable=True)
-    customer_id = Column(String, nullable=True, index=True)  # External reference ID
+    customer_id = Column(String, nullable=True)  # External reference ID
     
     # Assignment & Ownership
-    assigned_to = Column(String, nullable=True, index=True)  # Employee name/ID
+    assigned_to = Column(String, nullable=True)  # Employee name/ID
     assigned_at = Column(DateTime(timezone=True), nullable=True)
-    department = Column(String, nullable=True, index=True)  # returns, compliance, general
+    department = Column(String, nullable=True)  # returns, compliance, general
     
     # Timeline & SLA Tracking
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, server_default=func.now())
     first_response_at = Column(DateTime(timezone=True), nullable=True)
     resolved_at = Column(DateTime(timezone=True), nullable=True)
     closed_at = Column(DateTime(timezone=True), nullable=True)
@@ -101,19 +134,152 @@ class Ticket(Base):
         return f"<Ticket {self.ticket_number or self.id}: {self.title} ({self.status})>"
 
 
+class TicketTombstone(Base):
+    """
+    Record of a deleted ticket.
+    
+    Tickets are hard-deleted, so delta-sync clients learn about deletions
+    from these rows instead.
+    """
+    __tablename__ = "ticket_tombstones"
+    __table_args__ = (
+        # Delta sync: ORDER BY deleted_at, id
+        Index("ix_ticket_tombstones_deleted_at_id", "deleted_at", "id"),
+    )
+
+    # Primary Key
+    id = Column(Integer, primary_key=True)
+    
+    # ID of the deleted ticket (no foreign key - the row is gone)
+    ticket_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        """String representation for debugging"""
+        return f"<TicketTombstone ticket #{self.ticket_id} deleted {self.deleted_at}>"
+
+
+class TicketNumberSequence(Base):
+    """
+    Next free ticket number per prefix and year.
+
+    API processes reserve numbers in blocks (services/ticket_numbers.py),
+    so this row is written once per block rather than once per ticket.
+    """
+    __tablename__ = "ticket_number_sequences"
+
+    prefix = Column(String, primary_key=True)  # e.g. "TAX"
+    year = Column(Integer, primary_key=True)
+    next_value = Column(BigInteger, nullable=False)  # First number not yet reserved
+
+    def __repr__(self):
+        """String representation for debugging"""
+        return f"<TicketNumberSequence {self.prefix}-{self.year}: next {self.next_value}>"
+
+
+class TicketDailyStats(Base):
+    """
+    Ticket analytics rolled up per creation day x category x department x priority.
+    
+    Maintained incrementally by services/analytics.py as tickets are
+    written, so analytics queries read a few rows per day instead of
+    scanning every ticket. Sums and counts only - averages are computed
+    when queried. A ticket without a department is counted under "".
+    """
+    __tablename__ = "ticket_daily_stats"
+
+    # Rollup key
+    day = Column(Date, primary_key=True)  # UTC day the tickets were created
+    category = Column(String, primary_key=True)
+    department = Column(String, primary_key=True)
+    priority = Column(String, primary_key=True)
+    
+    # Measures
+    tickets = Column(Integer, default=0, server_default="0", nullable=False)  # Tickets created
+    resolved = Column(Integer, default=0, server_default="0", nullable=False)  # Of which resolved/closed
+    escalated = Column(Integer, default=0, server_default="0", nullable=False)  # Of which escalated
+    responded = Column(Integer, default=0, server_default="0", nullable=False)  # Tickets with a response time
+    response_minutes = Column(BigInteger, default=0, server_default="0", nullable=False)  # Sum of response times
+    resolutions = Column(Integer, default=0, server_default="0", nullable=False)  # Tickets with a resolution time
+    resolution_minutes = Column(BigInteger, default=0, server_default="0", nullable=False)  # Sum of resolution times
+    rated = Column(Integer, default=0, server_default="0", nullable=False)  # Tickets with a satisfaction rating
+    rating_total = Column(Integer, default=0, server_default="0", nullable=False)  # Sum of ratings
+
+    def __repr__(self):
+        """String representation for debugging"""
+        return f"<TicketDailyStats {self.day} {self.category}/{self.department}/{self.priority}: {self.tickets}>"
+
+
+class TicketDailyHistogram(Base):
+    """
+    Response/resolution time histograms, keyed like TicketDailyStats.
+    
+    One row per (key, metric, bucket) holding the number of tickets whose
+    time falls in that bucket (bucket bounds in services/analytics.py).
+    Used to estimate percentiles without reading individual tickets.
+    """
+    __tablename__ = "ticket_daily_histograms"
+
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+    department = Column(String, primary_key=True)
+    priority = Column(String, primary_key=True)
+    metric = Column(String, primary_key=True)  # "response" or "resolution"
+    bucket = Column(Integer, primary_key=True)  # Index into the bucket bounds
+    
+    count = Column(Integer, default=0, server_default="0", nullable=False)
+
+    def __repr__(self):
+        """String representation for debugging"""
+        return f"<TicketDailyHistogram {self.day} {self.metric}[{self.bucket}]: {self.count}>"
+
+
+class EmailJob(Base):
+    """
+    A bulk email send (one templated response to many tickets).
+    
+    The individual emails are TicketResponse rows pointing back here;
+    progress is counted from their email_status.
+    """
+    __tablename__ = "email_jobs"
+
+    # Primary Key
+    id = Column(Integer, primary_key=True)
+    
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)
+    sent_by = Column(String, nullable=True)  # Employee name/ID who started the job
+    template = Column(Text, nullable=False)  # Response text template
+    total = Column(Integer, default=0, nullable=False)  # Emails queued
+    skipped = Column(Integer, default=0, nullable=False)  # Matched tickets without a customer email
+
+    def __repr__(self):
+        """String representation for debugging"""
+        return f"<EmailJob {self.id}: {self.total} emails>"
+
+
 class TicketResponse(Base):
     """
     Track all email responses sent to customers for tickets.
     
     Provides audit trail and communication history.
+    
+    Also serves as the email outbox: rows are written in PENDING state in
+    the same transaction as the change that triggers them, and the outbox
+    workers (services/email_outbox.py) send them and record the outcome.
     """
     __tablename__ = "ticket_responses"
+    __table_args__ = (
+        # Outbox claim query: pending rows that are due
+        Index("ix_ticket_responses_outbox", "email_status", "next_attempt_at"),
+        # A ticket's responses, newest first (also serves the foreign key)
+        Index("ix_ticket_responses_ticket_id_created_at_id", "ticket_id", "created_at", "id"),
+    )
 
     # Primary Key
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     
     # Foreign Key to Ticket
-    ticket_id = Column(Integer, ForeignKey('tickets.id', ondelete='CASCADE'), nullable=False, index=True)
+    ticket_id = Column(Integer, ForeignKey('tickets.id', ondelete='CASCADE'), nullable=False)
     
     # Email Details
     subject = Column(String, nullable=False)
@@ -121,17 +287,24 @@ class TicketResponse(Base):
     sent_to = Column(String, nullable=False, index=True)  # Customer email
     sent_by = Column(String, nullable=True)  # Employee name/ID who sent it
     
-    # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Timestamps (created_at set from Python - it's a keyset pagination column, see utcnow)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)
     sent_at = Column(DateTime(timezone=True), nullable=True)  # When email was actually sent
     
     # Status & Error Tracking
-    email_status = Column(String, default=EmailStatus.PENDING, nullable=False, index=True)
+    email_status = Column(String, default=EmailStatus.PENDING, nullable=False)
     error_message = Column(Text, nullable=True)  # Store error if sending failed
     
     # Azure Communication Services metadata
     message_id = Column(String, nullable=True)  # ACS message ID for tracking
     
+    # Outbox delivery state
+    email_type = Column(String, default=EmailType.RESPONSE, server_default=EmailType.RESPONSE.value, nullable=False)
+    template_data = Column(JSON, nullable=True)  # Values for rendering the email body (names, title, ...)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)  # Send attempts so far
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)  # Not claimable before this (retry backoff / claim lease)
+    job_id = Column(Integer, ForeignKey('email_jobs.id', ondelete='SET NULL'), nullable=True, index=True)  # Bulk send this belongs to
+    
     # Relationship to ticket
     ticket = relationship("Ticket", back_populates="responses")
 
@@ -0,0 +1,76 @@
+"""
+Cursor helpers for keyset pagination.
+
+A cursor is an opaque, URL-safe token that encodes the sort key of the
+last row on a page. The next page starts strictly after that key, so the
+database can seek straight to it through an index instead of counting
+past OFFSET rows - page cost stays the same no matter how deep you go.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+
+def _encode(value: Any) -> str:
+    """JSON-encode a value and wrap it in unpadded URL-safe base64"""
+    payload = json.dumps(value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(token: str) -> Any:
+    """Reverse _encode"""
+    padded = token + "=" * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) sort key as an opaque cursor string"""
+    return _encode([created_at.isoformat(), row_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises ValueError if the cursor is malformed, so routes can turn it
+    into a 400 response.
+    """
+    try:
+        created_at, row_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def encode_sync_token(
+    ticket_position: Tuple[datetime, int],
+    tombstone_position: Tuple[datetime, int]
+) -> str:
+    """
+    Encode a delta-sync watermark.
+
+    Holds two keyset positions: the last (updated_at, id) seen in the
+    tickets table and the last (deleted_at, id) seen in the tombstones.
+    """
+    return _encode([
+        [ticket_position[0].isoformat(), ticket_position[1]],
+        [tombstone_position[0].isoformat(), tombstone_position[1]],
+    ])
+
+
+def decode_sync_token(token: str) -> Tuple[Tuple[datetime, int], Tuple[datetime, int]]:
+    """
+    Decode a watermark produced by encode_sync_token.
+
+    Raises ValueError if the token is malformed.
+    """
+    try:
+        (ticket_at, ticket_id), (tombstone_at, tombstone_id) = _decode(token)
+        return (
+            (datetime.fromisoformat(ticket_at), int(ticket_id)),
+            (datetime.fromisoformat(tombstone_at), int(tombstone_id)),
+        )
+    except Exception as e:
+        raise ValueError(f"Invalid sync token: {token!r}") from e
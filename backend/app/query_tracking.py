@@ -0,0 +1,182 @@
+"""
+Per-request SQL instrumentation.
+
+track_queries() opens a scope (one per HTTP request, see
+metrics.MetricsMiddleware) and the engine listeners installed by
+instrument_engine() record every statement executed inside it: the
+count, the total time spent in the database and how often each
+statement shape ran. The scope lives in a context variable, so
+concurrent requests on the event loop each see only their own
+statements - including those run on the async engine, whose greenlets
+inherit the request's context.
+
+On top of that:
+- Statements slower than SQL_SLOW_QUERY_MS are logged, with their bind
+  parameters redacted (types only - tickets hold customer data).
+- report_queries() warns when one request ran the same statement shape
+  SQL_REPEATED_STATEMENT_THRESHOLD times or more - the signature of an
+  N+1 (a lazy load or a query per row in a loop).
+- Routes declare how many statements they may run with @query_budget(n).
+  Going over is logged, or raises QueryBudgetExceeded when
+  SQL_QUERY_BUDGET_ENFORCE is set (the test suite does), so a change
+  that adds queries to a hot route fails the tests.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Attribute @query_budget sets on a route's endpoint function
+BUDGET_ATTRIBUTE = "__query_budget__"
+
+# Expanded IN lists / multi-row VALUES: "(?, ?, ?)" -> "(?)", for any paramstyle
+_PARAMETER_LIST = re.compile(r"\(\s*(?:\?|\$\d+|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|\$\d+|%s|%\(\w+\)s|:\w+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Slow-query log lines show at most this much of the statement
+MAX_LOGGED_STATEMENT = 1000
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more statements than its route's query budget"""
+
+
+class QueryStats:
+    """Statements executed within one track_queries() scope"""
+
+    __slots__ = ("statements", "seconds", "shapes")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0  # Time spent executing them
+        self.shapes: Counter = Counter()  # Statement shape -> executions
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Record the statements executed in this context until the block exits"""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """The innermost active scope's stats (None outside track_queries())"""
+    return _current.get()
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace normalized and expanded parameter lists collapsed"""
+    return _PARAMETER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def _redact_value(value: Any) -> str:
+    return "NULL" if value is None else f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> str:
+    """Bind parameters with every value replaced by its type"""
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {_redact_value(value)}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(_redact_value(value) for value in parameters) + ")"
+    return _redact_value(parameters)
+
+
+def query_budget(statements: int) -> Callable[[F], F]:
+    """
+    Declare the most SQL statements one request to this route may run.
+
+    Apply below the router decorator:
+
+        @router.get("/{ticket_id}")
+        @query_budget(1)
+        async def get_ticket(...): ...
+    """
+    def decorate(endpoint: F) -> F:
+        setattr(endpoint, BUDGET_ATTRIBUTE, statements)
+        return endpoint
+    return decorate
+
+
+def report_queries(stats: QueryStats, label: str, endpoint: Optional[Callable] = None) -> None:
+    """
+    Check a finished request's statements: warn about likely N+1s and
+    enforce the endpoint's query budget.
+
+    Raises:
+        QueryBudgetExceeded: Over budget and SQL_QUERY_BUDGET_ENFORCE is set
+    """
+    threshold = settings.SQL_REPEATED_STATEMENT_THRESHOLD
+    if threshold > 0:
+        for shape, count in stats.repeated(threshold):
+            logger.warning(f"{label} ran the same statement {count} times (N+1?): {shape[:MAX_LOGGED_STATEMENT]}")
+
+    budget = getattr(endpoint, BUDGET_ATTRIBUTE, None)
+    if budget is None or stats.statements <= budget:
+        return
+    message = f"{label} ran {stats.statements} SQL statements, over its budget of {budget}"
+    if settings.SQL_QUERY_BUDGET_ENFORCE:
+        shapes = "\n".join(f"  {count}x {shape}" for shape, count in stats.shapes.most_common())
+        raise QueryBudgetExceeded(f"{message}:\n{shapes}")
+    logger.warning(message)
+
+
+def instrument_engine(engine: Engine, on_statement: Optional[Callable[[], None]] = None) -> None:
+    """
+    Record statements on `engine` (for the async engine, pass its sync_engine).
+
+    on_statement is called for every statement, tracked or not.
+    """
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_tracking_start = time.perf_counter()
+        stats = _current.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.shapes[statement_shape(statement)] += 1
+        if on_statement is not None:
+            on_statement()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_tracking_start", None)
+        elapsed = time.perf_counter() - start if start is not None else 0.0
+
+        stats = _current.get()
+        if stats is not None:
+            stats.seconds += elapsed
+
+        slow_ms = settings.SQL_SLOW_QUERY_MS
+        if slow_ms > 0 and elapsed * 1000 >= slow_ms:
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.0f} ms): {statement_shape(statement)[:MAX_LOGGED_STATEMENT]} "
+                f"parameters={redact_parameters(parameters, executemany)}"
+            )
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
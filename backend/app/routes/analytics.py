@@ -0,0 +1,61 @@
+"""
+Analytics routes - aggregated ticket metrics for dashboards and Power BI.
+
+Served from the rollup tables (services/analytics.py), so the cost of a
+query depends on the date range and grouping, not the number of tickets.
+"""
+
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db
+from ..schemas import AnalyticsGroup, AnalyticsResponse
+from ..services.analytics import DIMENSIONS, query_analytics
+
+router = APIRouter()
+
+
+@router.get("", response_model=AnalyticsResponse)
+async def get_analytics(
+    group_by: List[str] = Query([], description="Dimensions to group by: day, category, department, priority"),
+    date_from: Optional[date] = Query(None, description="First creation day to include (UTC)"),
+    date_to: Optional[date] = Query(None, description="Last creation day to include (UTC)"),
+    category: Optional[str] = Query(None, description="Only this category"),
+    department: Optional[str] = Query(None, description="Only this department"),
+    priority: Optional[str] = Query(None, description="Only this priority"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Counts, averages and percentiles for tickets created in a date range.
+    
+    Query parameters:
+    - group_by: Repeat to group by several dimensions
+      (e.g. ?group_by=day&group_by=category). Omit for one overall total.
+    - date_from / date_to: Inclusive creation-day range
+    - category, department, priority: Filters
+    
+    Example: GET /analytics?group_by=category&date_from=2025-01-01
+    """
+    unknown = [name for name in group_by if name not in DIMENSIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown group_by dimension(s): {', '.join(unknown)}. Available: {', '.join(DIMENSIONS)}"
+        )
+    
+    filters = {
+        field: value
+        for field, value in (("category", category), ("department", department), ("priority", priority))
+        if value is not None
+    }
+    groups = await query_analytics(
+        db,
+        group_by=list(dict.fromkeys(group_by)),
+        date_from=date_from,
+        date_to=date_to,
+        filters=filters,
+    )
+    return AnalyticsResponse(groups=[AnalyticsGroup(**group) for group in groups])
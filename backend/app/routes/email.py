@@ -4,15 +4,23 @@ Email routes - API endpoints for sending email responses to customers.
 Handles ticket response emails and tracks communication history.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 import logging
 
-from ..database import get_db
-from ..models import Ticket, TicketResponse, EmailStatus
-from ..schemas import EmailResponseCreate, EmailResponseResponse
+from ..database import get_async_db
+from ..models import EmailJob
+from ..pagination import decode_cursor
+from ..query_tracking import query_budget
+from ..schemas import EmailResponseCreate, EmailResponseResponse, BulkResponseCreate, EmailJobResponse
+from ..services.bulk_email import create_bulk_response_job, get_job_progress
 from ..services.email_service import get_email_service, EmailService
+from ..services.email_outbox import EmailOutbox, enqueue_response, get_email_outbox
+from ..services.ticket_cache import TicketCache, get_ticket_cache
+from ..services.ticket_detail import MAX_RESPONSE_PAGE_SIZE, load_ticket_detail
+from ..services.ticket_events import TicketEventHub, get_ticket_event_hub, TICKET_RESPONDED
+from .tickets import NEXT_CURSOR_HEADER
 
 logger = logging.getLogger(__name__)
 
@@ -24,13 +32,17 @@ router = APIRouter()
     response_model=EmailResponseResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Send email response to customer",
-    description="Sends an email response to the customer and saves it to the database"
+    description="Saves the response and queues it for delivery; email_status moves from pending to sent/failed"
 )
+@query_budget(3)
 async def send_ticket_response(
     ticket_id: int,
     response_data: EmailResponseCreate,
-    db: Session = Depends(get_db),
-    email_service: EmailService = Depends(get_email_service)
+    db: AsyncSession = Depends(get_async_db),
+    email_service: EmailService = Depends(get_email_service),
+    outbox: EmailOutbox = Depends(get_email_outbox),
+    hub: TicketEventHub = Depends(get_ticket_event_hub),
+    cache: TicketCache = Depends(get_ticket_cache)
 ):
     """
     Send an email response to a customer about their ticket.
@@ -42,12 +54,13 @@ async def send_ticket_response(
     - **ticket_title**: Title of the ticket
     - **sent_by**: Optional name of employee sending the response
     
-    Returns the created response record with email status.
+    Returns the created response record in pending state. The email is
+    sent by the outbox workers; poll GET /tickets/{id}/responses or listen
+    on /tickets/stream for the final status.
     """
     
     # 1. Verify ticket exists
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not ticket:
+    if await cache.get(db, ticket_id) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Ticket with id {ticket_id} not found"
@@ -60,98 +73,136 @@ async def send_ticket_response(
             detail="Email service is not configured. Please configure ACS_CONNECTION_STRING and ACS_SENDER_EMAIL."
         )
     
-    # 3. Create response record in database (pending state)
-    db_response = TicketResponse(
+    # 3. Write the response record to the outbox (pending state)
+    db_response = enqueue_response(
+        db,
         ticket_id=ticket_id,
         subject=f"{email_service.company_name} - Response to: {response_data.ticket_title}",
         response_text=response_data.response,
-        sent_to=response_data.customer_email,
-        sent_by=response_data.sent_by,
-        email_status=EmailStatus.PENDING
+        customer_email=response_data.customer_email,
+        customer_name=response_data.customer_name,
+        ticket_title=response_data.ticket_title,
+        sent_by=response_data.sent_by
     )
-    db.add(db_response)
-    db.commit()
-    db.refresh(db_response)
+    await db.commit()
+    await db.refresh(db_response)
     
-    # 4. Send email via Azure Communication Services
-    try:
-        email_status, message_id, error_message = await email_service.send_ticket_response(
-            ticket_id=ticket_id,
-            ticket_title=response_data.ticket_title,
-            customer_email=response_data.customer_email,
-            customer_name=response_data.customer_name,
-            response_text=response_data.response,
-            sent_by=response_data.sent_by
+    # 4. Let the outbox workers pick it up right away
+    outbox.notify()
+    hub.publish(TICKET_RESPONDED, ticket_id, response_id=db_response.id, email_status=db_response.email_status)
+    
+    logger.info(f"Email response queued for ticket #{ticket_id} (response #{db_response.id})")
+    
+    return db_response
+
+
+@router.post(
+    "/tickets/bulk-respond",
+    response_model=EmailJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Send a templated response to many tickets",
+    description="Queues one rendered email per targeted ticket and returns a job handle for tracking progress"
+)
+async def bulk_respond(
+    request: BulkResponseCreate,
+    db: AsyncSession = Depends(get_async_db),
+    email_service: EmailService = Depends(get_email_service),
+    outbox: EmailOutbox = Depends(get_email_outbox)
+):
+    """
+    Send the same (templated) response to many tickets in one call.
+    
+    - **ticket_ids**, **filter** or **all**: Which tickets to respond to
+      (a filter must set at least one field; `all: true` targets every ticket)
+    - **template**: Response text; may use {customer_name}, {ticket_id},
+      {ticket_number}, {ticket_title} and {category}
+    - **subject**: Optional subject template
+    - **sent_by**: Optional name of employee sending the response
+    
+    All emails are queued in one transaction and delivered by the outbox
+    workers. Poll GET /email-jobs/{id} for progress.
+    """
+    if not email_service.is_configured():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Email service is not configured. Please configure ACS_CONNECTION_STRING and ACS_SENDER_EMAIL."
         )
-        
-        # 5. Update response record with result
-        db_response.email_status = email_status
-        db_response.message_id = message_id
-        db_response.error_message = error_message
-        
-        if email_status == EmailStatus.SENT:
-            db_response.sent_at = datetime.utcnow()
-            
-            # Update ticket's first_response_at if this is the first response
-            if ticket.first_response_at is None:
-                ticket.first_response_at = datetime.utcnow()
-                
-                # Calculate response time if possible
-                if ticket.created_at:
-                    delta = datetime.utcnow() - ticket.created_at.replace(tzinfo=None)
-                    ticket.response_time_minutes = int(delta.total_seconds() / 60)
-        
-        db.commit()
-        db.refresh(db_response)
-        
-        logger.info(f"Email response sent for ticket #{ticket_id}, status: {email_status}")
-        
-        return db_response
-    
-    except Exception as e:
-        # Update record with error
-        db_response.email_status = EmailStatus.FAILED
-        db_response.error_message = str(e)
-        db.commit()
-        db.refresh(db_response)
-        
-        logger.error(f"Failed to send email for ticket #{ticket_id}: {str(e)}")
-        
+    
+    try:
+        job = await create_bulk_response_job(db, request, email_service.company_name)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    
+    outbox.notify()
+    
+    return await get_job_progress(db, job)
+
+
+@router.get(
+    "/email-jobs/{job_id}",
+    response_model=EmailJobResponse,
+    summary="Get bulk email job progress",
+    description="Returns how many of a bulk job's emails are pending, sent and failed"
+)
+async def get_email_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get progress counters for a bulk email job.
+    
+    - **job_id**: ID returned by POST /tickets/bulk-respond
+    """
+    job = await db.get(EmailJob, job_id)
+    if not job:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to send email: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Email job with id {job_id} not found"
         )
+    
+    return await get_job_progress(db, job)
 
 
 @router.get(
     "/tickets/{ticket_id}/responses",
     response_model=list[EmailResponseResponse],
-    summary="Get all responses for a ticket",
-    description="Retrieves all email responses sent for a specific ticket"
+    summary="Get responses for a ticket",
+    description="Retrieves the email responses for a ticket, newest first, optionally a page at a time"
 )
-def get_ticket_responses(
+@query_budget(1)
+async def get_ticket_responses(
     ticket_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_RESPONSE_PAGE_SIZE, description="Page size (default: all)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header or responses_next_cursor from /detail"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get all email responses for a ticket.
+    Get the email responses for a ticket, newest first.
     
     - **ticket_id**: ID of the ticket
+    - **limit**: Page size; without it all responses are returned
+    - **cursor**: Continue after the previous page
     
-    Returns list of all responses sent for this ticket.
+    The existence check and the responses are one query (see
+    services/ticket_detail.py). The X-Next-Cursor response header is set
+    when older responses remain.
     """
+    position = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    # Verify ticket exists
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not ticket:
+    detail = await load_ticket_detail(db, ticket_id, after=position, limit=limit)
+    if detail is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Ticket with id {ticket_id} not found"
         )
     
-    # Get all responses for this ticket
-    responses = db.query(TicketResponse).filter(
-        TicketResponse.ticket_id == ticket_id
-    ).order_by(TicketResponse.created_at.desc()).all()
-    
+    _, responses, next_cursor = detail
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return responses
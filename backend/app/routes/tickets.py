@@ -2,75 +2,437 @@
 API route handlers for ticket operations.
 
 This file contains all the endpoints for managing tickets:
-- GET /tickets - List all tickets (with optional filtering)
+- GET /tickets - List tickets (with optional filtering, cursor-paginated)
+- GET /tickets/changes - Delta sync (tickets changed/deleted since a watermark)
+- GET /tickets/stream - Server-Sent Events stream of ticket changes
+- GET /tickets/counts - Ticket counts per status
+- GET /tickets/search - Full-text search
 - GET /tickets/{id} - Get single ticket
+- GET /tickets/{id}/detail - Ticket with a page of its responses
 - POST /tickets - Create new ticket
 - PUT /tickets/{id} - Update ticket
 - DELETE /tickets/{id} - Delete ticket
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+import asyncio
+import json
 import logging
 
-from ..database import get_db
-from ..models import Ticket, TicketStatus
-from ..schemas import TicketCreate, TicketUpdate, TicketResponse
-from ..services.email_service import get_email_service
+from ..database import get_async_db
+from ..models import Ticket, TicketStatus, TicketTombstone
+from ..query_tracking import query_budget
+from ..pagination import encode_cursor, decode_cursor, encode_sync_token, decode_sync_token
+from ..config import settings
+from ..schemas import (
+    TicketCreate, TicketUpdate, TicketResponse, TicketChanges, TicketCountGroup, TicketCounts, TicketDetail,
+    EmailResponseResponse,
+    TicketBulkUpdate, TicketBulkUpdateResult, TicketImportResult, TicketSearchHit, TicketSearchResults,
+)
+from ..search import search_tickets
+from ..serialization import TICKET_COLUMNS, FastJSONResponse, ticket_dicts
+from ..services.analytics import apply_ticket_change, ticket_facts
+from ..services.bulk_update import bulk_update_tickets
+from ..services.ticket_cache import TicketCache, get_ticket_cache
+from ..services.ticket_counts import TicketCounter, get_ticket_counter, ticket_count_key
+from ..services.ticket_detail import DEFAULT_RESPONSE_PAGE_SIZE, MAX_RESPONSE_PAGE_SIZE, load_ticket_detail
+from ..services.ticket_export import MEDIA_TYPES as EXPORT_MEDIA_TYPES, export_tickets
+from ..services.ticket_import import format_for_content_type, import_tickets, parse_rows
+from ..services.ticket_numbers import TicketNumberAllocator, get_ticket_number_allocator
+from ..services.email_service import EmailService, get_email_service
+from ..services.email_outbox import EmailOutbox, enqueue_confirmation, get_email_outbox
+from ..services.ticket_events import (
+    TicketEventHub, get_ticket_event_hub, SUBSCRIBER_EVICTED,
+    TICKET_CREATED, TICKET_UPDATED, TICKET_DELETED,
+)
 
 # Create router - this groups related endpoints
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Page size bounds for list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Delta-sync watermarks are held back this far behind "now" once a client
+# has caught up. Writes that commit slightly out of timestamp order land
+# inside this window and get picked up on the next poll instead of lost.
+SYNC_SETTLE_SECONDS = 5
+
+SYNC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def ticket_list_query(
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = DEFAULT_PAGE_SIZE
+) -> Select:
+    """
+    Newest-first ticket page, optionally filtered, starting after a keyset position.
+    
+    Each filter combination has a matching composite index (see
+    models.Ticket), so this is an index range scan with no sort. Selects
+    the TicketResponse columns only (see serialization).
+    """
+    query = select(*TICKET_COLUMNS)
+    
+    # Apply filters if provided
+    if status:
+        query = query.where(Ticket.status == status)
+    if category:
+        query = query.where(Ticket.category == category)
+    
+    # Seek past the last row of the previous page
+    if after is not None:
+        query = query.where(tuple_(Ticket.created_at, Ticket.id) < tuple_(*after))
+    
+    return query.order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit)
+
 
 @router.get("/", response_model=List[TicketResponse])
-def get_tickets(
+@query_budget(1)
+async def get_tickets(
     status: Optional[str] = Query(None, description="Filter by status"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    db: Session = Depends(get_db)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get all tickets with optional filtering.
+    Get tickets with optional filtering, newest first, one page at a time.
     
     Query parameters:
     - status: Filter by status (new, in_progress, done)
     - category: Filter by category
+    - limit: Page size (default 100, max 500)
+    - cursor: Value of the X-Next-Cursor header from the previous page
     
-    Example: GET /tickets?status=new&category=Tax
+    Pagination is keyset-based on (created_at, id), so every page costs
+    the same regardless of depth. The X-Next-Cursor response header is
+    only set when more tickets are available.
+    
+    Example: GET /tickets?status=new&category=Tax&limit=50
     """
-    query = db.query(Ticket)
+    position = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
-    # Apply filters if provided
-    if status:
-        query = query.filter(Ticket.status == status)
-    if category:
-        query = query.filter(Ticket.category == category)
+    # Fetch one extra row to find out whether another page exists
+    query = ticket_list_query(status=status, category=category, after=position, limit=limit + 1)
+    rows = (await db.execute(query)).all()
     
-    tickets = query.order_by(Ticket.created_at.desc()).all()
-    return tickets
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    
+    return FastJSONResponse(ticket_dicts(rows), headers=headers)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite hands back naive datetimes - treat them as the UTC they were stored as"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _settle(position, horizon: datetime):
+    """Hold a keyset position back to the settle horizon if it's newer"""
+    if _as_utc(position[0]) > horizon:
+        return (horizon, 0)
+    return position
+
+
+@router.get("/changes", response_model=TicketChanges)
+@query_budget(2)
+async def get_ticket_changes(
+    since: Optional[str] = Query(None, description="Watermark from the previous sync (omit for a full sync)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Max tickets and deletions per call"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Incremental sync: tickets changed and deleted since a watermark.
+    
+    Query parameters:
+    - since: `watermark` returned by the previous call. Omit it to start
+      from scratch (returns every ticket, oldest change first).
+    - limit: Max tickets (and, separately, deletions) per call
+    
+    Clients should apply `deleted_ids` first, then upsert `tickets` by id.
+    The same ticket may be sent more than once around the watermark, so
+    applying changes must be idempotent. While `has_more` is true, call
+    again straight away with the new watermark.
+    """
+    ticket_position = (SYNC_EPOCH, 0)
+    tombstone_position = (SYNC_EPOCH, 0)
+    if since:
+        try:
+            ticket_position, tombstone_position = decode_sync_token(since)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # Tickets changed after the watermark, in (updated_at, id) order
+    tickets = (await db.execute(
+        select(*TICKET_COLUMNS)
+        .where(tuple_(Ticket.updated_at, Ticket.id) > tuple_(*ticket_position))
+        .order_by(Ticket.updated_at, Ticket.id)
+        .limit(limit + 1)
+    )).all()
+    
+    # Deletions after the watermark, in (deleted_at, id) order
+    tombstones = (await db.execute(
+        select(TicketTombstone)
+        .where(tuple_(TicketTombstone.deleted_at, TicketTombstone.id) > tuple_(*tombstone_position))
+        .order_by(TicketTombstone.deleted_at, TicketTombstone.id)
+        .limit(limit + 1)
+    )).scalars().all()
+    
+    has_more = len(tickets) > limit or len(tombstones) > limit
+    tickets = tickets[:limit]
+    tombstones = tombstones[:limit]
+    
+    if tickets:
+        ticket_position = (tickets[-1].updated_at, tickets[-1].id)
+    if tombstones:
+        tombstone_position = (tombstones[-1].deleted_at, tombstones[-1].id)
+    
+    # Once caught up, rewind into the settle window so late commits are not skipped
+    if not has_more:
+        horizon = datetime.now(timezone.utc) - timedelta(seconds=SYNC_SETTLE_SECONDS)
+        ticket_position = _settle(ticket_position, horizon)
+        tombstone_position = _settle(tombstone_position, horizon)
+    
+    # Same shape as TicketChanges
+    return FastJSONResponse({
+        "tickets": ticket_dicts(tickets),
+        "deleted_ids": [tombstone.ticket_id for tombstone in tombstones],
+        "watermark": encode_sync_token(ticket_position, tombstone_position),
+        "has_more": has_more,
+    })
+
+
+@router.get("/stream")
+async def stream_ticket_changes(
+    request: Request,
+    hub: TicketEventHub = Depends(get_ticket_event_hub)
+):
+    """
+    Server-Sent Events stream of ticket changes.
+    
+    Each event is a small JSON object such as
+    `{"id": 42, "type": "ticket.updated", "ticket_id": 7, "at": "...", "fields": ["status"]}`.
+    Fetch the full rows through GET /tickets/changes.
+    
+    If this connection falls too far behind it receives a `stream.evicted`
+    event and is closed - reconnect and resync through /tickets/changes.
+    """
+    subscriber = hub.subscribe()
+    
+    async def event_source():
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.get(), timeout=settings.TICKET_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # SSE comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                if event["type"] == SUBSCRIBER_EVICTED:
+                    break
+        finally:
+            hub.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering
+        }
+    )
+
+
+@router.get("/counts", response_model=TicketCounts)
+async def get_ticket_counts(
+    group_by: Optional[str] = Query(
+        None, pattern="^(category|department|assigned_to)$",
+        description="Also count per category, department or assigned_to"
+    ),
+    counter: TicketCounter = Depends(get_ticket_counter)
+):
+    """
+    Number of tickets per status, optionally per category, department or assignee.
+    
+    Served from an in-memory cache that ticket writes keep up to date and
+    that is reconciled with the database periodically, so it's cheap to
+    poll - no table scan per request.
+    
+    Example: GET /tickets/counts?group_by=category
+    """
+    if not counter.loaded:
+        await counter.reconcile()
+    
+    by_status = counter.by_status()
+    counts = TicketCounts(total=sum(by_status.values()), by_status=by_status)
+    if group_by:
+        counts.groups = [
+            TicketCountGroup(value=value, total=sum(statuses.values()), by_status=statuses)
+            for value, statuses in sorted(
+                counter.by_group(group_by).items(), key=lambda item: (item[0] is None, item[0] or "")
+            )
+        ]
+    return counts
+
+
+@router.get("/search", response_model=TicketSearchResults)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search words"),
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    offset: int = Query(0, ge=0, le=10000, description="Hits to skip"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Full-text search over ticket titles, descriptions, notes and responses.
+    
+    Query parameters:
+    - q: Search words. A ticket matches when it contains every word
+      (as a prefix, so "refu" finds "refund").
+    - limit: Page size (default 20, max 100)
+    - offset: Number of hits to skip (for the next page, add `limit`)
+    
+    Hits are ranked best first, each with an HTML snippet of the matching
+    text (escaped, matches wrapped in <mark>).
+    
+    Example: GET /tickets/search?q=vat refund&limit=20
+    """
+    hits, has_more = await search_tickets(db, q, limit=limit, offset=offset)
+    return TicketSearchResults(
+        hits=[
+            TicketSearchHit(ticket=TicketResponse.model_validate(ticket), rank=rank, snippet=snippet)
+            for ticket, rank, snippet in hits
+        ],
+        has_more=has_more,
+    )
+
+
+@router.get("/export")
+async def export_tickets_route(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    created_from: Optional[datetime] = Query(None, description="Tickets created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Tickets created before this time"),
+    include_responses: bool = Query(True, description="Include each ticket's response history")
+):
+    """
+    Export tickets with their response history as NDJSON or CSV.
+    
+    The export is streamed from a server-side cursor, so it starts
+    immediately and works for any number of tickets. NDJSON has one
+    ticket per line with `responses` nested; CSV has one line per ticket
+    and response.
+    """
+    return StreamingResponse(
+        export_tickets(
+            format,
+            status=status,
+            category=category,
+            created_from=created_from,
+            created_to=created_to,
+            include_responses=include_responses,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tickets.{format}"'},
+    )
 
 
 @router.get("/{ticket_id}", response_model=TicketResponse)
-def get_ticket(ticket_id: int, db: Session = Depends(get_db)):
+@query_budget(1)
+async def get_ticket(
+    ticket_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    cache: TicketCache = Depends(get_ticket_cache)
+):
     """
     Get a single ticket by ID.
     
     Returns 404 if ticket doesn't exist.
+    Served from the ticket cache when possible (already serialized).
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    payload = await cache.get(db, ticket_id)
     
-    if not ticket:
+    if payload is None:
         raise HTTPException(status_code=404, detail=f"Ticket {ticket_id} not found")
     
-    return ticket
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get("/{ticket_id}/detail", response_model=TicketDetail)
+@query_budget(1)
+async def get_ticket_detail(
+    ticket_id: int,
+    limit: int = Query(DEFAULT_RESPONSE_PAGE_SIZE, ge=1, le=MAX_RESPONSE_PAGE_SIZE, description="Responses per page"),
+    cursor: Optional[str] = Query(None, description="responses_next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get a ticket with its latest responses - everything the case view
+    needs in one request and one query.
+    
+    Responses are newest first, `limit` at a time. When there are older
+    ones, `responses_next_cursor` is set: pass it as `cursor` here or to
+    GET /tickets/{id}/responses for the next page.
+    
+    Returns 404 if ticket doesn't exist.
+    """
+    position = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    detail = await load_ticket_detail(db, ticket_id, after=position, limit=limit)
+    if detail is None:
+        raise HTTPException(status_code=404, detail=f"Ticket {ticket_id} not found")
+    
+    ticket, responses, next_cursor = detail
+    return TicketDetail(
+        **TicketResponse.model_validate(ticket).model_dump(),
+        responses=[EmailResponseResponse.model_validate(response) for response in responses],
+        responses_next_cursor=next_cursor,
+    )
 
 
 @router.post("/", response_model=TicketResponse, status_code=201)
+@query_budget(6)
 async def create_ticket(
     ticket_data: TicketCreate, 
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    email_service: EmailService = Depends(get_email_service),
+    outbox: EmailOutbox = Depends(get_email_outbox),
+    hub: TicketEventHub = Depends(get_ticket_event_hub),
+    counter: TicketCounter = Depends(get_ticket_counter),
+    numbers: TicketNumberAllocator = Depends(get_ticket_number_allocator)
 ):
     """
     Create a new ticket and send confirmation email to customer.
@@ -85,8 +447,9 @@ async def create_ticket(
     - customer_phone: Optional
     - And other optional fields for assignment, analytics, etc.
     
-    Returns the created ticket with ID and timestamps.
-    Sends confirmation email in the background.
+    Returns the created ticket with ID, ticket number and timestamps.
+    Queues the confirmation email in the same transaction (sent by the
+    email outbox workers).
     """
     # Create new Ticket instance with all fields from schema
     ticket_dict = ticket_data.model_dump(exclude_unset=True)
@@ -94,38 +457,117 @@ async def create_ticket(
     # Ensure status is set to NEW for new tickets
     ticket_dict['status'] = TicketStatus.NEW
     
+    # From the numbers this process has reserved - no query unless they ran out
+    ticket_dict['ticket_number'] = await numbers.next_number()
+    
     new_ticket = Ticket(**ticket_dict)
     
     # Add to database
     db.add(new_ticket)
-    db.commit()
-    db.refresh(new_ticket)  # Get the auto-generated ID
-    
-    # Send confirmation email in background (non-blocking)
-    email_service = get_email_service()
-    if email_service.is_configured():
-        background_tasks.add_task(
-            email_service.send_ticket_confirmation,
-            ticket_id=new_ticket.id,
-            ticket_title=new_ticket.title,
-            ticket_description=new_ticket.description or "",
-            customer_email=new_ticket.customer_email,
-            customer_name=new_ticket.customer_name,
-            category=new_ticket.category,
-            priority=new_ticket.priority
-        )
+    await db.flush()  # Assign the ID and created_at
+    await apply_ticket_change(db, None, ticket_facts(new_ticket))
+    
+    # Queue confirmation email in the outbox, committed together with the ticket
+    confirmation_queued = email_service.is_configured() and bool(new_ticket.customer_email)
+    if confirmation_queued:
+        enqueue_confirmation(db, new_ticket, email_service.company_name)
+    
+    count_key = ticket_count_key(new_ticket)
+    await db.commit()
+    counter.apply(None, count_key)  # Right after the commit, see services.ticket_counts
+    await db.refresh(new_ticket)  # Get the auto-generated ID
+    
+    hub.publish(TICKET_CREATED, new_ticket.id, status=new_ticket.status)
+    
+    if confirmation_queued:
+        outbox.notify()
         logger.info(f"Confirmation email queued for ticket #{new_ticket.id}")
     else:
-        logger.warning(f"Email service not configured - skipping confirmation for ticket #{new_ticket.id}")
+        logger.warning(f"Email service not configured or no customer email - skipping confirmation for ticket #{new_ticket.id}")
     
     return new_ticket
 
 
+@router.post("/import", response_model=TicketImportResult)
+async def bulk_import_tickets(
+    request: Request,
+    format: Optional[str] = Query(
+        None, pattern="^(csv|ndjson)$",
+        description="File format (defaults to the Content-Type: text/csv or application/x-ndjson)"
+    ),
+    send_confirmations: bool = Query(True, description="Queue confirmation emails to customers"),
+    db: AsyncSession = Depends(get_async_db),
+    email_service: EmailService = Depends(get_email_service),
+    outbox: EmailOutbox = Depends(get_email_outbox),
+    hub: TicketEventHub = Depends(get_ticket_event_hub),
+    counter: TicketCounter = Depends(get_ticket_counter),
+    numbers: TicketNumberAllocator = Depends(get_ticket_number_allocator)
+):
+    """
+    Bulk import tickets from a CSV or NDJSON request body.
+    
+    Each row is validated like POST /tickets/ and valid rows are inserted
+    in batches (one commit per batch). Invalid rows are skipped and listed
+    in `errors` by line number. CSV needs a header row of field names.
+    
+    The body is parsed as it streams in, so files of any size can be
+    imported in one request.
+    """
+    format = format or format_for_content_type(request.headers.get("content-type"))
+    if format is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson"
+        )
+    
+    result = await import_tickets(
+        db,
+        parse_rows(request.stream(), format),
+        send_confirmations=send_confirmations,
+        email_service=email_service,
+        counter=counter,
+        hub=hub,
+        numbers=numbers,
+    )
+    if result.confirmations:
+        outbox.notify()
+    return result
+
+
+@router.post("/bulk-update", response_model=TicketBulkUpdateResult)
+async def bulk_update(
+    request: TicketBulkUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    hub: TicketEventHub = Depends(get_ticket_event_hub),
+    counter: TicketCounter = Depends(get_ticket_counter),
+    cache: TicketCache = Depends(get_ticket_cache)
+):
+    """
+    Apply the same change to many tickets (mass assign / move / close).
+    
+    - **ticket_ids** or **filter**: Which tickets to update
+    - **changes**: Fields to set, as for PUT /tickets/{id}
+    
+    All tickets are updated in one transaction with a single UPDATE.
+    Returns the updated tickets; IDs that don't exist are skipped.
+    """
+    try:
+        tickets = await bulk_update_tickets(db, request, counter, hub, cache)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return TicketBulkUpdateResult(updated=len(tickets), tickets=tickets)
+
+
 @router.put("/{ticket_id}", response_model=TicketResponse)
-def update_ticket(
+@query_budget(5)
+async def update_ticket(
     ticket_id: int, 
     ticket_data: TicketUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    hub: TicketEventHub = Depends(get_ticket_event_hub),
+    counter: TicketCounter = Depends(get_ticket_counter),
+    cache: TicketCache = Depends(get_ticket_cache)
 ):
     """
     Update an existing ticket.
@@ -134,36 +576,60 @@ def update_ticket(
     Returns 404 if ticket doesn't exist.
     """
     # Find ticket
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = await db.get(Ticket, ticket_id)
     
     if not ticket:
         raise HTTPException(status_code=404, detail=f"Ticket {ticket_id} not found")
     
     # Update only provided fields
+    old_facts = ticket_facts(ticket)
+    old_count_key = ticket_count_key(ticket)
     update_data = ticket_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(ticket, field, value)
+    await apply_ticket_change(db, old_facts, ticket_facts(ticket))
+    new_count_key = ticket_count_key(ticket)
+    
+    await db.commit()
+    counter.apply(old_count_key, new_count_key)
+    await db.refresh(ticket)
     
-    db.commit()
-    db.refresh(ticket)
+    cache.invalidate(ticket.id)
+    hub.publish(TICKET_UPDATED, ticket.id, status=ticket.status, fields=sorted(update_data))
     
     return ticket
 
 
 @router.delete("/{ticket_id}", status_code=204)
-def delete_ticket(ticket_id: int, db: Session = Depends(get_db)):
+@query_budget(7)
+async def delete_ticket(
+    ticket_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    hub: TicketEventHub = Depends(get_ticket_event_hub),
+    counter: TicketCounter = Depends(get_ticket_counter),
+    cache: TicketCache = Depends(get_ticket_cache)
+):
     """
     Delete a ticket.
     
     Returns 204 No Content on success.
     Returns 404 if ticket doesn't exist.
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = await db.get(Ticket, ticket_id)
     
     if not ticket:
         raise HTTPException(status_code=404, detail=f"Ticket {ticket_id} not found")
     
-    db.delete(ticket)
-    db.commit()
+    old_count_key = ticket_count_key(ticket)
+    await apply_ticket_change(db, ticket_facts(ticket), None)
+    await db.delete(ticket)
+    
+    # Leave a tombstone so delta-sync clients learn about the deletion
+    db.add(TicketTombstone(ticket_id=ticket_id))
+    await db.commit()
+    
+    cache.invalidate(ticket_id)
+    counter.apply(old_count_key, None)
+    hub.publish(TICKET_DELETED, ticket_id)
     
     return None  # 204 returns no content
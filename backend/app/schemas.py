@@ -4,9 +4,9 @@ Pydantic schemas - Data validation and serialization.
 Enhanced schemas for comprehensive case management with analytics support.
 """
 
-from pydantic import BaseModel, Field, EmailStr
-from datetime import datetime
-from typing import Optional, List
+from pydantic import BaseModel, Field, EmailStr, model_validator
+from datetime import date, datetime
+from typing import Dict, Optional, List
 
 
 class TicketBase(BaseModel):
@@ -109,6 +109,85 @@ class TicketResponse(TicketBase):
         from_attributes = True  # Allows reading from SQLAlchemy models
 
 
+class TicketFilter(BaseModel):
+    """Selects tickets by field values (all given fields must match)"""
+    status: Optional[str] = Field(None, pattern="^(new|in_progress|pending_customer|resolved|closed|done)$")
+    category: Optional[str] = None
+    priority: Optional[str] = Field(None, pattern="^(low|medium|high|critical)$")
+    department: Optional[str] = None
+    assigned_to: Optional[str] = None
+
+
+class TicketChanges(BaseModel):
+    """
+    Delta-sync result: tickets changed and deleted since a watermark.
+    
+    Pass `watermark` back as `since` on the next call. When `has_more`
+    is true, call again immediately to fetch the rest of the changes.
+    """
+    tickets: List[TicketResponse]
+    deleted_ids: List[int]
+    watermark: str
+    has_more: bool
+
+
+class TicketCountGroup(BaseModel):
+    """Ticket counts for one category/department/assignee"""
+    value: Optional[str]  # null for tickets without a department/assignee
+    total: int
+    by_status: Dict[str, int]
+
+
+class TicketCounts(BaseModel):
+    """
+    Ticket counts by status.
+    
+    `groups` is only present when counts were requested per
+    category, department or assignee.
+    """
+    total: int
+    by_status: Dict[str, int]
+    groups: Optional[List[TicketCountGroup]] = None
+
+
+class TicketSearchHit(BaseModel):
+    """
+    One search result.
+    
+    `snippet` is HTML: the matching excerpt, escaped, with the matched
+    terms wrapped in <mark>...</mark>.
+    """
+    ticket: TicketResponse
+    rank: float  # Higher is a better match
+    snippet: str
+
+
+class TicketSearchResults(BaseModel):
+    """A page of search results, best match first"""
+    hits: List[TicketSearchHit]
+    has_more: bool
+
+
+class TicketImportError(BaseModel):
+    """A row that couldn't be imported"""
+    row: int  # Line number in the file (where the record starts)
+    error: str
+
+
+class TicketImportResult(BaseModel):
+    """
+    Outcome of a bulk import.
+    
+    `errors` lists at most TICKET_IMPORT_MAX_ERRORS rows; `failed` counts
+    all of them.
+    """
+    imported: int
+    failed: int
+    confirmations: int  # Confirmation emails queued
+    errors: List[TicketImportError]
+    errors_truncated: bool
+
+
 class EmailResponseCreate(BaseModel):
     """Schema for creating an email response to a customer"""
     response: str = Field(..., min_length=1, description="Response message to send to customer")
@@ -131,7 +210,127 @@ class EmailResponseResponse(BaseModel):
     email_status: str
     error_message: Optional[str]
     message_id: Optional[str]
+    email_type: Optional[str] = None
+    attempts: Optional[int] = None
     
     class Config:
         """Pydantic configuration"""
         from_attributes = True
+
+
+class TicketExport(TicketResponse):
+    """A ticket with its response history (one line of the NDJSON export)"""
+    responses: List[EmailResponseResponse] = Field(default_factory=list)
+
+
+class TicketDetail(TicketResponse):
+    """A ticket with a page of its responses, newest first (GET /tickets/{id}/detail)"""
+    responses: List[EmailResponseResponse] = Field(default_factory=list)
+    responses_next_cursor: Optional[str] = None  # Cursor for older responses (None: no more)
+
+
+class BulkResponseCreate(BaseModel):
+    """
+    Schema for sending the same (templated) response to many tickets.
+    
+    Target tickets with either `ticket_ids`, a non-empty `filter`, or
+    `all: true` for every ticket. The template may use {customer_name},
+    {ticket_id}, {ticket_number}, {ticket_title} and {category}; they are
+    filled in per recipient.
+    """
+    ticket_ids: Optional[List[int]] = Field(None, min_length=1, description="Tickets to respond to")
+    filter: Optional[TicketFilter] = Field(None, description="Respond to every ticket matching this filter")
+    all: bool = Field(False, description="Respond to every ticket (must be explicit)")
+    template: str = Field(..., min_length=1, description="Response text template")
+    subject: Optional[str] = Field(None, description="Subject template (defaults to the usual response subject)")
+    sent_by: Optional[str] = Field(None, description="Name of employee sending the response")
+    
+    @model_validator(mode="after")
+    def check_target(self):
+        """Exactly one of ticket_ids / a non-empty filter / all"""
+        if [self.ticket_ids is not None, self.filter is not None, self.all].count(True) != 1:
+            raise ValueError("Provide exactly one of ticket_ids, filter or all")
+        # An empty filter would silently email every customer
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("filter must set at least one field (pass all: true to respond to every ticket)")
+        return self
+
+
+class TicketBulkUpdate(BaseModel):
+    """
+    Schema for applying one change to many tickets (mass assign / move / close).
+    
+    Target tickets with either `ticket_ids` or `filter`; `changes` is
+    applied to every one of them, like PUT /tickets/{id}.
+    """
+    ticket_ids: Optional[List[int]] = Field(None, min_length=1, description="Tickets to update")
+    filter: Optional[TicketFilter] = Field(None, description="Update every ticket matching this filter")
+    changes: TicketUpdate = Field(..., description="Fields to set")
+    
+    @model_validator(mode="after")
+    def check_target(self):
+        """Exactly one of ticket_ids / a non-empty filter, and something to change"""
+        if (self.ticket_ids is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of ticket_ids or filter")
+        # An empty filter would match (and change) every ticket
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("filter must set at least one field")
+        if not self.changes.model_fields_set:
+            raise ValueError("changes must set at least one field")
+        return self
+
+
+class TicketBulkUpdateResult(BaseModel):
+    """The tickets a bulk update changed, in ID order"""
+    updated: int
+    tickets: List[TicketResponse]
+
+
+class EmailJobResponse(BaseModel):
+    """Progress of a bulk email job"""
+    id: int
+    created_at: datetime
+    sent_by: Optional[str]
+    total: int  # Emails queued
+    skipped: int  # Matched tickets without a customer email
+    pending: int
+    sent: int
+    failed: int
+    completed: bool
+
+
+class AnalyticsGroup(BaseModel):
+    """
+    Ticket analytics for one group (tickets created in the date range).
+    
+    Only the dimensions that were grouped by are set. Times are in
+    minutes; percentiles are estimates from histogram buckets.
+    """
+    day: Optional[date] = None
+    category: Optional[str] = None
+    department: Optional[str] = None
+    priority: Optional[str] = None
+    
+    tickets: int
+    resolved: int
+    escalated: int
+    
+    responded: int  # Tickets with a first response
+    avg_response_minutes: Optional[float] = None
+    p50_response_minutes: Optional[float] = None
+    p90_response_minutes: Optional[float] = None
+    p95_response_minutes: Optional[float] = None
+    
+    resolutions: int  # Tickets with a resolution time
+    avg_resolution_minutes: Optional[float] = None
+    p50_resolution_minutes: Optional[float] = None
+    p90_resolution_minutes: Optional[float] = None
+    p95_resolution_minutes: Optional[float] = None
+    
+    rated: int  # Tickets with a satisfaction rating
+    avg_satisfaction: Optional[float] = None
+
+
+class AnalyticsResponse(BaseModel):
+    """Ticket analytics, one entry per group"""
+    groups: List[AnalyticsGroup]
@@ -0,0 +1,315 @@
+"""
+Full-text search over tickets.
+
+Indexes each ticket's title, description and internal notes together
+with the text of its response emails, so agents can find cases by
+keyword instead of downloading every ticket.
+
+- SQLite: an FTS5 table (ticket_search, rowid = ticket id) ranked with
+  bm25, weighting title > description > notes > responses
+- PostgreSQL: a ticket_search table holding a weighted tsvector per
+  ticket, with a GIN index, ranked with ts_rank_cd
+
+Database triggers keep the index up to date on every insert, update and
+delete of tickets and ticket_responses, so no application code path can
+forget to. The index is created (and back-filled from existing tickets)
+whenever the schema is created - create_all() and migrations.init_db()
+both do it - and dropped with the tables.
+"""
+
+import html
+import logging
+import re
+from typing import List, Tuple
+
+from sqlalchemy import event, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import Base
+from .models import Ticket
+
+logger = logging.getLogger(__name__)
+
+# Match markers put around hits in snippets by the database. Control
+# characters can't collide with the (escaped) text they're inserted into.
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+
+# Words in a search query (anything else - quotes, operators - is ignored)
+_WORD = re.compile(r"\w+")
+
+
+_SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS ticket_search USING fts5(
+        title, description, notes, responses,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    # Default ORDER BY rank: bm25 with per-column weights
+    "INSERT INTO ticket_search (ticket_search, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0, 1.0)')",
+    """
+    CREATE TRIGGER IF NOT EXISTS ticket_search_ticket_insert AFTER INSERT ON tickets BEGIN
+        INSERT INTO ticket_search (rowid, title, description, notes, responses)
+        VALUES (new.id, new.title, coalesce(new.description, ''), coalesce(new.notes, ''), '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ticket_search_ticket_update
+    AFTER UPDATE OF title, description, notes ON tickets BEGIN
+        UPDATE ticket_search
+        SET title = new.title, description = coalesce(new.description, ''), notes = coalesce(new.notes, '')
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ticket_search_ticket_delete AFTER DELETE ON tickets BEGIN
+        DELETE FROM ticket_search WHERE rowid = old.id;
+    END
+    """,
+    # New responses are appended; edits and deletes rebuild the ticket's response text
+    """
+    CREATE TRIGGER IF NOT EXISTS ticket_search_response_insert
+    AFTER INSERT ON ticket_responses WHEN new.email_type = 'response' BEGIN
+        UPDATE ticket_search
+        SET responses = CASE WHEN responses = '' THEN new.response_text
+                             ELSE responses || char(10) || new.response_text END
+        WHERE rowid = new.ticket_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ticket_search_response_update
+    AFTER UPDATE OF response_text ON ticket_responses BEGIN
+        UPDATE ticket_search SET responses = (
+            SELECT coalesce(group_concat(response_text, char(10)), '') FROM ticket_responses
+            WHERE ticket_id = new.ticket_id AND email_type = 'response'
+        ) WHERE rowid = new.ticket_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ticket_search_response_delete AFTER DELETE ON ticket_responses BEGIN
+        UPDATE ticket_search SET responses = (
+            SELECT coalesce(group_concat(response_text, char(10)), '') FROM ticket_responses
+            WHERE ticket_id = old.ticket_id AND email_type = 'response'
+        ) WHERE rowid = old.ticket_id;
+    END
+    """,
+    # Back-fill tickets created before the index existed
+    """
+    INSERT INTO ticket_search (rowid, title, description, notes, responses)
+    SELECT t.id, t.title, coalesce(t.description, ''), coalesce(t.notes, ''), coalesce((
+        SELECT group_concat(r.response_text, char(10)) FROM ticket_responses r
+        WHERE r.ticket_id = t.id AND r.email_type = 'response'
+    ), '')
+    FROM tickets t
+    WHERE t.id NOT IN (SELECT rowid FROM ticket_search)
+    """,
+]
+
+_POSTGRES_INSTALL = [
+    """
+    CREATE TABLE IF NOT EXISTS ticket_search (
+        ticket_id INTEGER PRIMARY KEY REFERENCES tickets (id) ON DELETE CASCADE,
+        responses TEXT NOT NULL DEFAULT '',
+        document TSVECTOR NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_ticket_search_document ON ticket_search USING GIN (document)",
+    # Recompute one ticket's document (title A, description B, notes C, responses D)
+    """
+    CREATE OR REPLACE FUNCTION ticket_search_refresh(refresh_id INTEGER) RETURNS void AS $$
+        INSERT INTO ticket_search (ticket_id, responses, document)
+        SELECT t.id, r.responses,
+            setweight(to_tsvector('simple', coalesce(t.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(t.description, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(t.notes, '')), 'C') ||
+            setweight(to_tsvector('simple', r.responses), 'D')
+        FROM tickets t, LATERAL (
+            SELECT coalesce(string_agg(response_text, E'\\n' ORDER BY id), '') AS responses
+            FROM ticket_responses WHERE ticket_id = t.id AND email_type = 'response'
+        ) r
+        WHERE t.id = refresh_id
+        ON CONFLICT (ticket_id) DO UPDATE
+        SET responses = EXCLUDED.responses, document = EXCLUDED.document
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION ticket_search_ticket_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM ticket_search_refresh(NEW.id);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION ticket_search_response_changed() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM ticket_search_refresh(OLD.ticket_id);
+        END IF;
+        IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR NEW.ticket_id <> OLD.ticket_id) THEN
+            PERFORM ticket_search_refresh(NEW.ticket_id);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS ticket_search_ticket ON tickets",
+    """
+    CREATE TRIGGER ticket_search_ticket
+    AFTER INSERT OR UPDATE OF title, description, notes ON tickets
+    FOR EACH ROW EXECUTE FUNCTION ticket_search_ticket_changed()
+    """,
+    "DROP TRIGGER IF EXISTS ticket_search_response ON ticket_responses",
+    """
+    CREATE TRIGGER ticket_search_response
+    AFTER INSERT OR UPDATE OF response_text, ticket_id OR DELETE ON ticket_responses
+    FOR EACH ROW EXECUTE FUNCTION ticket_search_response_changed()
+    """,
+    # Back-fill tickets created before the index existed
+    """
+    SELECT ticket_search_refresh(t.id) FROM tickets t
+    WHERE NOT EXISTS (SELECT 1 FROM ticket_search s WHERE s.ticket_id = t.id)
+    """,
+]
+
+
+def _sqlite_has_fts5(connection: Connection) -> bool:
+    """Whether this SQLite build includes FTS5"""
+    return bool(connection.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+def install_search_index(connection: Connection) -> None:
+    """Create the search index and its triggers if missing, and index unindexed tickets"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        if not _sqlite_has_fts5(connection):
+            logger.warning("SQLite was built without FTS5 - ticket search is unavailable")
+            return
+        statements = _SQLITE_INSTALL
+    elif dialect == "postgresql":
+        statements = _POSTGRES_INSTALL
+    else:
+        logger.warning(f"Ticket search is not supported on {dialect}")
+        return
+
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+_SQLITE_TRIGGERS = [
+    "ticket_search_ticket_insert", "ticket_search_ticket_update", "ticket_search_ticket_delete",
+    "ticket_search_response_insert", "ticket_search_response_update", "ticket_search_response_delete",
+]
+
+
+def drop_search_index(connection: Connection) -> None:
+    """Drop the search index and its triggers"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        for trigger in _SQLITE_TRIGGERS:
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    if dialect in ("sqlite", "postgresql"):
+        # PostgreSQL triggers go with the tables; the functions are harmless
+        connection.exec_driver_sql("DROP TABLE IF EXISTS ticket_search")
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _after_create(target, connection, **kw):
+    install_search_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _before_drop(target, connection, **kw):
+    drop_search_index(connection)
+
+
+_SQLITE_SEARCH = text("""
+    SELECT rowid AS ticket_id, -rank AS score,
+           snippet(ticket_search, -1, :mark_start, :mark_end, '…', 16) AS snippet
+    FROM ticket_search
+    WHERE ticket_search MATCH :query
+    ORDER BY rank
+    LIMIT :limit OFFSET :offset
+""")
+
+# Rank and page first, then build headlines (expensive) for that page only
+_POSTGRES_SEARCH = text("""
+    SELECT hits.ticket_id, hits.score,
+           ts_headline('simple', concat_ws(E'\\n', t.title, t.description, t.notes, s.responses),
+                       to_tsquery('simple', :query), :headline_options) AS snippet
+    FROM (
+        SELECT ticket_id, ts_rank_cd(document, to_tsquery('simple', :query)) AS score
+        FROM ticket_search
+        WHERE document @@ to_tsquery('simple', :query)
+        ORDER BY score DESC, ticket_id DESC
+        LIMIT :limit OFFSET :offset
+    ) hits
+    JOIN ticket_search s ON s.ticket_id = hits.ticket_id
+    JOIN tickets t ON t.id = hits.ticket_id
+    ORDER BY hits.score DESC, hits.ticket_id DESC
+""")
+
+
+def _query_terms(query: str) -> List[str]:
+    """Split user input into search words"""
+    return _WORD.findall(query.lower())
+
+
+def _highlight(snippet: str) -> str:
+    """Escape a raw snippet and turn the match markers into <mark> tags"""
+    return html.escape(snippet or "").replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+async def search_tickets(
+    db: AsyncSession,
+    query: str,
+    limit: int,
+    offset: int = 0
+) -> Tuple[List[Tuple[Ticket, float, str]], bool]:
+    """
+    Find tickets matching every word of a query (words match as prefixes).
+
+    Returns ([(ticket, rank, snippet), ...], has_more), best match first.
+    """
+    terms = _query_terms(query)
+    if not terms:
+        return [], False
+
+    dialect = db.bind.dialect.name
+    params = {"limit": limit + 1, "offset": offset}
+    if dialect == "sqlite":
+        statement = _SQLITE_SEARCH
+        params.update(
+            query=" ".join(f'"{term}"*' for term in terms),
+            mark_start=_MARK_START,
+            mark_end=_MARK_END,
+        )
+    elif dialect == "postgresql":
+        statement = _POSTGRES_SEARCH
+        params.update(
+            query=" & ".join(f"{term}:*" for term in terms),
+            headline_options=(
+                f"StartSel={_MARK_START}, StopSel={_MARK_END}, "
+                "MaxFragments=2, MaxWords=20, MinWords=5, FragmentDelimiter=\" … \""
+            ),
+        )
+    else:
+        raise RuntimeError(f"Ticket search is not supported on {dialect}")
+
+    rows = (await db.execute(statement, params)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    tickets = {}
+    if rows:
+        found = await db.execute(select(Ticket).where(Ticket.id.in_([row.ticket_id for row in rows])))
+        tickets = {ticket.id: ticket for ticket in found.scalars()}
+
+    hits = [
+        (tickets[row.ticket_id], float(row.score), _highlight(row.snippet))
+        for row in rows
+        if row.ticket_id in tickets
+    ]
+    return hits, has_more
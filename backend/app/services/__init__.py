@@ -2,6 +2,10 @@
 Services module - Business logic and external integrations.
 """
 
-from .email_service import EmailService, email_service, get_email_service
+from .email_service import EmailService, get_email_service
+from .ticket_events import TicketEventHub, ticket_event_hub, get_ticket_event_hub
 
-__all__ = ['EmailService', 'email_service', 'get_email_service']
+__all__ = [
+    'EmailService', 'get_email_service',
+    'TicketEventHub', 'ticket_event_hub', 'get_ticket_event_hub',
+]
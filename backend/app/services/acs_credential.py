@@ -0,0 +1,128 @@
+"""
+Access token caching for the ACS email client.
+
+The ACS SDK's authentication policy asks its credential for a new token
+when the current one is within five minutes of expiring, and it does so
+inside the send that notices. With ManagedIdentityCredential that means
+a round trip to the identity endpoint (up to its connection timeout) in
+the middle of a customer email - a latency spike every token lifetime.
+
+CachedTokenCredential sits between the policy and the real credential.
+It keeps the current token and fetches the next one on a background
+thread EMAIL_TOKEN_REFRESH_MARGIN_SECONDS before expiry (longer than
+the policy's five minutes), so when the policy asks, a fresh token is
+already there. A failed refresh is retried with backoff while the old
+token is still valid; only when there is no valid token at all does a
+caller wait for a fetch (on the email thread pool, never the event
+loop).
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Scope the ACS SDK requests tokens for
+ACS_SCOPE = "https://communication.azure.com//.default"
+
+# A cached token closer than this to expiry isn't handed out
+MIN_VALIDITY_SECONDS = 30.0
+
+
+class CachedTokenCredential:
+    """TokenCredential wrapper that caches one scope's token and refreshes it ahead of expiry"""
+
+    def __init__(
+        self,
+        credential: Any,
+        scopes: Tuple[str, ...] = (ACS_SCOPE,),
+        refresh_margin: Optional[float] = None,
+        retry_seconds: Optional[float] = None,
+        retry_max_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            credential: The real credential (anything with get_token)
+            scopes: Scopes this wrapper caches; other requests pass straight through
+            refresh_margin: Seconds before expiry to refresh (default EMAIL_TOKEN_REFRESH_MARGIN_SECONDS)
+            retry_seconds: First retry delay after a failed refresh, doubled per failure
+            retry_max_seconds: Retry delay cap
+            clock: Wall clock in seconds (token expiry is a Unix timestamp)
+        """
+        self._credential = credential
+        self.scopes = tuple(scopes)
+        self.refresh_margin = settings.EMAIL_TOKEN_REFRESH_MARGIN_SECONDS if refresh_margin is None else refresh_margin
+        self.retry_seconds = retry_seconds or settings.EMAIL_CLIENT_RETRY_SECONDS
+        self.retry_max_seconds = retry_max_seconds or settings.EMAIL_CLIENT_RETRY_MAX_SECONDS
+        self._clock = clock
+        self._lock = threading.Lock()  # One fetch at a time
+        self._token: Optional[Any] = None
+        self._timer: Optional[threading.Timer] = None
+        self._failures = 0
+        self._closed = False
+
+    def _valid(self, token: Optional[Any]) -> bool:
+        return token is not None and token.expires_on - self._clock() > MIN_VALIDITY_SECONDS
+
+    def get_token(self, *scopes: str, **kwargs: Any) -> Any:
+        """The cached token, fetching one first only if there is no valid token"""
+        if tuple(scopes) != self.scopes or kwargs.get("claims") or kwargs.get("tenant_id"):
+            return self._credential.get_token(*scopes, **kwargs)
+
+        token = self._token
+        if self._valid(token):
+            return token
+        with self._lock:
+            # Another thread may have fetched it while this one waited
+            if self._valid(self._token):
+                return self._token
+            return self._fetch()
+
+    def _fetch(self) -> Any:
+        """Fetch a token and schedule its refresh (hold self._lock)"""
+        token = self._credential.get_token(*self.scopes)
+        self._token = token
+        self._failures = 0
+        lifetime = token.expires_on - self._clock()
+        # Tokens shorter-lived than the margin are refreshed halfway through
+        self._schedule(lifetime - self.refresh_margin if lifetime > self.refresh_margin else lifetime / 2)
+        return token
+
+    def _schedule(self, delay: float) -> None:
+        if self._closed:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(delay, 0.0), self._refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh(self) -> None:
+        """Background refresh; on failure retry with backoff"""
+        with self._lock:
+            try:
+                self._fetch()
+                logger.debug("Refreshed the ACS access token")
+            except Exception as e:
+                self._failures += 1
+                delay = min(self.retry_seconds * 2 ** (self._failures - 1), self.retry_max_seconds)
+                logger.warning(f"Refreshing the ACS access token failed ({self._failures}x), retrying in {delay:.0f}s: {e}")
+                self._schedule(delay)
+
+    def prefetch(self) -> None:
+        """Fetch the first token in the background, so the first send doesn't wait for it"""
+        self._schedule(0)
+
+    def close(self) -> None:
+        """Stop refreshing and close the real credential"""
+        self._closed = True
+        if self._timer is not None:
+            self._timer.cancel()
+        close = getattr(self._credential, "close", None)
+        if close is not None:
+            close()
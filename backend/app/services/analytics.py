@@ -0,0 +1,355 @@
+"""
+Ticket analytics rollups.
+
+Analytics are served from two rollup tables keyed by ticket creation day
+x category x department x priority (models.TicketDailyStats and
+TicketDailyHistogram) instead of scanning tickets, so a dashboard or
+Power BI query costs the same whether there are a thousand tickets or
+ten million.
+
+The rollups are kept current from the ticket write paths: each write
+reduces a ticket to its TicketFacts before and after the change, and
+apply_ticket_changes() subtracts the old contribution and adds the new
+one with INSERT ... ON CONFLICT DO UPDATE SET col = col + delta. The
+upserts are atomic, so concurrent writers can't lose updates, and they
+run in the caller's transaction, so the rollups commit (or roll back)
+together with the ticket change.
+
+Percentiles come from fixed histogram buckets and are estimates
+(interpolated within a bucket).
+
+If the rollups ever drift (e.g. after editing tickets directly in the
+database), rebuild them from the tickets table:
+    python -m app.services.analytics
+"""
+
+import logging
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..database import engine
+from ..models import Ticket, TicketDailyHistogram, TicketDailyStats, TicketStatus
+
+logger = logging.getLogger(__name__)
+
+# Statuses counted as resolved
+RESOLVED_STATUSES = {TicketStatus.RESOLVED.value, TicketStatus.CLOSED.value, TicketStatus.DONE.value}
+
+# Histogram bucket upper bounds in minutes: bucket i holds times below
+# BUCKET_BOUNDS[i] (and at least the previous bound); the last bucket
+# holds everything from 30 days up
+BUCKET_BOUNDS = [5, 15, 30, 60, 120, 240, 480, 960, 1440, 2880, 4320, 7200, 10080, 20160, 43200]
+
+# Percentiles reported by the analytics endpoint
+PERCENTILES = (50, 90, 95)
+
+# Rollup key columns, and the dimensions analytics can be grouped by
+DIMENSIONS = ("day", "category", "department", "priority")
+
+MEASURES = (
+    "tickets", "resolved", "escalated", "responded", "response_minutes",
+    "resolutions", "resolution_minutes", "rated", "rating_total",
+)
+
+# Bound parameters allowed per statement (asyncpg: 32767, SQLite since
+# 3.32: 32766); multi-row upserts are split to stay under it
+MAX_BIND_PARAMETERS = 32766
+
+# Ticket columns needed to compute TicketFacts (for streaming rebuilds)
+FACT_COLUMNS = (
+    Ticket.created_at, Ticket.category, Ticket.department, Ticket.priority, Ticket.status,
+    Ticket.escalated, Ticket.satisfaction_rating, Ticket.response_time_minutes,
+    Ticket.first_response_at, Ticket.resolution_time_minutes, Ticket.resolved_at,
+)
+
+
+class TicketFacts(NamedTuple):
+    """What a ticket contributes to the rollups"""
+    key: Tuple[date, str, str, str]  # (day, category, department, priority)
+    resolved: bool
+    escalated: bool
+    response_minutes: Optional[int]
+    resolution_minutes: Optional[int]
+    rating: Optional[int]
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite hands back naive datetimes - treat them as the UTC they were stored as"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _minutes_between(start: Optional[datetime], end: Optional[datetime]) -> Optional[int]:
+    """Whole minutes from start to end (None unless both are known)"""
+    if start is None or end is None:
+        return None
+    return max(int((_as_utc(end) - _as_utc(start)).total_seconds() // 60), 0)
+
+
+def ticket_facts(ticket: Any) -> TicketFacts:
+    """
+    Reduce a ticket (ORM object or row with the FACT_COLUMNS) to its rollup contribution.
+
+    Stored response/resolution times are used when set; otherwise they are
+    derived from first_response_at/resolved_at.
+    """
+    response_minutes = ticket.response_time_minutes
+    if response_minutes is None:
+        response_minutes = _minutes_between(ticket.created_at, ticket.first_response_at)
+    resolution_minutes = ticket.resolution_time_minutes
+    if resolution_minutes is None:
+        resolution_minutes = _minutes_between(ticket.created_at, ticket.resolved_at)
+
+    return TicketFacts(
+        key=(_as_utc(ticket.created_at).date(), ticket.category, ticket.department or "", ticket.priority),
+        resolved=ticket.status in RESOLVED_STATUSES,
+        escalated=bool(ticket.escalated),
+        response_minutes=response_minutes,
+        resolution_minutes=resolution_minutes,
+        rating=ticket.satisfaction_rating,
+    )
+
+
+def _bucket(minutes: int) -> int:
+    """Histogram bucket index for a time in minutes"""
+    return bisect_right(BUCKET_BOUNDS, minutes)
+
+
+def _contribute(stats: Dict, histograms: Dict, facts: TicketFacts, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) one ticket's contribution"""
+    measures = stats[facts.key]
+    measures["tickets"] += sign
+    measures["resolved"] += sign * facts.resolved
+    measures["escalated"] += sign * facts.escalated
+    if facts.response_minutes is not None:
+        measures["responded"] += sign
+        measures["response_minutes"] += sign * facts.response_minutes
+        histograms[facts.key + ("response", _bucket(facts.response_minutes))] += sign
+    if facts.resolution_minutes is not None:
+        measures["resolutions"] += sign
+        measures["resolution_minutes"] += sign * facts.resolution_minutes
+        histograms[facts.key + ("resolution", _bucket(facts.resolution_minutes))] += sign
+    if facts.rating is not None:
+        measures["rated"] += sign
+        measures["rating_total"] += sign * facts.rating
+
+
+def rollup_deltas(
+    changes: Iterable[Tuple[Optional[TicketFacts], Optional[TicketFacts]]]
+) -> Tuple[Dict[tuple, Dict[str, int]], Dict[tuple, int]]:
+    """
+    Net rollup changes for a set of (old, new) ticket facts.
+
+    old is None for created tickets and new is None for deleted ones.
+    Returns ({key: {measure: delta}}, {(key..., metric, bucket): delta})
+    with zero deltas dropped.
+    """
+    stats: Dict[tuple, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(MEASURES, 0))
+    histograms: Dict[tuple, int] = defaultdict(int)
+    for old, new in changes:
+        if old == new:
+            continue
+        if old is not None:
+            _contribute(stats, histograms, old, -1)
+        if new is not None:
+            _contribute(stats, histograms, new, 1)
+
+    stats = {key: measures for key, measures in stats.items() if any(measures.values())}
+    histograms = {key: delta for key, delta in histograms.items() if delta}
+    return stats, histograms
+
+
+def _upsert(dialect: str, model, rows: List[Dict[str, Any]], measures: Sequence[str]):
+    """INSERT ... ON CONFLICT (key) DO UPDATE SET measure = measure + excluded.measure"""
+    dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = dialect_insert(model).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[column.name for column in model.__table__.primary_key],
+        set_={name: getattr(model, name) + statement.excluded[name] for name in measures},
+    )
+
+
+def _stats_rows(stats: Dict[tuple, Dict[str, int]]) -> List[Dict[str, Any]]:
+    return [dict(zip(DIMENSIONS, key), **measures) for key, measures in stats.items()]
+
+
+def _histogram_rows(histograms: Dict[tuple, int]) -> List[Dict[str, Any]]:
+    return [
+        dict(zip(DIMENSIONS + ("metric", "bucket"), key), count=count)
+        for key, count in histograms.items()
+    ]
+
+
+async def _execute_upserts(db: AsyncSession, dialect: str, model, rows: List[Dict[str, Any]], measures: Sequence[str]) -> None:
+    """Upsert rows in as few statements as MAX_BIND_PARAMETERS allows (a bulk update can touch thousands of keys)"""
+    per_statement = max(1, MAX_BIND_PARAMETERS // len(rows[0]))
+    for start in range(0, len(rows), per_statement):
+        await db.execute(_upsert(dialect, model, rows[start:start + per_statement], measures))
+
+
+async def apply_ticket_changes(
+    db: AsyncSession,
+    changes: Iterable[Tuple[Optional[TicketFacts], Optional[TicketFacts]]]
+) -> None:
+    """Apply (old, new) ticket changes to the rollups in the session's transaction"""
+    stats, histograms = rollup_deltas(changes)
+    dialect = db.bind.dialect.name
+    if stats:
+        await _execute_upserts(db, dialect, TicketDailyStats, _stats_rows(stats), MEASURES)
+    if histograms:
+        await _execute_upserts(db, dialect, TicketDailyHistogram, _histogram_rows(histograms), ("count",))
+
+
+async def apply_ticket_change(db: AsyncSession, old: Optional[TicketFacts], new: Optional[TicketFacts]) -> None:
+    """Apply one ticket's change (old=None: created, new=None: deleted)"""
+    await apply_ticket_changes(db, [(old, new)])
+
+
+def rebuild_rollups(bind: Engine = engine, batch_size: int = 5000) -> int:
+    """
+    Recompute the rollup tables from scratch. Returns the number of tickets read.
+
+    Runs in one transaction. The rollup tables are locked first (on SQLite,
+    the DELETE takes the write lock), so writes that land meanwhile wait
+    and are applied on top of the rebuilt totals instead of being lost.
+    """
+    with Session(bind) as db:
+        if bind.dialect.name == "postgresql":
+            db.execute(text("LOCK TABLE ticket_daily_stats, ticket_daily_histograms IN EXCLUSIVE MODE"))
+        db.execute(delete(TicketDailyStats))
+        db.execute(delete(TicketDailyHistogram))
+
+        count = 0
+
+        def changes():
+            nonlocal count
+            rows = db.execute(select(*FACT_COLUMNS).execution_options(yield_per=batch_size))
+            for row in rows:
+                count += 1
+                yield None, ticket_facts(row)
+
+        stats, histograms = rollup_deltas(changes())
+        stats_rows = _stats_rows(stats)
+        histogram_rows = _histogram_rows(histograms)
+        for start in range(0, len(stats_rows), batch_size):
+            db.execute(insert(TicketDailyStats), stats_rows[start:start + batch_size])
+        for start in range(0, len(histogram_rows), batch_size):
+            db.execute(insert(TicketDailyHistogram), histogram_rows[start:start + batch_size])
+        db.commit()
+
+    logger.info(f"Rebuilt analytics rollups from {count} tickets ({len(stats_rows)} rollup rows)")
+    return count
+
+
+def estimate_percentile(buckets: Dict[int, int], percentile: float) -> Optional[float]:
+    """
+    Estimate a percentile from histogram bucket counts.
+
+    Interpolates linearly inside the bucket the percentile falls in; for
+    the open-ended last bucket its lower bound is returned.
+    """
+    total = sum(buckets.values())
+    if total <= 0:
+        return None
+
+    target = total * percentile / 100
+    seen = 0
+    for bucket in sorted(buckets):
+        count = buckets[bucket]
+        if count <= 0:
+            continue
+        if seen + count >= target:
+            lower = BUCKET_BOUNDS[bucket - 1] if bucket > 0 else 0
+            if bucket >= len(BUCKET_BOUNDS):
+                return float(lower)
+            upper = BUCKET_BOUNDS[bucket]
+            return lower + (upper - lower) * (target - seen) / count
+        seen += count
+    return float(BUCKET_BOUNDS[-1])
+
+
+def _average(total: int, count: int) -> Optional[float]:
+    return total / count if count else None
+
+
+async def query_analytics(
+    db: AsyncSession,
+    group_by: Sequence[str] = (),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    filters: Optional[Dict[str, str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Aggregate the rollups over a date range, grouped by some of DIMENSIONS.
+
+    Reads rollup rows only. Returns one dict per group with the group's
+    dimension values, counts, averages and estimated percentiles.
+    """
+    def scoped(query, model):
+        if date_from is not None:
+            query = query.where(model.day >= date_from)
+        if date_to is not None:
+            query = query.where(model.day <= date_to)
+        for field, value in (filters or {}).items():
+            query = query.where(getattr(model, field) == value)
+        return query
+
+    stats_dims = [getattr(TicketDailyStats, name) for name in group_by]
+    stats = (await db.execute(scoped(
+        select(*stats_dims, *[func.sum(getattr(TicketDailyStats, name)).label(name) for name in MEASURES])
+        .group_by(*stats_dims),
+        TicketDailyStats,
+    ))).all()
+
+    histogram_dims = [getattr(TicketDailyHistogram, name) for name in group_by]
+    histograms: Dict[tuple, Dict[str, Dict[int, int]]] = defaultdict(lambda: defaultdict(dict))
+    for row in (await db.execute(scoped(
+        select(*histogram_dims, TicketDailyHistogram.metric, TicketDailyHistogram.bucket,
+               func.sum(TicketDailyHistogram.count))
+        .group_by(*histogram_dims, TicketDailyHistogram.metric, TicketDailyHistogram.bucket),
+        TicketDailyHistogram,
+    ))).all():
+        *key, metric, bucket, count = row
+        histograms[tuple(key)][metric][bucket] = count
+
+    groups = []
+    for row in stats:
+        key = tuple(row[:len(group_by)])
+        totals = {name: int(getattr(row, name) or 0) for name in MEASURES}
+        if not totals["tickets"]:
+            continue
+
+        group: Dict[str, Any] = dict(zip(group_by, key))
+        if "department" in group:
+            group["department"] = group["department"] or None
+        group.update(
+            tickets=totals["tickets"],
+            resolved=totals["resolved"],
+            escalated=totals["escalated"],
+            responded=totals["responded"],
+            avg_response_minutes=_average(totals["response_minutes"], totals["responded"]),
+            resolutions=totals["resolutions"],
+            avg_resolution_minutes=_average(totals["resolution_minutes"], totals["resolutions"]),
+            rated=totals["rated"],
+            avg_satisfaction=_average(totals["rating_total"], totals["rated"]),
+        )
+        for metric in ("response", "resolution"):
+            buckets = histograms[key][metric]
+            for percentile in PERCENTILES:
+                group[f"p{percentile}_{metric}_minutes"] = estimate_percentile(buckets, percentile)
+        groups.append(group)
+
+    groups.sort(key=lambda group: tuple(str(group[name]) for name in group_by))
+    return groups
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    rebuild_rollups()
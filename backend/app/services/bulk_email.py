@@ -0,0 +1,142 @@
+"""
+Bulk email responses.
+
+Sends one templated response to many tickets (e.g. "the filing deadline
+has moved"). The template is compiled once (see email_templates), every
+recipient's body is rendered in a single pass over the matching tickets,
+and all outbox rows are inserted with one executemany in one
+transaction. Delivery happens through the email outbox, so concurrency
+is bounded by the outbox workers and the email service's send cap.
+"""
+
+import logging
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import EmailJob, EmailStatus, EmailType, Ticket, TicketResponse
+from ..schemas import BulkResponseCreate, EmailJobResponse
+from .email_templates import EmailTemplate
+
+logger = logging.getLogger(__name__)
+
+# Placeholders a bulk template may use
+TEMPLATE_FIELDS = {"customer_name", "ticket_id", "ticket_number", "ticket_title", "category"}
+
+
+def compile_template(template: str) -> EmailTemplate:
+    """
+    Compile a {placeholder} template (plain text, not escaped).
+
+    Raises ValueError for unknown placeholders or format specs, so bad
+    templates are rejected before anything is queued.
+    """
+    compiled = EmailTemplate(template, escape=False)
+    unknown = compiled.slots - TEMPLATE_FIELDS
+    if unknown:
+        raise ValueError(
+            f"Unknown template placeholder {{{sorted(unknown)[0]}}}. "
+            f"Available: {', '.join('{' + name + '}' for name in sorted(TEMPLATE_FIELDS))}"
+        )
+    return compiled
+
+
+async def create_bulk_response_job(
+    db: AsyncSession,
+    request: BulkResponseCreate,
+    company_name: str
+) -> EmailJob:
+    """
+    Queue a templated response for every targeted ticket.
+
+    Tickets without a customer email (or IDs that don't exist) are counted
+    as skipped. Raises ValueError for bad templates or too many recipients.
+    """
+    body_template = compile_template(request.template)
+    subject_template = compile_template(request.subject) if request.subject else None
+
+    query = select(
+        Ticket.id, Ticket.ticket_number, Ticket.title, Ticket.category,
+        Ticket.customer_name, Ticket.customer_email
+    )
+    if request.ticket_ids is not None:
+        query = query.where(Ticket.id.in_(set(request.ticket_ids)))
+        requested = len(set(request.ticket_ids))
+    else:
+        if request.filter is not None:  # Otherwise request.all: every ticket
+            for field, value in request.filter.model_dump(exclude_none=True).items():
+                query = query.where(getattr(Ticket, field) == value)
+        requested = None
+
+    tickets = (await db.execute(query.order_by(Ticket.id))).all()
+    if len(tickets) > settings.BULK_EMAIL_MAX_RECIPIENTS:
+        raise ValueError(
+            f"{len(tickets)} tickets matched; a bulk response is limited to "
+            f"{settings.BULK_EMAIL_MAX_RECIPIENTS}. Narrow the filter."
+        )
+
+    job = EmailJob(sent_by=request.sent_by, template=request.template)
+    db.add(job)
+    await db.flush()  # Assign job ID
+
+    # Render every recipient's email in one pass
+    rows = []
+    for ticket in tickets:
+        if not ticket.customer_email:
+            continue
+        values = {
+            "customer_name": ticket.customer_name or "Customer",
+            "ticket_id": str(ticket.id),
+            "ticket_number": ticket.ticket_number or str(ticket.id),
+            "ticket_title": ticket.title,
+            "category": ticket.category,
+        }
+        subject = (
+            subject_template.render(**values) if subject_template
+            else f"{company_name} - Response to: {ticket.title}"
+        )
+        rows.append({
+            "ticket_id": ticket.id,
+            "job_id": job.id,
+            "subject": subject,
+            "response_text": body_template.render(**values),
+            "sent_to": ticket.customer_email,
+            "sent_by": request.sent_by,
+            "email_status": EmailStatus.PENDING,
+            "email_type": EmailType.RESPONSE,
+            "template_data": {"ticket_title": ticket.title, "customer_name": values["customer_name"]},
+        })
+
+    # One executemany for all outbox rows
+    if rows:
+        await db.execute(insert(TicketResponse), rows)
+
+    job.total = len(rows)
+    job.skipped = (requested if requested is not None else len(tickets)) - len(rows)
+    await db.commit()
+
+    logger.info(f"Bulk email job #{job.id}: {job.total} queued, {job.skipped} skipped")
+    return job
+
+
+async def get_job_progress(db: AsyncSession, job: EmailJob) -> EmailJobResponse:
+    """Count a job's emails by delivery status"""
+    counts = dict((await db.execute(
+        select(TicketResponse.email_status, func.count())
+        .where(TicketResponse.job_id == job.id)
+        .group_by(TicketResponse.email_status)
+    )).all())
+
+    pending = counts.get(EmailStatus.PENDING.value, 0)
+    return EmailJobResponse(
+        id=job.id,
+        created_at=job.created_at,
+        sent_by=job.sent_by,
+        total=job.total,
+        skipped=job.skipped,
+        pending=pending,
+        sent=counts.get(EmailStatus.SENT.value, 0) + counts.get(EmailStatus.DELIVERED.value, 0),
+        failed=counts.get(EmailStatus.FAILED.value, 0),
+        completed=pending == 0,
+    )
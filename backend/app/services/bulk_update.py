@@ -0,0 +1,101 @@
+"""
+Bulk ticket updates.
+
+Applies one TicketUpdate to many tickets (re-assign a queue, move tickets
+to another department, close a batch) as a single set-based
+UPDATE ... RETURNING in one transaction, instead of a load, update,
+commit and refresh per ticket.
+
+Ticket counts and analytics rollups depend on a few fields (status,
+category, department, assignee, timeline and rating fields). Only when
+the change touches one of those are the targeted rows' old values read
+first, locked FOR UPDATE on PostgreSQL so they can't change before the
+UPDATE; otherwise the UPDATE is the only query.
+"""
+
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import Ticket
+from ..schemas import TicketBulkUpdate
+from .analytics import FACT_COLUMNS, apply_ticket_changes, ticket_facts
+from .ticket_cache import TicketCache
+from .ticket_counts import GROUP_FIELDS, TicketCounter, ticket_count_key
+from .ticket_events import TICKET_UPDATED, TicketEventHub
+
+logger = logging.getLogger(__name__)
+
+# Fields the analytics rollups and ticket counts are derived from
+TRACKED_FIELDS = {column.key for column in FACT_COLUMNS} | {"status", *GROUP_FIELDS}
+
+
+async def bulk_update_tickets(
+    db: AsyncSession,
+    request: TicketBulkUpdate,
+    counter: TicketCounter,
+    hub: TicketEventHub,
+    cache: TicketCache
+) -> List[Ticket]:
+    """
+    Apply request.changes to every targeted ticket and commit.
+
+    Returns the updated tickets in ID order (IDs that don't exist are
+    skipped). Raises ValueError if more than BULK_UPDATE_MAX_TICKETS
+    tickets would change.
+    """
+    changes = request.changes.model_dump(exclude_unset=True)
+    limit = settings.BULK_UPDATE_MAX_TICKETS
+
+    if request.ticket_ids is not None:
+        conditions = [Ticket.id.in_(set(request.ticket_ids))]
+    else:
+        conditions = [
+            getattr(Ticket, field) == value
+            for field, value in request.filter.model_dump(exclude_none=True).items()
+        ]
+
+    old: dict = {}
+    if TRACKED_FIELDS & changes.keys():
+        rows = (await db.execute(
+            select(Ticket.id, *FACT_COLUMNS, Ticket.assigned_to)
+            .where(*conditions)
+            .with_for_update()
+        )).all()
+        if len(rows) > limit:
+            await db.rollback()
+            raise ValueError(f"{len(rows)} tickets matched; a bulk update is limited to {limit}. Narrow the filter.")
+        old = {row.id: row for row in rows}
+        conditions = [Ticket.id.in_(old)]
+
+    tickets = (await db.scalars(
+        update(Ticket)
+        .where(*conditions)
+        .values(**changes)
+        .returning(Ticket)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )).all()
+    if len(tickets) > limit:
+        await db.rollback()
+        raise ValueError(f"{len(tickets)} tickets matched; a bulk update is limited to {limit}. Narrow the filter.")
+    tickets = sorted(tickets, key=lambda ticket: ticket.id)
+
+    count_changes: List[Tuple] = []
+    if old:
+        await apply_ticket_changes(db, [(ticket_facts(old[ticket.id]), ticket_facts(ticket)) for ticket in tickets])
+        count_changes = [(ticket_count_key(old[ticket.id]), ticket_count_key(ticket)) for ticket in tickets]
+
+    await db.commit()
+
+    for old_key, new_key in count_changes:
+        counter.apply(old_key, new_key)
+    fields = sorted(changes)
+    for ticket in tickets:
+        cache.invalidate(ticket.id)
+        hub.publish(TICKET_UPDATED, ticket.id, status=ticket.status, fields=fields)
+
+    logger.info(f"Bulk update of {', '.join(fields)} changed {len(tickets)} tickets")
+    return tickets
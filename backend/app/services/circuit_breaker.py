@@ -0,0 +1,72 @@
+"""
+Circuit breaker for calls to external services.
+
+After a run of consecutive failures the circuit "opens" and calls fail
+fast without touching the service. Once the reset timeout has passed,
+a single trial call is let through ("half-open"): success closes the
+circuit again, failure re-opens it for another timeout.
+"""
+
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state (closed, open or half_open)"""
+        return self._state
+
+    def is_open(self) -> bool:
+        """
+        Whether calls would be rejected right now.
+        
+        Unlike allow_request() this doesn't consume the half-open trial call.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                return True  # Trial call in flight
+            return self._state == self.OPEN and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def allow_request(self) -> bool:
+        """Whether a call may go ahead right now"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Let exactly one trial call through
+                self._state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """A call succeeded - close the circuit"""
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        """A call failed - open the circuit if the threshold is reached"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -0,0 +1,348 @@
+"""
+Durable transactional email outbox.
+
+TicketResponse rows in PENDING state are the outbox. Routes write them in
+the same transaction as the change that triggers the email, so an email
+is queued exactly when its change commits and survives restarts. Worker
+tasks claim due rows in batches, send them through the EmailService and
+record the outcome, retrying failures with exponential backoff.
+
+Claiming is a single UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP
+LOCKED LIMIT n) RETURNING id. On PostgreSQL, concurrent workers skip each
+other's rows instead of queueing on them; SQLite doesn't support FOR UPDATE,
+but it runs the whole statement under its single writer lock, which gives
+the same exclusivity. A claim is a lease: next_attempt_at is pushed into the
+future, so rows held by a crashed worker become due again once it expires.
+Delivery is at-least-once.
+
+Workers run inside the API process (EMAIL_OUTBOX_WORKERS) and can also be
+run as separate processes to add throughput:
+    python -m app.services.email_outbox
+"""
+
+import asyncio
+import logging
+import random
+import signal
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models import EmailStatus, EmailType, Ticket, TicketResponse, utcnow
+from .analytics import apply_ticket_changes, ticket_facts
+from .email_service import CIRCUIT_OPEN_ERROR, EmailService, get_email_service
+from .ticket_cache import ticket_cache
+from .ticket_events import TICKET_RESPONDED, TicketEventHub, get_ticket_event_hub
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_response(
+    db: AsyncSession,
+    ticket_id: int,
+    subject: str,
+    response_text: str,
+    customer_email: str,
+    customer_name: str,
+    ticket_title: str,
+    sent_by: Optional[str] = None
+) -> TicketResponse:
+    """Add a PENDING response email to the session (committed by the caller)"""
+    record = TicketResponse(
+        ticket_id=ticket_id,
+        subject=subject,
+        response_text=response_text,
+        sent_to=customer_email,
+        sent_by=sent_by,
+        email_status=EmailStatus.PENDING,
+        email_type=EmailType.RESPONSE,
+        template_data={"ticket_title": ticket_title, "customer_name": customer_name},
+    )
+    db.add(record)
+    return record
+
+
+def confirmation_values(ticket: Any, company_name: str) -> Dict[str, Any]:
+    """Column values of the PENDING "case received" email for a ticket (ORM object or row, with its ID)"""
+    return {
+        "ticket_id": ticket.id,
+        "subject": f"{company_name} - Case #{ticket.id} Received",
+        "response_text": ticket.description or "",
+        "sent_to": ticket.customer_email,
+        "email_status": EmailStatus.PENDING,
+        "email_type": EmailType.CONFIRMATION,
+        "template_data": {
+            "ticket_title": ticket.title,
+            "ticket_description": ticket.description or "",
+            "customer_name": ticket.customer_name or "",
+            "category": ticket.category,
+            "priority": ticket.priority,
+        },
+    }
+
+
+def enqueue_confirmation(db: AsyncSession, ticket: Ticket, company_name: str) -> TicketResponse:
+    """
+    Add a PENDING "case received" email for a ticket to the session.
+
+    The ticket must already have its ID (flush first).
+    """
+    record = TicketResponse(**confirmation_values(ticket, company_name))
+    db.add(record)
+    return record
+
+
+class EmailOutbox:
+    """Pool of worker tasks draining the email outbox"""
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        email_service: Optional[EmailService] = None,
+        hub: Optional[TicketEventHub] = None,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self._email_service = email_service
+        self.hub = hub or get_ticket_event_hub()
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        self.poll_interval = settings.EMAIL_OUTBOX_POLL_SECONDS
+        self.lease = timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    @property
+    def email_service(self) -> EmailService:
+        """Email service used for sending (the global one unless injected)"""
+        return self._email_service or get_email_service()
+
+    def notify(self) -> None:
+        """Wake idle workers - call after committing new outbox rows"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def backlog(self) -> int:
+        """Rows waiting to be sent (PENDING, due or not)"""
+        async with self.session_factory() as db:
+            return await db.scalar(
+                select(func.count()).select_from(TicketResponse).where(TicketResponse.email_status == EmailStatus.PENDING)
+            )
+
+    def _backoff(self, attempts: int) -> timedelta:
+        """Retry delay after the given number of failed attempts (exponential, jittered)"""
+        delay = settings.EMAIL_OUTBOX_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+        delay = min(delay, settings.EMAIL_OUTBOX_BACKOFF_MAX_SECONDS)
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    async def claim_batch(self) -> List[int]:
+        """Lease up to batch_size due rows to this worker and return their IDs"""
+        now = utcnow()
+        due = and_(
+            TicketResponse.email_status == EmailStatus.PENDING,
+            or_(TicketResponse.next_attempt_at.is_(None), TicketResponse.next_attempt_at <= now),
+        )
+        candidates = (
+            select(TicketResponse.id)
+            .where(due)
+            .order_by(TicketResponse.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        claim = (
+            update(TicketResponse)
+            .where(TicketResponse.id.in_(candidates), due)
+            .values(next_attempt_at=now + self.lease, attempts=TicketResponse.attempts + 1)
+            .returning(TicketResponse.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        async with self.session_factory() as db:
+            claimed = (await db.execute(claim)).scalars().all()
+            await db.commit()
+        return list(claimed)
+
+    async def _send(self, record: TicketResponse) -> Tuple[EmailStatus, Optional[str], Optional[str]]:
+        """Render and send one outbox row"""
+        data = record.template_data or {}
+        ticket = record.ticket
+        customer_name = data.get("customer_name") or (ticket.customer_name if ticket else None) or ""
+        ticket_title = data.get("ticket_title") or (ticket.title if ticket else "")
+
+        try:
+            if record.email_type == EmailType.CONFIRMATION:
+                return await self.email_service.send_ticket_confirmation(
+                    ticket_id=record.ticket_id,
+                    ticket_title=ticket_title,
+                    ticket_description=data.get("ticket_description", ""),
+                    customer_email=record.sent_to,
+                    customer_name=customer_name,
+                    category=data.get("category", ""),
+                    priority=data.get("priority", "medium")
+                )
+            return await self.email_service.send_ticket_response(
+                ticket_id=record.ticket_id,
+                ticket_title=ticket_title,
+                customer_email=record.sent_to,
+                customer_name=customer_name,
+                response_text=record.response_text,
+                sent_by=record.sent_by
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error sending outbox email #{record.id}: {str(e)}", exc_info=True)
+            return (EmailStatus.FAILED, None, str(e))
+
+    def _record_result(
+        self,
+        record: TicketResponse,
+        email_status: EmailStatus,
+        message_id: Optional[str],
+        error_message: Optional[str]
+    ) -> None:
+        """Apply a send outcome to an outbox row (and its ticket)"""
+        now = utcnow()
+        record.message_id = message_id
+        record.error_message = error_message
+
+        if email_status == EmailStatus.SENT:
+            record.email_status = EmailStatus.SENT
+            record.sent_at = now
+            record.next_attempt_at = None
+
+            # Update ticket's first_response_at if this is the first response
+            ticket = record.ticket
+            if record.email_type == EmailType.RESPONSE and ticket is not None and ticket.first_response_at is None:
+                ticket.first_response_at = now
+
+                # Calculate response time if possible
+                if ticket.created_at:
+                    delta = now.replace(tzinfo=None) - ticket.created_at.replace(tzinfo=None)
+                    ticket.response_time_minutes = int(delta.total_seconds() / 60)
+        elif error_message == CIRCUIT_OPEN_ERROR:
+            # Never reached ACS - doesn't count as an attempt
+            record.attempts -= 1
+            record.next_attempt_at = now + timedelta(seconds=self.email_service.circuit_breaker.reset_timeout)
+        elif record.attempts >= self.max_attempts:
+            record.email_status = EmailStatus.FAILED
+            record.next_attempt_at = None
+            logger.error(f"Giving up on outbox email #{record.id} after {record.attempts} attempts: {error_message}")
+        else:
+            record.next_attempt_at = now + self._backoff(record.attempts)
+            logger.warning(f"Outbox email #{record.id} failed (attempt {record.attempts}), retrying at {record.next_attempt_at}")
+
+    async def process_batch(self) -> int:
+        """Claim, send and record one batch. Returns the number of rows processed."""
+        claimed = await self.claim_batch()
+        if not claimed:
+            return 0
+
+        async with self.session_factory() as db:
+            records = (await db.execute(
+                select(TicketResponse)
+                .options(joinedload(TicketResponse.ticket))
+                .where(TicketResponse.id.in_(claimed))
+            )).scalars().all()
+            # Release the connection while we wait on ACS
+            await db.commit()
+
+            results = await asyncio.gather(*(self._send(record) for record in records))
+            tickets = {record.ticket.id: record.ticket for record in records if record.ticket is not None}
+            old_facts = {ticket_id: ticket_facts(ticket) for ticket_id, ticket in tickets.items()}
+            for record, (email_status, message_id, error_message) in zip(records, results):
+                self._record_result(record, email_status, message_id, error_message)
+            new_facts = {ticket_id: ticket_facts(ticket) for ticket_id, ticket in tickets.items()}
+            # First responses change the tickets' response-time analytics
+            await apply_ticket_changes(db, [
+                (old_facts[ticket_id], new_facts[ticket_id]) for ticket_id in tickets
+            ])
+            await db.commit()
+
+        # ...and the tickets themselves (first_response_at)
+        for ticket_id in tickets:
+            if new_facts[ticket_id] != old_facts[ticket_id]:
+                ticket_cache.invalidate(ticket_id)
+
+        for record in records:
+            if record.email_status != EmailStatus.PENDING:
+                self.hub.publish(
+                    TICKET_RESPONDED, record.ticket_id,
+                    response_id=record.id, email_status=record.email_status
+                )
+
+        logger.info(f"Outbox processed {len(records)} email(s)")
+        return len(records)
+
+    async def _worker(self, index: int) -> None:
+        """Worker loop: drain due rows, then sleep until notified or polled"""
+        logger.info(f"Email outbox worker {index} started")
+        while not self._stopping:
+            processed = 0
+            try:
+                # Leave rows in the outbox while email is unavailable
+                if self.email_service.is_configured() and not self.email_service.circuit_breaker.is_open():
+                    processed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Email outbox worker {index} error: {str(e)}", exc_info=True)
+
+            # A full batch means there is probably more waiting
+            if processed >= self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+        logger.info(f"Email outbox worker {index} stopped")
+
+    async def start(self, workers: int) -> None:
+        """Start worker tasks on the running event loop"""
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(workers)]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop workers, letting in-flight batches finish (rows left claimed are retried after the lease)"""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self.notify()
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+
+# Global outbox instance
+email_outbox = EmailOutbox()
+
+
+def get_email_outbox() -> EmailOutbox:
+    """Dependency injection for the email outbox"""
+    return email_outbox
+
+
+async def _run_standalone() -> None:
+    """Run outbox workers until SIGINT/SIGTERM"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await email_outbox.start(max(settings.EMAIL_OUTBOX_WORKERS, 1))
+    await stop.wait()
+    await email_outbox.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_standalone())
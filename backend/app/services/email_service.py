@@ -3,60 +3,248 @@ Email service using Azure Communication Services.
 
 Handles sending customer response emails and tracking delivery.
 Uses Managed Identity for authentication.
+
+The Azure SDK takes a few hundred milliseconds to import, so it is only
+imported when the first email client is built, and the global service
+is only created when first asked for - neither slows down a cold start.
+
+The client is built once and reused: one pooled HTTP session for all
+sends, and an access token cached and refreshed in the background (see
+acs_credential.py). If building it fails, it is retried with backoff on
+later calls rather than leaving email off until a restart.
 """
 
-from azure.communication.email import EmailClient
-from azure.identity import DefaultAzureCredential, ManagedIdentityCredential
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import Any, Callable, Optional
+import asyncio
 import logging
+import threading
+import time
 
 from ..config import settings
+from ..metrics import EMAIL_LATENCY, EMAIL_SENDS, EMAIL_SENDS_IN_FLIGHT
 from ..models import EmailStatus
+from .acs_credential import CachedTokenCredential
+from .circuit_breaker import CircuitBreaker
+from .email_templates import get_company_templates
 
 logger = logging.getLogger(__name__)
 
+# error_message returned when a send is rejected without contacting ACS
+CIRCUIT_OPEN_ERROR = "Email service temporarily unavailable (circuit open)"
+
 
 class EmailService:
     """Service for sending emails via Azure Communication Services"""
     
-    def __init__(self):
-        """Initialize email client with Managed Identity - deferred to avoid startup delays"""
-        self.client = None
-        self._initialized = False
+    def __init__(
+        self,
+        client: Optional[Any] = None,
+        max_concurrency: Optional[int] = None,
+        send_timeout: Optional[float] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        client_factory: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Initialize email client with Managed Identity - deferred to avoid startup delays.
+        
+        Args:
+            client: Pre-built EmailClient (or a fake with the same begin_send API).
+                When omitted, the real client is created on first use.
+            max_concurrency: Max sends in flight at once (default EMAIL_MAX_CONCURRENCY)
+            send_timeout: Seconds before a send is abandoned (default EMAIL_SEND_TIMEOUT_SECONDS)
+            circuit_breaker: Breaker guarding ACS (default built from EMAIL_CIRCUIT_* settings)
+            client_factory: Builds the client on first use (default: EmailClient
+                with Managed Identity for ACS_ENDPOINT)
+        """
+        self.client = client
+        self.endpoint = settings.ACS_ENDPOINT
+        self._client_factory = client_factory or self._build_client
+        self._client_lock = threading.Lock()
+        self._init_failures = 0
+        self._retry_at = 0.0  # time.monotonic() before which a failed init isn't retried
+        self._session = None  # Pooled HTTP session, kept across client re-inits
+        self._warned_unconfigured = False
         self.sender_email = settings.ACS_SENDER_EMAIL
         self.company_name = settings.COMPANY_NAME
         
+        # The ACS SDK is synchronous: sends run on a dedicated, bounded thread
+        # pool so a slow round trip never blocks the event loop. The pool size
+        # is the concurrency cap - extra sends wait their turn.
+        self.max_concurrency = max_concurrency or settings.EMAIL_MAX_CONCURRENCY
+        self.send_timeout = send_timeout or settings.EMAIL_SEND_TIMEOUT_SECONDS
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="acs-email"
+        )
+        
+        # Fail fast while ACS is degraded instead of queueing doomed sends
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            failure_threshold=settings.EMAIL_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.EMAIL_CIRCUIT_RESET_SECONDS
+        )
+        
         # Don't initialize client during startup to avoid blocking
         # Client will be initialized on first use
         logger.info("Email service created (client will be initialized on first use)")
     
+    def _transport(self) -> Any:
+        """Azure transport over this service's pooled HTTP session (one connection per concurrent send)"""
+        import requests
+        from azure.core.pipeline.transport import RequestsTransport
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        if self._session is None:
+            session = requests.Session()
+            # Retries are the outbox's job, as in the SDK's own adapter
+            adapter = HTTPAdapter(
+                pool_maxsize=self.max_concurrency,
+                max_retries=Retry(total=False, redirect=False, raise_on_status=False)
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        return RequestsTransport(session=self._session, session_owner=False)
+    
+    def _build_client(self) -> Any:
+        """EmailClient with a cached, background-refreshed Managed Identity token"""
+        # Imported here rather than at module level (slow to import)
+        from azure.communication.email import EmailClient
+        from azure.identity import ManagedIdentityCredential
+        
+        # Use ManagedIdentityCredential with short timeout to avoid hanging
+        credential = CachedTokenCredential(ManagedIdentityCredential(connection_timeout=5))
+        credential.prefetch()
+        return EmailClient(self.endpoint, credential, transport=self._transport())
+    
     def _ensure_client(self):
-        """Lazy initialization of email client to avoid blocking startup"""
-        if self._initialized:
+        """
+        Lazy initialization of email client to avoid blocking startup.
+        
+        After a failure, initialization is retried on a later call once
+        the backoff (EMAIL_CLIENT_RETRY_SECONDS, doubled per failure) has
+        passed.
+        """
+        if self.client is not None:
             return
         
-        self._initialized = True
+        if not self.endpoint:
+            if not self._warned_unconfigured:
+                logger.warning("ACS_ENDPOINT not configured - email sending disabled")
+                self._warned_unconfigured = True
+            return
         
-        if not settings.ACS_ENDPOINT:
-            logger.warning("ACS_ENDPOINT not configured - email sending disabled")
-            self.client = None
+        if time.monotonic() < self._retry_at:
             return
         
-        try:
-            # Use ManagedIdentityCredential with short timeout to avoid hanging
-            credential = ManagedIdentityCredential(connection_timeout=5)
-            self.client = EmailClient(settings.ACS_ENDPOINT, credential)
-            logger.info("Email client initialized with Managed Identity")
-        except Exception as e:
-            logger.error(f"Failed to initialize email client: {str(e)}")
-            self.client = None
+        with self._client_lock:
+            if self.client is not None or time.monotonic() < self._retry_at:
+                return
+            try:
+                self.client = self._client_factory()
+                self._init_failures = 0
+                logger.info("Email client initialized with Managed Identity")
+            except Exception as e:
+                self._init_failures += 1
+                delay = min(
+                    settings.EMAIL_CLIENT_RETRY_SECONDS * 2 ** (self._init_failures - 1),
+                    settings.EMAIL_CLIENT_RETRY_MAX_SECONDS
+                )
+                self._retry_at = time.monotonic() + delay
+                logger.error(f"Failed to initialize email client (retrying in {delay:.0f}s): {str(e)}")
     
     def is_configured(self) -> bool:
         """Check if email service is properly configured"""
         self._ensure_client()  # Initialize client on first use
         return self.client is not None and self.sender_email is not None
     
+    def _send_blocking(self, message: dict) -> Any:
+        """Run one ACS send to completion (called on the email thread pool)"""
+        poller = self.client.begin_send(message)
+        return poller.result(timeout=self.send_timeout)
+    
+    @staticmethod
+    def _is_service_failure(error: Exception) -> bool:
+        """
+        Whether an error says ACS itself is unhealthy.
+        
+        Client errors (bad address, rejected content) are the caller's
+        problem and must not open the circuit; timeouts, transport errors,
+        throttling and 5xx responses are.
+        """
+        status_code = getattr(error, "status_code", None)
+        if status_code is not None and 400 <= status_code < 500 and status_code != 429:
+            return False
+        return True
+    
+    async def _send_message(self, message: dict, description: str) -> tuple[EmailStatus, Optional[str], Optional[str]]:
+        """
+        Send a message via ACS, recording its latency and outcome in the metrics.
+        
+        Args:
+            message: ACS message dict
+            description: What is being sent, for log messages
+        
+        Returns:
+            Tuple of (status, message_id, error_message)
+        """
+        start = time.perf_counter()
+        EMAIL_SENDS_IN_FLIGHT.inc()
+        try:
+            result = await self._send_via_acs(message, description)
+        finally:
+            EMAIL_SENDS_IN_FLIGHT.dec()
+        status = result[0].value
+        EMAIL_SENDS.labels(status).inc()
+        EMAIL_LATENCY.labels(status).observe(time.perf_counter() - start)
+        return result
+    
+    async def _send_via_acs(self, message: dict, description: str) -> tuple[EmailStatus, Optional[str], Optional[str]]:
+        """
+        Send a message via ACS without blocking the event loop.
+        
+        Args:
+            message: ACS message dict
+            description: What is being sent, for log messages
+        
+        Returns:
+            Tuple of (status, message_id, error_message)
+        """
+        if not self.circuit_breaker.allow_request():
+            logger.warning(f"Email circuit open - not sending {description}")
+            return (EmailStatus.FAILED, None, CIRCUIT_OPEN_ERROR)
+        
+        loop = asyncio.get_running_loop()
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(self._executor, self._send_blocking, message),
+                timeout=self.send_timeout
+            )
+        except asyncio.TimeoutError:
+            self.circuit_breaker.record_failure()
+            logger.error(f"Timed out after {self.send_timeout}s sending {description}")
+            return (EmailStatus.FAILED, None, f"Email send timed out after {self.send_timeout}s")
+        except Exception as e:
+            if self._is_service_failure(e):
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            logger.error(f"Failed to send {description}: {str(e)}", exc_info=True)
+            return (EmailStatus.FAILED, None, str(e))
+        
+        self.circuit_breaker.record_success()
+        
+        # Get message ID from the result
+        message_id = result.get('messageId') if isinstance(result, dict) else getattr(result, 'message_id', None)
+        
+        if message_id:
+            logger.info(f"Sent {description}. Message ID: {message_id}")
+            return (EmailStatus.SENT, message_id, None)
+        else:
+            logger.error(f"Send of {description} failed - no message ID returned. Result type: {type(result)}, Result: {result}")
+            return (EmailStatus.FAILED, None, "No message ID returned from ACS")
+    
     async def send_ticket_response(
         self,
         ticket_id: int,
@@ -109,43 +297,16 @@ class EmailService:
                 response_text=response_text,
                 sent_by=sent_by
             )
-            
-            # Create email message using dict structure (compatible with azure-communication-email SDK)
-            message = {
-                "senderAddress": self.sender_email,
-                "content": {
-                    "subject": subject,
-                    "plainText": text_body,
-                    "html": html_body
-                },
-                "recipients": {
-                    "to": [
-                        {
-                            "address": customer_email,
-                            "displayName": customer_name
-                        }
-                    ]
-                }
-            }
-            
-            # Send email via ACS
-            logger.info(f"Sending email to {customer_email} for ticket #{ticket_id}")
-            poller = self.client.begin_send(message)
-            result = poller.result()
-            
-            # Get message ID from the result
-            message_id = result.get('messageId') if isinstance(result, dict) else getattr(result, 'message_id', None)
-            
-            if message_id:
-                logger.info(f"Email sent successfully. Message ID: {message_id}")
-                return (EmailStatus.SENT, message_id, None)
-            else:
-                logger.error(f"Email send failed - no message ID returned. Result type: {type(result)}, Result: {result}")
-                return (EmailStatus.FAILED, None, "No message ID returned from ACS")
-        
         except Exception as e:
-            logger.error(f"Failed to send email: {str(e)}", exc_info=True)
+            logger.error(f"Failed to build email: {str(e)}", exc_info=True)
             return (EmailStatus.FAILED, None, str(e))
+        
+        # Create email message using dict structure (compatible with azure-communication-email SDK)
+        message = self._build_message(subject, text_body, html_body, customer_email, customer_name)
+        
+        # Send email via ACS
+        logger.info(f"Sending email to {customer_email} for ticket #{ticket_id}")
+        return await self._send_message(message, f"response email for ticket #{ticket_id}")
     
     async def send_ticket_confirmation(
         self,
@@ -200,43 +361,42 @@ class EmailService:
                 category=category,
                 priority=priority
             )
-            
-            # Create email message
-            message = {
-                "senderAddress": self.sender_email,
-                "content": {
-                    "subject": subject,
-                    "plainText": text_body,
-                    "html": html_body
-                },
-                "recipients": {
-                    "to": [
-                        {
-                            "address": customer_email,
-                            "displayName": customer_name
-                        }
-                    ]
-                }
-            }
-            
-            # Send email via ACS
-            logger.info(f"Sending confirmation email to {customer_email} for ticket #{ticket_id}")
-            poller = self.client.begin_send(message)
-            result = poller.result()
-            
-            # Get message ID from the result
-            message_id = result.get('messageId') if isinstance(result, dict) else getattr(result, 'message_id', None)
-            
-            if message_id:
-                logger.info(f"Confirmation email sent successfully. Message ID: {message_id}")
-                return (EmailStatus.SENT, message_id, None)
-            else:
-                logger.error(f"Confirmation email send failed - no message ID returned. Result type: {type(result)}, Result: {result}")
-                return (EmailStatus.FAILED, None, "No message ID returned from ACS")
-        
         except Exception as e:
-            logger.error(f"Failed to send confirmation email: {str(e)}", exc_info=True)
+            logger.error(f"Failed to build confirmation email: {str(e)}", exc_info=True)
             return (EmailStatus.FAILED, None, str(e))
+        
+        # Create email message
+        message = self._build_message(subject, text_body, html_body, customer_email, customer_name)
+        
+        # Send email via ACS
+        logger.info(f"Sending confirmation email to {customer_email} for ticket #{ticket_id}")
+        return await self._send_message(message, f"confirmation email for ticket #{ticket_id}")
+    
+    def _build_message(
+        self,
+        subject: str,
+        text_body: str,
+        html_body: str,
+        customer_email: str,
+        customer_name: str
+    ) -> dict:
+        """Build the ACS message dict for a single recipient"""
+        return {
+            "senderAddress": self.sender_email,
+            "content": {
+                "subject": subject,
+                "plainText": text_body,
+                "html": html_body
+            },
+            "recipients": {
+                "to": [
+                    {
+                        "address": customer_email,
+                        "displayName": customer_name
+                    }
+                ]
+            }
+        }
     
     def _build_email_html(
         self,
@@ -247,54 +407,9 @@ class EmailService:
         sent_by: Optional[str]
     ) -> str:
         """Build professional HTML email template"""
-        
-        return f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-</head>
-<body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px;">
-    
-    <!-- Header -->
-    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; text-align: center; border-radius: 8px 8px 0 0;">
-        <h1 style="color: white; margin: 0; font-size: 28px;">{self.company_name}</h1>
-        <p style="color: rgba(255,255,255,0.9); margin: 10px 0 0 0; font-size: 16px;">Case Response</p>
-    </div>
-    
-    <!-- Body -->
-    <div style="background: #ffffff; padding: 30px; border-left: 1px solid #e0e0e0; border-right: 1px solid #e0e0e0;">
-        <p style="font-size: 16px; margin-bottom: 20px;">Hello {customer_name},</p>
-        
-        <p style="font-size: 16px; margin-bottom: 20px;">We have an update regarding your case:</p>
-        
-        <!-- Case Details Box -->
-        <div style="background: #f5f5f5; border-left: 4px solid #667eea; padding: 15px; margin: 20px 0; border-radius: 4px;">
-            <p style="margin: 0 0 8px 0; font-weight: 600; color: #666; font-size: 14px;">CASE #{ticket_id}</p>
-            <p style="margin: 0; font-size: 16px; font-weight: 600; color: #333;">{ticket_title}</p>
-        </div>
-        
-        <!-- Response -->
-        <div style="background: #ffffff; border: 1px solid #e0e0e0; padding: 20px; margin: 20px 0; border-radius: 4px;">
-            <p style="font-weight: 600; margin: 0 0 12px 0; color: #667eea; font-size: 14px; text-transform: uppercase;">Response:</p>
-            <div style="white-space: pre-wrap; font-size: 15px; line-height: 1.6; color: #333;">{response_text}</div>
-        </div>
-        
-        <p style="font-size: 16px; margin-top: 20px;">If you have any questions or need further assistance, please don't hesitate to reach out.</p>
-        
-        {"<p style='font-size: 15px; margin-top: 25px;'>Best regards,<br><strong>" + sent_by + "</strong><br>" + self.company_name + "</p>" if sent_by else "<p style='font-size: 15px; margin-top: 25px;'>Best regards,<br><strong>" + self.company_name + " Team</strong></p>"}
-    </div>
-    
-    <!-- Footer -->
-    <div style="background: #f5f5f5; padding: 20px; text-align: center; border-radius: 0 0 8px 8px; border: 1px solid #e0e0e0; border-top: none;">
-        <p style="font-size: 13px; color: #666; margin: 0;">This is an automated message from {self.company_name}</p>
-        <p style="font-size: 13px; color: #666; margin: 8px 0 0 0;">Please do not reply to this email</p>
-    </div>
-    
-</body>
-</html>
-"""
+        return get_company_templates(self.company_name).render_response_html(
+            customer_name, ticket_id, ticket_title, response_text, sent_by
+        )
     
     def _build_email_text(
         self,
@@ -305,28 +420,9 @@ class EmailService:
         sent_by: Optional[str]
     ) -> str:
         """Build plain text email version (fallback)"""
-        
-        signature = f"\n\nBest regards,\n{sent_by}\n{self.company_name}" if sent_by else f"\n\nBest regards,\n{self.company_name} Team"
-        
-        return f"""
-{self.company_name} - Case Response
-
-Hello {customer_name},
-
-We have an update regarding your case:
-
-CASE #{ticket_id}: {ticket_title}
-
-Response:
-{response_text}
-
-If you have any questions or need further assistance, please don't hesitate to reach out.
-{signature}
-
----
-This is an automated message from {self.company_name}
-Please do not reply to this email
-"""
+        return get_company_templates(self.company_name).render_response_text(
+            customer_name, ticket_id, ticket_title, response_text, sent_by
+        )
     
     def _build_confirmation_html(
         self,
@@ -338,78 +434,9 @@ Please do not reply to this email
         priority: str
     ) -> str:
         """Build professional HTML confirmation email template"""
-        
-        priority_color = {
-            'low': '#10b981',
-            'medium': '#f59e0b',
-            'high': '#ef4444',
-            'critical': '#dc2626'
-        }.get(priority.lower(), '#667eea')
-        
-        return f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-</head>
-<body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px;">
-    
-    <!-- Header -->
-    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; text-align: center; border-radius: 8px 8px 0 0;">
-        <h1 style="color: white; margin: 0; font-size: 28px;">{self.company_name}</h1>
-        <p style="color: rgba(255,255,255,0.9); margin: 10px 0 0 0; font-size: 16px;">Case Confirmation</p>
-    </div>
-    
-    <!-- Body -->
-    <div style="background: #ffffff; padding: 30px; border-left: 1px solid #e0e0e0; border-right: 1px solid #e0e0e0;">
-        <p style="font-size: 16px; margin-bottom: 20px;">Hello {customer_name},</p>
-        
-        <p style="font-size: 16px; margin-bottom: 20px;">Thank you for contacting us. We have received your case and our team will review it shortly.</p>
-        
-        <!-- Case Details Box -->
-        <div style="background: #f5f5f5; border-left: 4px solid {priority_color}; padding: 20px; margin: 20px 0; border-radius: 4px;">
-            <p style="margin: 0 0 12px 0; font-weight: 600; color: #666; font-size: 14px;">CASE #{ticket_id}</p>
-            <h2 style="margin: 0 0 15px 0; font-size: 20px; color: #333;">{ticket_title}</h2>
-            
-            <div style="display: table; width: 100%; margin-top: 15px;">
-                <div style="display: table-row;">
-                    <div style="display: table-cell; padding: 8px 0; font-size: 14px; color: #666;">Category:</div>
-                    <div style="display: table-cell; padding: 8px 0; font-size: 14px; color: #333; font-weight: 600;">{category}</div>
-                </div>
-                <div style="display: table-row;">
-                    <div style="display: table-cell; padding: 8px 0; font-size: 14px; color: #666;">Priority:</div>
-                    <div style="display: table-cell; padding: 8px 0;">
-                        <span style="display: inline-block; padding: 4px 12px; background: {priority_color}; color: white; border-radius: 12px; font-size: 12px; font-weight: 600; text-transform: uppercase;">{priority}</span>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Description -->
-        {f'<div style="background: #ffffff; border: 1px solid #e0e0e0; padding: 20px; margin: 20px 0; border-radius: 4px;"><p style="font-weight: 600; margin: 0 0 12px 0; color: #667eea; font-size: 14px; text-transform: uppercase;">Your Message:</p><div style="white-space: pre-wrap; font-size: 15px; line-height: 1.6; color: #333;">{ticket_description}</div></div>' if ticket_description else ''}
-        
-        <div style="background: #e0f2fe; border-left: 4px solid #0284c7; padding: 15px; margin: 20px 0; border-radius: 4px;">
-            <p style="margin: 0; font-size: 14px; color: #0c4a6e;">
-                <strong>What happens next?</strong><br>
-                Our team will review your case and get back to you as soon as possible. You will receive an email notification when there's an update.
-            </p>
-        </div>
-        
-        <p style="font-size: 16px; margin-top: 25px;">If you have any urgent questions, please don't hesitate to contact us.</p>
-        
-        <p style="font-size: 15px; margin-top: 25px;">Best regards,<br><strong>{self.company_name} Team</strong></p>
-    </div>
-    
-    <!-- Footer -->
-    <div style="background: #f5f5f5; padding: 20px; text-align: center; border-radius: 0 0 8px 8px; border: 1px solid #e0e0e0; border-top: none;">
-        <p style="font-size: 13px; color: #666; margin: 0;">This is an automated confirmation from {self.company_name}</p>
-        <p style="font-size: 13px; color: #666; margin: 8px 0 0 0;">Please do not reply to this email</p>
-    </div>
-    
-</body>
-</html>
-"""
+        return get_company_templates(self.company_name).render_confirmation_html(
+            customer_name, ticket_id, ticket_title, ticket_description, category, priority
+        )
     
     def _build_confirmation_text(
         self,
@@ -421,40 +448,28 @@ Please do not reply to this email
         priority: str
     ) -> str:
         """Build plain text confirmation email version (fallback)"""
-        
-        description_section = f"\n\nYour Message:\n{ticket_description}\n" if ticket_description else ""
-        
-        return f"""
-{self.company_name} - Case Confirmation
-
-Hello {customer_name},
-
-Thank you for contacting us. We have received your case and our team will review it shortly.
-
-CASE #{ticket_id}: {ticket_title}
-
-Category: {category}
-Priority: {priority.upper()}
-{description_section}
+        return get_company_templates(self.company_name).render_confirmation_text(
+            customer_name, ticket_id, ticket_title, ticket_description, category, priority
+        )
 
-What happens next?
-Our team will review your case and get back to you as soon as possible. You will receive an email notification when there's an update.
 
-If you have any urgent questions, please don't hesitate to contact us.
-
-Best regards,
-{self.company_name} Team
-
----
-This is an automated confirmation from {self.company_name}
-Please do not reply to this email
-"""
-
-
-# Global email service instance
-email_service = EmailService()
+# Global email service instance, created on first use (see get_email_service)
+_email_service: Optional[EmailService] = None
+_email_service_lock = threading.Lock()
 
 
 def get_email_service() -> EmailService:
     """Dependency injection for email service"""
-    return email_service
+    global _email_service
+    if _email_service is None:
+        with _email_service_lock:
+            if _email_service is None:
+                _email_service = EmailService()
+    return _email_service
+
+
+def __getattr__(name: str) -> Any:
+    """Module attribute `email_service`: the global instance, created on first access"""
+    if name == "email_service":
+        return get_email_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
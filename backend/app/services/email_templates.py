@@ -0,0 +1,391 @@
+"""
+Precompiled email templates.
+
+Each template is parsed once, at import, into alternating static text
+segments and named slots. Rendering is a single join over those pieces,
+HTML-escaping slot values in the same pass (so customer-supplied text
+can't inject markup). Company-specific text - the header, footer and
+team signature - is bound once per company name and cached, so a send
+only fills the per-email slots.
+
+Slots use {name} syntax; write {{ and }} for literal braces.
+"""
+
+import html
+from functools import lru_cache
+from string import Formatter
+from typing import Any, List, Optional, Tuple
+
+
+class Markup(str):
+    """A string that is already safe HTML and must not be escaped again"""
+
+
+def _escape(value: Any) -> str:
+    """HTML-escape a slot value unless it's already Markup"""
+    if isinstance(value, Markup):
+        return value
+    return html.escape(str(value), quote=True)
+
+
+class EmailTemplate:
+    """
+    A template compiled into static segments and slots.
+    
+    Args:
+        source: Template text with {slot} placeholders
+        escape: HTML-escape slot values (HTML templates) or insert them
+            as-is (plain-text templates)
+    """
+
+    def __init__(self, source: str, escape: bool = True):
+        literals: List[str] = []
+        slots: List[str] = []
+        pending = ""
+        for literal, field, spec, conversion in Formatter().parse(source):
+            pending += literal
+            if field is None:
+                continue
+            if not field.isidentifier() or spec or conversion:
+                raise ValueError(f"Unsupported template placeholder {{{field}}}")
+            literals.append(pending)
+            slots.append(field)
+            pending = ""
+        literals.append(pending)
+        self._init(literals, slots, escape)
+
+    def _init(self, literals: List[str], slots: List[str], escape: bool) -> None:
+        # literals[i] precedes slots[i]; literals[-1] is the trailing text
+        self._literals = tuple(literals)
+        self._slots = tuple(slots)
+        self._pairs: Tuple[Tuple[str, str], ...] = tuple(zip(slots, literals[1:]))
+        self.escape = escape
+
+    @property
+    def slots(self) -> frozenset:
+        """Names of the slots still to be filled"""
+        return frozenset(self._slots)
+
+    def bind(self, **values: Any) -> "EmailTemplate":
+        """
+        Fill some slots now and return the partially rendered template.
+        
+        Used to prerender text that is the same for every email (e.g. the
+        company name), leaving only per-email slots for render().
+        """
+        escape = _escape if self.escape else str
+        literals = [self._literals[0]]
+        slots: List[str] = []
+        for slot, literal in self._pairs:
+            if slot in values:
+                literals[-1] += escape(values[slot]) + literal
+            else:
+                slots.append(slot)
+                literals.append(literal)
+
+        bound = EmailTemplate.__new__(EmailTemplate)
+        bound._init(literals, slots, self.escape)
+        return bound
+
+    def render(self, **values: Any) -> str:
+        """
+        Fill every slot and return the text.
+        
+        HTML templates return Markup, so a rendered fragment can be passed
+        into another template's slot without being escaped twice.
+        """
+        escape = _escape if self.escape else str
+        parts = [self._literals[0]]
+        for slot, literal in self._pairs:
+            parts.append(escape(values[slot]))
+            parts.append(literal)
+        text = "".join(parts)
+        return Markup(text) if self.escape else text
+
+
+# Response email
+RESPONSE_HTML = EmailTemplate("""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px;">
+    
+    <!-- Header -->
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; text-align: center; border-radius: 8px 8px 0 0;">
+        <h1 style="color: white; margin: 0; font-size: 28px;">{company_name}</h1>
+        <p style="color: rgba(255,255,255,0.9); margin: 10px 0 0 0; font-size: 16px;">Case Response</p>
+    </div>
+    
+    <!-- Body -->
+    <div style="background: #ffffff; padding: 30px; border-left: 1px solid #e0e0e0; border-right: 1px solid #e0e0e0;">
+        <p style="font-size: 16px; margin-bottom: 20px;">Hello {customer_name},</p>
+        
+        <p style="font-size: 16px; margin-bottom: 20px;">We have an update regarding your case:</p>
+        
+        <!-- Case Details Box -->
+        <div style="background: #f5f5f5; border-left: 4px solid #667eea; padding: 15px; margin: 20px 0; border-radius: 4px;">
+            <p style="margin: 0 0 8px 0; font-weight: 600; color: #666; font-size: 14px;">CASE #{ticket_id}</p>
+            <p style="margin: 0; font-size: 16px; font-weight: 600; color: #333;">{ticket_title}</p>
+        </div>
+        
+        <!-- Response -->
+        <div style="background: #ffffff; border: 1px solid #e0e0e0; padding: 20px; margin: 20px 0; border-radius: 4px;">
+            <p style="font-weight: 600; margin: 0 0 12px 0; color: #667eea; font-size: 14px; text-transform: uppercase;">Response:</p>
+            <div style="white-space: pre-wrap; font-size: 15px; line-height: 1.6; color: #333;">{response_text}</div>
+        </div>
+        
+        <p style="font-size: 16px; margin-top: 20px;">If you have any questions or need further assistance, please don't hesitate to reach out.</p>
+        
+        {signature}
+    </div>
+    
+    <!-- Footer -->
+    <div style="background: #f5f5f5; padding: 20px; text-align: center; border-radius: 0 0 8px 8px; border: 1px solid #e0e0e0; border-top: none;">
+        <p style="font-size: 13px; color: #666; margin: 0;">This is an automated message from {company_name}</p>
+        <p style="font-size: 13px; color: #666; margin: 8px 0 0 0;">Please do not reply to this email</p>
+    </div>
+    
+</body>
+</html>
+""")
+
+RESPONSE_TEXT = EmailTemplate("""
+{company_name} - Case Response
+
+Hello {customer_name},
+
+We have an update regarding your case:
+
+CASE #{ticket_id}: {ticket_title}
+
+Response:
+{response_text}
+
+If you have any questions or need further assistance, please don't hesitate to reach out.
+{signature}
+
+---
+This is an automated message from {company_name}
+Please do not reply to this email
+""", escape=False)
+
+SIGNATURE_HTML = EmailTemplate(
+    "<p style='font-size: 15px; margin-top: 25px;'>Best regards,<br><strong>{sent_by}</strong><br>{company_name}</p>"
+)
+TEAM_SIGNATURE_HTML = EmailTemplate(
+    "<p style='font-size: 15px; margin-top: 25px;'>Best regards,<br><strong>{company_name} Team</strong></p>"
+)
+SIGNATURE_TEXT = EmailTemplate("\n\nBest regards,\n{sent_by}\n{company_name}", escape=False)
+TEAM_SIGNATURE_TEXT = EmailTemplate("\n\nBest regards,\n{company_name} Team", escape=False)
+
+
+# Confirmation email
+CONFIRMATION_HTML = EmailTemplate("""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px;">
+    
+    <!-- Header -->
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; text-align: center; border-radius: 8px 8px 0 0;">
+        <h1 style="color: white; margin: 0; font-size: 28px;">{company_name}</h1>
+        <p style="color: rgba(255,255,255,0.9); margin: 10px 0 0 0; font-size: 16px;">Case Confirmation</p>
+    </div>
+    
+    <!-- Body -->
+    <div style="background: #ffffff; padding: 30px; border-left: 1px solid #e0e0e0; border-right: 1px solid #e0e0e0;">
+        <p style="font-size: 16px; margin-bottom: 20px;">Hello {customer_name},</p>
+        
+        <p style="font-size: 16px; margin-bottom: 20px;">Thank you for contacting us. We have received your case and our team will review it shortly.</p>
+        
+        <!-- Case Details Box -->
+        <div style="background: #f5f5f5; border-left: 4px solid {priority_color}; padding: 20px; margin: 20px 0; border-radius: 4px;">
+            <p style="margin: 0 0 12px 0; font-weight: 600; color: #666; font-size: 14px;">CASE #{ticket_id}</p>
+            <h2 style="margin: 0 0 15px 0; font-size: 20px; color: #333;">{ticket_title}</h2>
+            
+            <div style="display: table; width: 100%; margin-top: 15px;">
+                <div style="display: table-row;">
+                    <div style="display: table-cell; padding: 8px 0; font-size: 14px; color: #666;">Category:</div>
+                    <div style="display: table-cell; padding: 8px 0; font-size: 14px; color: #333; font-weight: 600;">{category}</div>
+                </div>
+                <div style="display: table-row;">
+                    <div style="display: table-cell; padding: 8px 0; font-size: 14px; color: #666;">Priority:</div>
+                    <div style="display: table-cell; padding: 8px 0;">
+                        <span style="display: inline-block; padding: 4px 12px; background: {priority_color}; color: white; border-radius: 12px; font-size: 12px; font-weight: 600; text-transform: uppercase;">{priority}</span>
+                    </div>
+                </div>
+            </div>
+        </div>
+        
+        <!-- Description -->
+        {description_block}
+        
+        <div style="background: #e0f2fe; border-left: 4px solid #0284c7; padding: 15px; margin: 20px 0; border-radius: 4px;">
+            <p style="margin: 0; font-size: 14px; color: #0c4a6e;">
+                <strong>What happens next?</strong><br>
+                Our team will review your case and get back to you as soon as possible. You will receive an email notification when there's an update.
+            </p>
+        </div>
+        
+        <p style="font-size: 16px; margin-top: 25px;">If you have any urgent questions, please don't hesitate to contact us.</p>
+        
+        <p style="font-size: 15px; margin-top: 25px;">Best regards,<br><strong>{company_name} Team</strong></p>
+    </div>
+    
+    <!-- Footer -->
+    <div style="background: #f5f5f5; padding: 20px; text-align: center; border-radius: 0 0 8px 8px; border: 1px solid #e0e0e0; border-top: none;">
+        <p style="font-size: 13px; color: #666; margin: 0;">This is an automated confirmation from {company_name}</p>
+        <p style="font-size: 13px; color: #666; margin: 8px 0 0 0;">Please do not reply to this email</p>
+    </div>
+    
+</body>
+</html>
+""")
+
+CONFIRMATION_TEXT = EmailTemplate("""
+{company_name} - Case Confirmation
+
+Hello {customer_name},
+
+Thank you for contacting us. We have received your case and our team will review it shortly.
+
+CASE #{ticket_id}: {ticket_title}
+
+Category: {category}
+Priority: {priority}
+{description_section}
+
+What happens next?
+Our team will review your case and get back to you as soon as possible. You will receive an email notification when there's an update.
+
+If you have any urgent questions, please don't hesitate to contact us.
+
+Best regards,
+{company_name} Team
+
+---
+This is an automated confirmation from {company_name}
+Please do not reply to this email
+""", escape=False)
+
+DESCRIPTION_HTML = EmailTemplate(
+    '<div style="background: #ffffff; border: 1px solid #e0e0e0; padding: 20px; margin: 20px 0; border-radius: 4px;"><p style="font-weight: 600; margin: 0 0 12px 0; color: #667eea; font-size: 14px; text-transform: uppercase;">Your Message:</p><div style="white-space: pre-wrap; font-size: 15px; line-height: 1.6; color: #333;">{ticket_description}</div></div>'
+)
+DESCRIPTION_TEXT = EmailTemplate("\n\nYour Message:\n{ticket_description}\n", escape=False)
+
+
+PRIORITY_COLORS = {
+    'low': '#10b981',
+    'medium': '#f59e0b',
+    'high': '#ef4444',
+    'critical': '#dc2626'
+}
+DEFAULT_PRIORITY_COLOR = '#667eea'
+
+
+class CompanyTemplates:
+    """All email templates with one company's name already rendered in"""
+
+    def __init__(self, company_name: str):
+        self.company_name = company_name
+        self.response_html = RESPONSE_HTML.bind(company_name=company_name)
+        self.response_text = RESPONSE_TEXT.bind(company_name=company_name)
+        self.signature_html = SIGNATURE_HTML.bind(company_name=company_name)
+        self.signature_text = SIGNATURE_TEXT.bind(company_name=company_name)
+        self.team_signature_html = TEAM_SIGNATURE_HTML.render(company_name=company_name)
+        self.team_signature_text = TEAM_SIGNATURE_TEXT.render(company_name=company_name)
+        self.confirmation_html = CONFIRMATION_HTML.bind(company_name=company_name)
+        self.confirmation_text = CONFIRMATION_TEXT.bind(company_name=company_name)
+
+    def render_response_html(
+        self,
+        customer_name: str,
+        ticket_id: int,
+        ticket_title: str,
+        response_text: str,
+        sent_by: Optional[str]
+    ) -> str:
+        """HTML body of a response email"""
+        signature = self.signature_html.render(sent_by=sent_by) if sent_by else self.team_signature_html
+        return self.response_html.render(
+            customer_name=customer_name,
+            ticket_id=ticket_id,
+            ticket_title=ticket_title,
+            response_text=response_text,
+            signature=signature
+        )
+
+    def render_response_text(
+        self,
+        customer_name: str,
+        ticket_id: int,
+        ticket_title: str,
+        response_text: str,
+        sent_by: Optional[str]
+    ) -> str:
+        """Plain-text body of a response email"""
+        signature = self.signature_text.render(sent_by=sent_by) if sent_by else self.team_signature_text
+        return self.response_text.render(
+            customer_name=customer_name,
+            ticket_id=ticket_id,
+            ticket_title=ticket_title,
+            response_text=response_text,
+            signature=signature
+        )
+
+    def render_confirmation_html(
+        self,
+        customer_name: str,
+        ticket_id: int,
+        ticket_title: str,
+        ticket_description: str,
+        category: str,
+        priority: str
+    ) -> str:
+        """HTML body of a confirmation email"""
+        description_block = (
+            DESCRIPTION_HTML.render(ticket_description=ticket_description) if ticket_description else Markup()
+        )
+        return self.confirmation_html.render(
+            customer_name=customer_name,
+            ticket_id=ticket_id,
+            ticket_title=ticket_title,
+            category=category,
+            priority=priority,
+            priority_color=PRIORITY_COLORS.get(priority.lower(), DEFAULT_PRIORITY_COLOR),
+            description_block=description_block
+        )
+
+    def render_confirmation_text(
+        self,
+        customer_name: str,
+        ticket_id: int,
+        ticket_title: str,
+        ticket_description: str,
+        category: str,
+        priority: str
+    ) -> str:
+        """Plain-text body of a confirmation email"""
+        description_section = (
+            DESCRIPTION_TEXT.render(ticket_description=ticket_description) if ticket_description else ""
+        )
+        return self.confirmation_text.render(
+            customer_name=customer_name,
+            ticket_id=ticket_id,
+            ticket_title=ticket_title,
+            category=category,
+            priority=priority.upper(),
+            description_section=description_section
+        )
+
+
+@lru_cache(maxsize=16)
+def get_company_templates(company_name: str) -> CompanyTemplates:
+    """Templates prerendered for a company (built once per name, then cached)"""
+    return CompanyTemplates(company_name)
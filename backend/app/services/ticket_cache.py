@@ -0,0 +1,199 @@
+"""
+Read-through cache of serialized tickets.
+
+GET /tickets/{id} and the email routes keep loading the same few hot
+tickets (the open modal re-reads its ticket over and over). The cache
+keeps each ticket's finished JSON payload - the exact bytes the API
+returns - so a hit skips both the database and serialization.
+
+Entries expire after TICKET_CACHE_TTL_SECONDS and the least recently
+used are evicted beyond TICKET_CACHE_MAX_ENTRIES. Writers invalidate the
+ticket they changed after committing. A read that raced with a write
+never re-caches the old version: each fill carries the invalidation
+sequence number it started at, and fills older than the last
+invalidation of that ticket are dropped.
+
+Storage is behind CacheBackend so a shared backend (e.g. Redis) can
+replace the in-process MemoryCacheBackend to share one cache across
+workers.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import Ticket
+from ..schemas import TicketResponse
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """Storage for cached payloads"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """The value for key, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store a value for ttl seconds"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a key (no error if missing)"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove everything"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Counters for monitoring (at least hits, misses, evictions)"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0  # Dropped to make room (LRU)
+        self._expirations = 0  # Dropped because their TTL ran out
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+
+class TicketCache:
+    """Serialized TicketResponse payloads by ticket ID"""
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: Optional[float] = None):
+        self.backend = backend or MemoryCacheBackend(settings.TICKET_CACHE_MAX_ENTRIES)
+        self.ttl = settings.TICKET_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._sequence = itertools.count(1)
+        self._current = 0
+        # ticket ID -> sequence number of its last invalidation (bounded);
+        # _floor is the newest sequence number dropped from it
+        self._invalidated: "OrderedDict[int, int]" = OrderedDict()
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Caching is off when the TTL is 0"""
+        return self.ttl > 0
+
+    @staticmethod
+    def _key(ticket_id: int) -> str:
+        return f"ticket:{ticket_id}"
+
+    @staticmethod
+    def serialize(ticket: Ticket) -> bytes:
+        """The JSON the API returns for a ticket"""
+        return TicketResponse.model_validate(ticket).model_dump_json().encode("utf-8")
+
+    def _fill(self, ticket_id: int, payload: bytes, started_at: int) -> None:
+        """Cache a payload loaded since sequence started_at, unless the ticket changed meanwhile"""
+        with self._lock:
+            if started_at < self._floor or self._invalidated.get(ticket_id, 0) > started_at:
+                return
+        self.backend.set(self._key(ticket_id), payload, self.ttl)
+
+    async def get(self, db: AsyncSession, ticket_id: int) -> Optional[bytes]:
+        """A ticket's JSON payload, from the cache or the database (None if it doesn't exist)"""
+        if not self.enabled:
+            ticket = await db.get(Ticket, ticket_id)
+            return self.serialize(ticket) if ticket else None
+
+        payload = self.backend.get(self._key(ticket_id))
+        if payload is not None:
+            return payload
+
+        with self._lock:
+            started_at = self._current
+        ticket = await db.get(Ticket, ticket_id)
+        if ticket is None:
+            return None
+        payload = self.serialize(ticket)
+        self._fill(ticket_id, payload, started_at)
+        return payload
+
+    def invalidate(self, ticket_id: int) -> None:
+        """Drop a ticket's entry - call after committing a change to it"""
+        with self._lock:
+            self._current = next(self._sequence)
+            self._invalidated[ticket_id] = self._current
+            self._invalidated.move_to_end(ticket_id)
+            max_tracked = max(settings.TICKET_CACHE_MAX_ENTRIES, 1)
+            while len(self._invalidated) > max_tracked:
+                _, dropped = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, dropped)
+        self.backend.delete(self._key(ticket_id))
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Backend counters (hits, misses, evictions, ...)"""
+        return self.backend.stats()
+
+
+# Global cache instance
+ticket_cache = TicketCache()
+
+
+def get_ticket_cache() -> TicketCache:
+    """Dependency injection for the ticket cache"""
+    return ticket_cache
@@ -0,0 +1,176 @@
+"""
+In-process cache of ticket counts.
+
+Column headers and dashboards need "how many tickets per status" (and
+per status within each category, department or assignee). Counting
+means a full table scan, so the counts are kept in memory instead.
+Ticket routes adjust them after each create, update and delete commits,
+and reading them costs nothing but copying a small dict.
+
+Writes made elsewhere, such as other API processes, scripts or manual
+SQL, aren't seen by this process. A background task reconciles the
+cache with the database every TICKET_COUNTS_RECONCILE_SECONDS, so any
+drift heals itself.
+
+A reconcile's GROUP BY can take a while on a big table, and writes keep
+being applied meanwhile. Those changes would be lost if the snapshot
+simply replaced the counts. So changes applied while a reconcile runs
+are recorded and replayed onto the snapshot. Routes apply a change
+right after its commit. A change whose commit lands just before the
+snapshot but whose apply comes after the reconcile started is counted
+twice. That gap is a single commit round trip, and the next reconcile
+corrects it.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from ..database import AsyncSessionLocal
+from ..models import Ticket
+
+logger = logging.getLogger(__name__)
+
+# Dimensions counts can be broken down by (besides status)
+GROUP_FIELDS = ("category", "department", "assigned_to")
+
+
+class CountKey(NamedTuple):
+    """The ticket fields counts are kept for"""
+    status: str
+    category: str
+    department: Optional[str]
+    assigned_to: Optional[str]
+
+
+def ticket_count_key(ticket: Any) -> CountKey:
+    """The count key of a ticket (ORM object or row)"""
+    return CountKey(ticket.status, ticket.category, ticket.department, ticket.assigned_to)
+
+
+class TicketCounter:
+    """Ticket counts by status, overall and per category/department/assignee"""
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._by_status: Counter = Counter()
+        # field -> Counter of (value, status)
+        self._by_group: Dict[str, Counter] = {field: Counter() for field in GROUP_FIELDS}
+        self._loaded = False
+        self._task: Optional[asyncio.Task] = None
+        # One list per running reconcile: changes applied since it started
+        self._journals: List[List[Tuple[Optional[CountKey], Optional[CountKey]]]] = []
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the counts have been loaded from the database yet"""
+        return self._loaded
+
+    @staticmethod
+    def _add(by_status: Counter, by_group: Dict[str, Counter], key: CountKey, delta: int) -> None:
+        by_status[key.status] += delta
+        for field in GROUP_FIELDS:
+            by_group[field][(getattr(key, field), key.status)] += delta
+
+    @classmethod
+    def _apply_to(
+        cls, by_status: Counter, by_group: Dict[str, Counter], old: Optional[CountKey], new: Optional[CountKey]
+    ) -> None:
+        if old is not None:
+            cls._add(by_status, by_group, old, -1)
+        if new is not None:
+            cls._add(by_status, by_group, new, 1)
+
+    def apply(self, old: Optional[CountKey], new: Optional[CountKey]) -> None:
+        """Adjust the counts for a committed change (old=None: created, new=None: deleted)"""
+        if old == new:
+            return
+        with self._lock:
+            self._apply_to(self._by_status, self._by_group, old, new)
+            for journal in self._journals:
+                journal.append((old, new))
+
+    def by_status(self) -> Dict[str, int]:
+        """{status: count}"""
+        with self._lock:
+            return {status: count for status, count in self._by_status.items() if count > 0}
+
+    def by_group(self, field: str) -> Dict[Optional[str], Dict[str, int]]:
+        """{field value: {status: count}}"""
+        groups: Dict[Optional[str], Dict[str, int]] = {}
+        with self._lock:
+            for (value, status), count in self._by_group[field].items():
+                if count > 0:
+                    groups.setdefault(value, {})[status] = count
+        return groups
+
+    async def reconcile(self) -> None:
+        """Replace the counts with fresh ones from the database (plus the changes applied meanwhile)"""
+        journal: List[Tuple[Optional[CountKey], Optional[CountKey]]] = []
+        with self._lock:
+            self._journals.append(journal)
+        try:
+            async with self.session_factory() as db:
+                rows = (await db.execute(
+                    select(Ticket.status, Ticket.category, Ticket.department, Ticket.assigned_to, func.count())
+                    .group_by(Ticket.status, Ticket.category, Ticket.department, Ticket.assigned_to)
+                )).all()
+        except BaseException:
+            with self._lock:
+                self._journals.remove(journal)
+            raise
+
+        by_status: Counter = Counter()
+        by_group: Dict[str, Counter] = {field: Counter() for field in GROUP_FIELDS}
+        for *fields, count in rows:
+            self._add(by_status, by_group, CountKey(*fields), count)
+
+        with self._lock:
+            self._journals.remove(journal)
+            for old, new in journal:
+                self._apply_to(by_status, by_group, old, new)
+            if self._loaded and +by_status != +self._by_status:
+                logger.info("Ticket counts drifted from the database - reconciled")
+            self._by_status = by_status
+            self._by_group = by_group
+            self._loaded = True
+
+    async def _reconcile_loop(self, interval: float) -> None:
+        """Reconcile every interval seconds until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Ticket count reconciliation failed: {str(e)}", exc_info=True)
+
+    async def start(self, interval: float) -> None:
+        """Load the counts and start periodic reconciliation on the running loop"""
+        try:
+            await self.reconcile()
+        except Exception as e:
+            # Loaded on first use instead
+            logger.error(f"Loading ticket counts failed: {str(e)}", exc_info=True)
+        if interval > 0:
+            self._task = asyncio.create_task(self._reconcile_loop(interval))
+
+    async def stop(self) -> None:
+        """Stop periodic reconciliation"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# Global counter instance
+ticket_counter = TicketCounter()
+
+
+def get_ticket_counter() -> TicketCounter:
+    """Dependency injection for the ticket counter"""
+    return ticket_counter
@@ -0,0 +1,81 @@
+"""
+A ticket together with a page of its response history.
+
+Opening a case needs the ticket and its latest responses. Loading them
+separately costs two queries (plus the existence check the responses
+route used to do first). Here one statement joins the ticket to a
+newest-first, keyset-paginated page of its responses:
+
+    SELECT tickets.*, page.* FROM tickets
+    LEFT OUTER JOIN (
+        SELECT * FROM ticket_responses WHERE ticket_id = :id
+          [AND (created_at, id) < :cursor]
+        ORDER BY created_at DESC, id DESC LIMIT :limit + 1
+    ) AS page ON page.ticket_id = tickets.id
+    WHERE tickets.id = :id
+
+The page is served by ix_ticket_responses_ticket_id_created_at_id, so
+long conversations cost the same per page as short ones. No row means
+no ticket; a single row with NULL response columns means no responses.
+"""
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from ..models import Ticket, TicketResponse
+from ..pagination import encode_cursor
+
+# Responses per page of a ticket's history
+DEFAULT_RESPONSE_PAGE_SIZE = 20
+MAX_RESPONSE_PAGE_SIZE = 500
+
+
+def ticket_detail_query(
+    ticket_id: int,
+    after: Optional[Tuple] = None,
+    limit: Optional[int] = DEFAULT_RESPONSE_PAGE_SIZE
+) -> Select:
+    """The ticket joined to up to `limit` + 1 of its responses older than `after` (all if limit is None)"""
+    page = select(TicketResponse).where(TicketResponse.ticket_id == ticket_id)
+    if after is not None:
+        page = page.where(tuple_(TicketResponse.created_at, TicketResponse.id) < tuple_(*after))
+    page = page.order_by(TicketResponse.created_at.desc(), TicketResponse.id.desc())
+    if limit is not None:
+        page = page.limit(limit + 1)  # One extra to find out whether another page exists
+    response = aliased(TicketResponse, page.subquery("page"))
+
+    return (
+        select(Ticket, response)
+        .outerjoin(response, response.ticket_id == Ticket.id)
+        .where(Ticket.id == ticket_id)
+        .order_by(response.created_at.desc(), response.id.desc())
+    )
+
+
+async def load_ticket_detail(
+    db: AsyncSession,
+    ticket_id: int,
+    after: Optional[Tuple] = None,
+    limit: Optional[int] = DEFAULT_RESPONSE_PAGE_SIZE
+) -> Optional[Tuple[Ticket, List[TicketResponse], Optional[str]]]:
+    """
+    (ticket, responses newest first, cursor for the next page) in one query,
+    or None if the ticket doesn't exist.
+
+    The cursor is None on the last page.
+    """
+    rows = (await db.execute(ticket_detail_query(ticket_id, after, limit))).all()
+    if not rows:
+        return None
+
+    ticket = rows[0][0]
+    responses = [response for _, response in rows if response is not None]
+    next_cursor = None
+    if limit is not None and len(responses) > limit:
+        responses = responses[:limit]
+        last = responses[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return ticket, responses, next_cursor
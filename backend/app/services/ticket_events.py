@@ -0,0 +1,134 @@
+"""
+In-process fan-out hub for ticket change events.
+
+Routes publish a compact event after each ticket mutation commits, and
+every open /api/tickets/stream connection receives a copy. Each
+subscriber has its own bounded queue: publishing never waits on a
+consumer, and a subscriber whose queue fills up is evicted (told to
+resync) rather than allowed to stall the producers.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Event types
+TICKET_CREATED = "ticket.created"
+TICKET_UPDATED = "ticket.updated"
+TICKET_DELETED = "ticket.deleted"
+TICKET_RESPONDED = "ticket.responded"
+
+# Sent as the final event to a subscriber that fell too far behind
+SUBSCRIBER_EVICTED = "stream.evicted"
+
+
+class Subscriber:
+    """One stream consumer: a bounded queue bound to the consumer's event loop"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.evicted = False
+
+    async def get(self) -> Dict[str, Any]:
+        """Wait for the next event"""
+        return await self.queue.get()
+
+
+class TicketEventHub:
+    """Broadcasts ticket change events to all current subscribers"""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of connected subscribers"""
+        return len(self._subscribers)
+
+    @property
+    def queued_events(self) -> int:
+        """Events waiting in subscriber queues"""
+        with self._lock:
+            return sum(subscriber.queue.qsize() for subscriber in self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        """Register a new subscriber. Must be called from the consumer's event loop."""
+        subscriber = Subscriber(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber (safe to call more than once)"""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event_type: str, ticket_id: int, **data: Any) -> None:
+        """
+        Broadcast an event without blocking.
+
+        Safe to call from the event loop or from a threadpool worker.
+        """
+        event = {
+            "id": next(self._sequence),
+            "type": event_type,
+            "ticket_id": ticket_id,
+            "at": datetime.now(timezone.utc).isoformat(),
+            **data,
+        }
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        try:
+            current_loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+
+        for subscriber in subscribers:
+            if subscriber.loop is current_loop:
+                self._offer(subscriber, event)
+            else:
+                try:
+                    subscriber.loop.call_soon_threadsafe(self._offer, subscriber, event)
+                except RuntimeError:
+                    # Subscriber's loop has shut down
+                    self.unsubscribe(subscriber)
+
+    def _offer(self, subscriber: Subscriber, event: Dict[str, Any]) -> None:
+        """Queue an event for one subscriber, evicting it if its queue is full"""
+        if subscriber.evicted:
+            return
+        try:
+            subscriber.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._evict(subscriber)
+
+    def _evict(self, subscriber: Subscriber) -> None:
+        """Drop a slow subscriber: discard its backlog and leave only an eviction notice"""
+        subscriber.evicted = True
+        self.unsubscribe(subscriber)
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait({"id": next(self._sequence), "type": SUBSCRIBER_EVICTED})
+        logger.warning("Evicted slow ticket stream subscriber")
+
+
+# Global event hub instance
+ticket_event_hub = TicketEventHub(queue_size=settings.TICKET_STREAM_QUEUE_SIZE)
+
+
+def get_ticket_event_hub() -> TicketEventHub:
+    """Dependency injection for the ticket event hub"""
+    return ticket_event_hub
@@ -0,0 +1,170 @@
+"""
+Streaming ticket export (NDJSON or CSV) with response history.
+
+Month-end reporting needs every ticket with its responses. Building that
+as one list grows memory with the table, so the export reads a single
+ticket LEFT JOIN response query through a server-side cursor
+(AsyncSession.stream with yield_per) and writes each fetched batch to
+the response before fetching the next. Rows are plain Core rows - no
+ORM identity map accumulating objects - so memory stays flat however
+many tickets there are, and the first bytes go out as soon as the first
+batch arrives.
+
+The query is ordered by ticket ID and then response, so a ticket's
+responses are consecutive rows and are grouped as they stream past.
+
+NDJSON has one ticket per line, with its responses nested. CSV has one
+line per ticket and response (ticket columns repeated, response columns
+prefixed with response_), or one line with empty response columns for
+tickets without responses.
+"""
+
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import select
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models import Ticket, TicketResponse
+from ..schemas import EmailResponseResponse, TicketExport
+from ..schemas import TicketResponse as TicketSchema
+
+FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+TICKET_FIELDS = list(TicketSchema.model_fields)
+RESPONSE_FIELDS = list(EmailResponseResponse.model_fields)
+RESPONSE_PREFIX = "response_"
+
+_RESPONSE_COLUMNS = [
+    getattr(TicketResponse, field).label(f"{RESPONSE_PREFIX}{field}") for field in RESPONSE_FIELDS
+]
+
+
+def export_query(
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_responses: bool = True
+):
+    """Tickets (joined with their responses) in ID order, optionally filtered"""
+    columns = [getattr(Ticket, field) for field in TICKET_FIELDS]
+    if include_responses:
+        query = (
+            select(*columns, *_RESPONSE_COLUMNS)
+            .outerjoin(TicketResponse, TicketResponse.ticket_id == Ticket.id)
+            .order_by(Ticket.id, TicketResponse.created_at, TicketResponse.id)
+        )
+    else:
+        query = select(*columns).order_by(Ticket.id)
+
+    if status:
+        query = query.where(Ticket.status == status)
+    if category:
+        query = query.where(Ticket.category == category)
+    if created_from:
+        query = query.where(Ticket.created_at >= created_from)
+    if created_to:
+        query = query.where(Ticket.created_at < created_to)
+    return query
+
+
+def _response(row: Any) -> Optional[EmailResponseResponse]:
+    """The response part of a joined row (None for tickets without responses)"""
+    if getattr(row, f"{RESPONSE_PREFIX}id") is None:
+        return None
+    return EmailResponseResponse.model_validate({
+        field: getattr(row, f"{RESPONSE_PREFIX}{field}") for field in RESPONSE_FIELDS
+    })
+
+
+async def _tickets(
+    session_factory, query, include_responses: bool, batch_size: int
+) -> AsyncIterator[List[TicketExport]]:
+    """
+    Stream tickets with their responses, one fetched batch at a time.
+
+    A ticket whose responses continue into the next batch is held back
+    until they're complete.
+    """
+    current: Optional[TicketExport] = None
+
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            finished = []
+            for row in rows:
+                if current is None or current.id != row.id:
+                    if current is not None:
+                        finished.append(current)
+                    current = TicketExport.model_validate(row)
+                if include_responses:
+                    response = _response(row)
+                    if response is not None:
+                        current.responses.append(response)
+            if finished:
+                yield finished
+
+    if current is not None:
+        yield [current]
+
+
+def _csv_values(data: Dict[str, Any], fields: List[str]) -> List[Any]:
+    """JSON-mode values as CSV cells (lists comma-joined, None empty)"""
+    values = []
+    for field in fields:
+        value = data.get(field)
+        if isinstance(value, list):
+            value = ",".join(str(item) for item in value)
+        values.append("" if value is None else value)
+    return values
+
+
+async def export_tickets(
+    format: str,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_responses: bool = True,
+    session_factory=AsyncSessionLocal,
+    batch_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    The export as a stream of byte chunks (one per fetched batch).
+
+    Opens its own session: a StreamingResponse body runs after the
+    request's dependencies have finished.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown export format '{format}' (expected {' or '.join(FORMATS)})")
+    query = export_query(status, category, created_from, created_to, include_responses)
+    batch_size = batch_size or settings.TICKET_EXPORT_BATCH_SIZE
+
+    if format == "ndjson":
+        async for tickets in _tickets(session_factory, query, include_responses, batch_size):
+            yield "".join(ticket.model_dump_json() + "\n" for ticket in tickets).encode("utf-8")
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header = TICKET_FIELDS + ([f"{RESPONSE_PREFIX}{field}" for field in RESPONSE_FIELDS] if include_responses else [])
+    writer.writerow(header)
+    async for tickets in _tickets(session_factory, query, include_responses, batch_size):
+        for ticket in tickets:
+            data = ticket.model_dump(mode="json")
+            ticket_values = _csv_values(data, TICKET_FIELDS)
+            if not include_responses:
+                writer.writerow(ticket_values)
+                continue
+            for response in data["responses"] or [None]:
+                writer.writerow(ticket_values + _csv_values(response or {}, RESPONSE_FIELDS))
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,343 @@
+"""
+Bulk ticket import from CSV or NDJSON.
+
+Migrating cases from the old system one POST /api/tickets/ at a time
+costs a commit and a refresh per ticket. The importer stream-parses the
+file instead (only the current batch is held in memory), validates each
+row against TicketCreate and inserts the valid ones
+TICKET_IMPORT_BATCH_SIZE at a time: one executemany and one commit per
+batch. Invalid rows are skipped and reported by line number.
+
+Imported tickets get the same bookkeeping as created ones: ticket
+numbers (allocated a batch at a time), analytics rollups in the batch's
+transaction, ticket counts and change events once it commits, and the
+search index through its triggers. Confirmation
+emails are optional - migrated customers usually shouldn't get a "case
+received" email for an old case.
+
+CSV files need a header row of TicketCreate field names; empty cells
+count as missing and `tags` is comma-separated. NDJSON files hold one
+JSON object per line.
+
+Import from the command line:
+    python -m app.services.ticket_import tickets.csv [--no-confirmations]
+"""
+
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models import Ticket, TicketResponse, TicketStatus, utcnow
+from ..schemas import TicketCreate, TicketImportError, TicketImportResult
+from .analytics import FACT_COLUMNS, apply_ticket_changes, ticket_facts
+from .email_outbox import confirmation_values
+from .email_service import EmailService, get_email_service
+from .ticket_counts import TicketCounter, get_ticket_counter, ticket_count_key
+from .ticket_events import TICKET_CREATED, TicketEventHub, get_ticket_event_hub
+from .ticket_numbers import TicketNumberAllocator, get_ticket_number_allocator
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson")
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+FILE_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+# Columns read back from inserted tickets: rollup facts, count key and confirmation email fields
+RETURNED_COLUMNS = tuple(dict.fromkeys((
+    Ticket.id, *FACT_COLUMNS, Ticket.assigned_to,
+    Ticket.title, Ticket.description, Ticket.customer_name, Ticket.customer_email,
+)))
+
+# CSV columns holding comma-separated lists
+LIST_FIELDS = ("tags",)
+
+CHUNK_SIZE = 64 * 1024
+
+# (line number, field values or None, error or None)
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def format_for_content_type(content_type: Optional[str]) -> Optional[str]:
+    """The import format for a Content-Type header, if it names one"""
+    if not content_type:
+        return None
+    return CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a UTF-8 byte stream (BOM allowed) into lines, keeping the line endings"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    """One JSON object per line; blank lines are skipped"""
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            values = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(values, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, values, None
+
+
+def _ends_quoted(line: str, quoted: bool) -> bool:
+    """
+    Whether a CSV line ends inside a quoted field, given whether it starts
+    inside one.
+
+    Follows csv.reader: a quote opens a quoted field only at the start of
+    a field, "" inside one is a literal quote, and anywhere else a quote
+    is an ordinary character (5" monitor).
+    """
+    field_start = not quoted
+    closed = False  # Just after a closing quote (or the first half of "")
+    for char in line:
+        if quoted:
+            if char == '"':
+                quoted, closed = False, True
+            continue
+        if char == '"' and (closed or field_start):
+            quoted, closed = True, False
+            continue
+        closed = False
+        field_start = char == ","
+    return quoted
+
+
+async def parse_csv(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    """
+    CSV with a header row.
+
+    Quoted fields may span lines: a record ends at the first line break
+    outside a quoted field.
+    """
+    header: Optional[List[str]] = None
+    record = ""
+    quoted = False
+    record_start = line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not record:
+            record_start = line_number
+        record += line
+        quoted = _ends_quoted(line, quoted)
+        if quoted:
+            continue  # The line break belongs to a quoted field
+
+        text, record = record, ""
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as e:
+            yield record_start, None, f"Invalid CSV: {str(e)}"
+            continue
+
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield record_start, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+
+        row = {name: value for name, value in zip(header, values) if value != ""}
+        for field in LIST_FIELDS:
+            if field in row:
+                row[field] = [item.strip() for item in row[field].split(",") if item.strip()]
+        yield record_start, row, None
+
+    if record.strip():
+        yield record_start, None, "Invalid CSV: unterminated quoted field"
+
+
+def parse_rows(chunks: AsyncIterator[bytes], format: str) -> AsyncIterator[ParsedRow]:
+    """Parse a CSV or NDJSON byte stream into rows"""
+    if format not in FORMATS:
+        raise ValueError(f"Unknown import format '{format}' (expected {' or '.join(FORMATS)})")
+    parse = parse_csv if format == "csv" else parse_ndjson
+    return parse(iter_lines(chunks))
+
+
+def _describe(error: ValidationError) -> str:
+    """One line per invalid field"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+async def _insert_batch(
+    db: AsyncSession,
+    batch: List[TicketCreate],
+    email_service: EmailService,
+    send_confirmations: bool,
+    counter: TicketCounter,
+    hub: TicketEventHub,
+    numbers: TicketNumberAllocator
+) -> int:
+    """Insert and commit one batch of tickets. Returns the number of confirmations queued."""
+    now = utcnow()
+    ticket_numbers = await numbers.allocate(len(batch), now.year)
+    rows = []
+    for ticket_data, ticket_number in zip(batch, ticket_numbers):
+        row = ticket_data.model_dump()
+        row.update(status=TicketStatus.NEW.value, ticket_number=ticket_number, created_at=now, updated_at=now)
+        rows.append(row)
+
+    # One executemany, returning everything the bookkeeping below needs
+    tickets = (await db.execute(insert(Ticket).returning(*RETURNED_COLUMNS), rows)).all()
+
+    await apply_ticket_changes(db, [(None, ticket_facts(ticket)) for ticket in tickets])
+
+    confirmations = []
+    if send_confirmations:
+        confirmations = [
+            confirmation_values(ticket, email_service.company_name)
+            for ticket in tickets if ticket.customer_email
+        ]
+        if confirmations:
+            await db.execute(insert(TicketResponse), confirmations)
+
+    await db.commit()
+
+    for ticket in tickets:
+        counter.apply(None, ticket_count_key(ticket))
+        hub.publish(TICKET_CREATED, ticket.id, status=ticket.status)
+    return len(confirmations)
+
+
+async def import_tickets(
+    db: AsyncSession,
+    rows: AsyncIterator[ParsedRow],
+    send_confirmations: bool = True,
+    batch_size: Optional[int] = None,
+    email_service: Optional[EmailService] = None,
+    counter: Optional[TicketCounter] = None,
+    hub: Optional[TicketEventHub] = None,
+    numbers: Optional[TicketNumberAllocator] = None
+) -> TicketImportResult:
+    """
+    Validate and insert parsed rows, committing every batch_size tickets.
+
+    Batches committed before an exception stay imported. Confirmation
+    emails are queued (for rows with a customer email) only when
+    send_confirmations is set and the email service is configured; wake
+    the outbox afterwards.
+    """
+    batch_size = batch_size or settings.TICKET_IMPORT_BATCH_SIZE
+    email_service = email_service or get_email_service()
+    counter = counter or get_ticket_counter()
+    hub = hub or get_ticket_event_hub()
+    numbers = numbers or get_ticket_number_allocator()
+    send_confirmations = send_confirmations and email_service.is_configured()
+
+    imported = failed = confirmations = 0
+    errors: List[TicketImportError] = []
+    batch: List[TicketCreate] = []
+
+    async for row_number, values, error in rows:
+        if error is None:
+            try:
+                batch.append(TicketCreate.model_validate(values))
+            except ValidationError as e:
+                error = _describe(e)
+        if error is not None:
+            failed += 1
+            if len(errors) < settings.TICKET_IMPORT_MAX_ERRORS:
+                errors.append(TicketImportError(row=row_number, error=error))
+            continue
+
+        if len(batch) >= batch_size:
+            confirmations += await _insert_batch(db, batch, email_service, send_confirmations, counter, hub, numbers)
+            imported += len(batch)
+            batch = []
+
+    if batch:
+        confirmations += await _insert_batch(db, batch, email_service, send_confirmations, counter, hub, numbers)
+        imported += len(batch)
+
+    logger.info(f"Imported {imported} tickets ({failed} rows failed, {confirmations} confirmations queued)")
+    return TicketImportResult(
+        imported=imported,
+        failed=failed,
+        confirmations=confirmations,
+        errors=errors,
+        errors_truncated=failed > len(errors),
+    )
+
+
+async def _read_file(path: str) -> AsyncIterator[bytes]:
+    """A file's contents in chunks"""
+    with open(path, "rb") as file:
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+async def _run_cli(args: argparse.Namespace) -> TicketImportResult:
+    """Import one file with the command line options"""
+    format = args.format
+    if format is None:
+        format = next(
+            (name for extension, name in FILE_EXTENSIONS.items() if args.path.lower().endswith(extension)),
+            None
+        )
+        if format is None:
+            raise SystemExit(f"Can't tell the format of {args.path} - pass --format")
+
+    async with AsyncSessionLocal() as db:
+        return await import_tickets(
+            db,
+            parse_rows(_read_file(args.path), format),
+            send_confirmations=not args.no_confirmations,
+            batch_size=args.batch_size,
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Bulk import tickets from a CSV or NDJSON file")
+    parser.add_argument("path", help="File to import")
+    parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--no-confirmations", action="store_true", help="Don't queue confirmation emails")
+    parser.add_argument("--batch-size", type=int, help="Rows per insert/commit")
+    result = asyncio.run(_run_cli(parser.parse_args()))
+
+    for error in result.errors:
+        print(f"Line {error.row}: {error.error}")
+    if result.errors_truncated:
+        print(f"... and {result.failed - len(result.errors)} more")
+    print(f"Imported {result.imported} tickets, {result.failed} rows failed")
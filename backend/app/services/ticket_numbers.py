@@ -0,0 +1,167 @@
+"""
+Human-readable ticket numbers ("TAX-2025-0001").
+
+Numbers count up per prefix and year, from one row per year in
+ticket_number_sequences. Taking MAX(ticket_number) + 1 on every create
+would serialize all creates on that lookup and still collide when two
+processes read the same maximum. Instead each process reserves a block
+of TICKET_NUMBER_BLOCK_SIZE numbers with a single atomic upsert
+
+    INSERT ... ON CONFLICT (prefix, year)
+    DO UPDATE SET next_value = next_value + <block> RETURNING next_value
+
+and hands them out from memory. The upsert runs in its own short
+transaction, so the sequence row is locked only for that statement and
+never for the length of a ticket's transaction; two processes can't get
+overlapping blocks on either SQLite (one writer at a time) or PostgreSQL
+(row lock, and ON CONFLICT settles concurrent first inserts).
+
+Numbers are unique but not gap-free: a block left unused when a process
+restarts, or a number taken by a create that rolls back, is skipped.
+Across processes numbers are only roughly in creation order.
+
+When a process's block for the year runs low, the next one is reserved
+in the background, so creates don't wait on the extra round trip.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models import TicketNumberSequence, utcnow
+
+logger = logging.getLogger(__name__)
+
+
+def reserve_statement(dialect_name: str, prefix: str, year: int, size: int):
+    """
+    Upsert reserving `size` numbers; returns the sequence's new next_value.
+
+    The reserved numbers are next_value - size .. next_value - 1.
+    """
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    table = TicketNumberSequence.__table__
+    return (
+        dialect.insert(table)
+        .values(prefix=prefix, year=year, next_value=size + 1)
+        .on_conflict_do_update(
+            index_elements=[table.c.prefix, table.c.year],
+            set_={"next_value": table.c.next_value + size},
+        )
+        .returning(table.c.next_value)
+    )
+
+
+def format_ticket_number(prefix: str, year: int, value: int) -> str:
+    """e.g. TAX-2025-0001 (more digits once a year passes 9999)"""
+    return f"{prefix}-{year}-{value:04d}"
+
+
+class TicketNumberAllocator:
+    """Hands out ticket numbers from blocks reserved in the database"""
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        prefix: Optional[str] = None,
+        block_size: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.prefix = prefix or settings.TICKET_NUMBER_PREFIX
+        self.block_size = max(1, block_size or settings.TICKET_NUMBER_BLOCK_SIZE)
+        self._lock = threading.Lock()
+        # year -> reserved ranges not yet handed out
+        self._blocks: Dict[int, Deque[range]] = {}
+        self._prefetch: Dict[int, asyncio.Task] = {}
+
+    async def reserve_block(self, year: int, size: Optional[int] = None) -> range:
+        """Reserve the next `size` numbers of a year in the database (own transaction)"""
+        size = size or self.block_size
+        async with self.session_factory() as db:
+            statement = reserve_statement(db.get_bind().dialect.name, self.prefix, year, size)
+            next_value = (await db.execute(statement)).scalar_one()
+            await db.commit()
+        return range(next_value - size, next_value)
+
+    def _take(self, year: int, count: int) -> List[int]:
+        """Up to `count` numbers from the blocks in memory"""
+        values: List[int] = []
+        with self._lock:
+            blocks = self._blocks.setdefault(year, deque())
+            while blocks and len(values) < count:
+                block = blocks.popleft()
+                taken = block[:count - len(values)]
+                values.extend(taken)
+                if len(taken) < len(block):
+                    blocks.appendleft(block[len(taken):])
+        return values
+
+    def _add(self, year: int, block: range) -> None:
+        with self._lock:
+            self._blocks.setdefault(year, deque()).append(block)
+
+    def _remaining(self, year: int) -> int:
+        with self._lock:
+            return sum(len(block) for block in self._blocks.get(year, ()))
+
+    async def _refill(self, year: int) -> None:
+        try:
+            self._add(year, await self.reserve_block(year))
+        except Exception as e:
+            # The next create that finds no numbers left reserves a block itself
+            logger.warning(f"Reserving ticket numbers for {year} in the background failed: {e}")
+
+    def _maybe_prefetch(self, year: int) -> None:
+        """Reserve the next block in the background once a quarter of a block is left"""
+        if self._remaining(year) > self.block_size // 4:
+            return
+        task = self._prefetch.get(year)
+        loop = asyncio.get_running_loop()
+        # A task from another (finished) event loop will never complete
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        # Fresh context: the refill isn't part of the request that triggered it
+        # (its statement mustn't count against that request's query budget)
+        self._prefetch[year] = loop.create_task(self._refill(year), context=contextvars.Context())
+
+    async def allocate(self, count: int = 1, year: Optional[int] = None) -> List[str]:
+        """
+        `count` new ticket numbers for a year (default: the current UTC year).
+
+        Costs a database round trip only when the reserved numbers run
+        out; a request for more than a block reserves exactly what's
+        missing in one go.
+        """
+        year = year or utcnow().year
+        values = self._take(year, count)
+        while len(values) < count:
+            self._add(year, await self.reserve_block(year, max(self.block_size, count - len(values))))
+            values.extend(self._take(year, count - len(values)))
+        self._maybe_prefetch(year)
+        return [format_ticket_number(self.prefix, year, value) for value in values]
+
+    async def next_number(self, year: Optional[int] = None) -> str:
+        """One new ticket number"""
+        return (await self.allocate(1, year))[0]
+
+    def clear(self) -> None:
+        """Forget the reserved numbers (they're skipped)"""
+        with self._lock:
+            self._blocks.clear()
+        self._prefetch.clear()
+
+
+# Global allocator instance
+ticket_numbers = TicketNumberAllocator()
+
+
+def get_ticket_number_allocator() -> TicketNumberAllocator:
+    """Dependency injection for the ticket number allocator"""
+    return ticket_numbers
@@ -0,0 +1,11 @@
+"""
+Performance benchmarks.
+
+Run a benchmark from the backend directory, e.g.:
+    python -m benchmarks.bench_email_templates
+
+API load tests: benchmarks.seed generates a deterministic data set
+(10k / 100k / 1M tickets) and benchmarks.bench_api drives the app in
+process against it, comparing with a stored baseline:
+    python -m benchmarks.bench_api --baseline benchmarks/baselines/sqlite-10k.json
+"""
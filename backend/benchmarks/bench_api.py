@@ -0,0 +1,329 @@
+"""
+API load benchmark.
+
+Drives the app in process through httpx.AsyncClient (ASGITransport, no
+network) against a SQLite database seeded by benchmarks.seed, and
+reports per scenario the throughput and p50/p95/p99 latency as JSON:
+
+- list: GET /api/tickets/ (first page, sometimes filtered by status or category)
+- get: GET /api/tickets/{id} (random ticket)
+- create: POST /api/tickets/
+- update: PUT /api/tickets/{id} (reassign / reprioritize)
+- respond: POST /api/tickets/{id}/respond (fake ACS client; the outbox
+  workers are off, so this measures the API side)
+- mixed: 35% get, 30% list, 15% update, 10% create, 10% respond
+
+Each scenario runs --requests requests from --concurrency concurrent
+clients after --warmup unrecorded ones, --repeat times; the median of
+each metric is reported, which keeps one noisy run from failing the
+comparison. Requests are chosen from seeded
+random generators, so two runs send the same requests.
+
+With --baseline, the results are compared against a stored report and
+the run fails (exit code 1) if a scenario's throughput dropped or its
+p50/p95 latency grew by more than --tolerance, or if any request failed.
+--save-baseline writes the report to the --baseline path instead.
+
+Usage:
+    python -m benchmarks.bench_api [--tickets 10k] [--database seeded.db]
+        [--scenarios list get ...] [--requests N] [--concurrency C]
+        [--output report.json] [--baseline benchmarks/baselines/sqlite-10k.json [--save-baseline]]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+DEFAULT_SEED = 20250101
+TICKET_STATUSES = ("new", "in_progress", "pending_customer", "resolved", "closed")
+TICKET_CATEGORIES = ("income_tax", "vat", "deductions")
+MIXED_WEIGHTS = {"get": 35, "list": 30, "update": 15, "create": 10, "respond": 10}
+
+
+class NullEmailClient:
+    """Stands in for the ACS EmailClient (never contacted while the outbox workers are off)"""
+
+    class _Poller:
+        def result(self, timeout=None):
+            return {"messageId": "bench"}
+
+    def begin_send(self, message):
+        return self._Poller()
+
+
+async def _list(client: httpx.AsyncClient, rng: random.Random, tickets: int) -> httpx.Response:
+    params = {"limit": 50}
+    roll = rng.random()
+    if roll < 0.3:
+        params["status"] = rng.choice(TICKET_STATUSES)
+    elif roll < 0.5:
+        params["category"] = rng.choice(TICKET_CATEGORIES)
+    return await client.get("/api/tickets/", params=params)
+
+
+async def _get(client: httpx.AsyncClient, rng: random.Random, tickets: int) -> httpx.Response:
+    return await client.get(f"/api/tickets/{rng.randint(1, tickets)}")
+
+
+async def _create(client: httpx.AsyncClient, rng: random.Random, tickets: int) -> httpx.Response:
+    number = rng.getrandbits(32)
+    return await client.post("/api/tickets/", json={
+        "title": f"Benchmark ticket {number}",
+        "description": "Created by the API benchmark.",
+        "category": rng.choice(TICKET_CATEGORIES),
+        "priority": rng.choice(("low", "medium", "high")),
+        "customer_name": "Bench Customer",
+        "customer_email": f"bench{number}@example.com",
+    })
+
+
+async def _update(client: httpx.AsyncClient, rng: random.Random, tickets: int) -> httpx.Response:
+    return await client.put(f"/api/tickets/{rng.randint(1, tickets)}", json={
+        "assigned_to": f"agent{rng.randint(1, 25):02d}",
+        "priority": rng.choice(("low", "medium", "high")),
+    })
+
+
+async def _respond(client: httpx.AsyncClient, rng: random.Random, tickets: int) -> httpx.Response:
+    ticket_id = rng.randint(1, tickets)
+    return await client.post(f"/api/tickets/{ticket_id}/respond", json={
+        "response": "Thank you, we are looking into it.",
+        "customer_email": f"customer{ticket_id}@example.com",
+        "customer_name": "Bench Customer",
+        "ticket_title": "Benchmark",
+        "sent_by": "bench",
+    })
+
+
+async def _mixed(client: httpx.AsyncClient, rng: random.Random, tickets: int) -> httpx.Response:
+    name = rng.choices(list(MIXED_WEIGHTS), list(MIXED_WEIGHTS.values()))[0]
+    return await OPERATIONS[name](client, rng, tickets)
+
+
+Operation = Callable[[httpx.AsyncClient, random.Random, int], Awaitable[httpx.Response]]
+
+OPERATIONS: Dict[str, Operation] = {
+    "list": _list,
+    "get": _get,
+    "create": _create,
+    "update": _update,
+    "respond": _respond,
+}
+SCENARIOS: Dict[str, Operation] = {**OPERATIONS, "mixed": _mixed}
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    tickets: int,
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+    seed: int = DEFAULT_SEED
+) -> Dict[str, float]:
+    """Run one scenario; returns its requests, errors, seconds, throughput and latency percentiles"""
+    operation = SCENARIOS[name]
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker(number: int, todo) -> None:
+        nonlocal errors
+        # str seeds hash deterministically (unlike hash()-based ones)
+        rng = random.Random(f"{seed}-{name}-{number}")
+        for record in todo:
+            start = time.perf_counter()
+            response = await operation(client, rng, tickets)
+            if record:
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code >= 400
+
+    await worker(-1, iter([False] * warmup))
+    # Workers share one iterator, so the total is exact whatever their speed
+    todo = iter([True] * requests)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n, todo) for n in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def median_result(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    """Per-metric median of repeated runs (errors are summed)"""
+    result = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    result["errors"] = sum(run["errors"] for run in runs)
+    return result
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of `report` against `baseline` (empty when there are none)"""
+    problems = []
+    for key in ("tickets", "concurrency", "database"):
+        if report["environment"][key] != baseline["environment"][key]:
+            problems.append(
+                f"baseline was recorded with {key}={baseline['environment'][key]}, "
+                f"this run used {report['environment'][key]}"
+            )
+    if problems:
+        return problems
+    for name, result in report["scenarios"].items():
+        if result["errors"]:
+            problems.append(f"{name}: {result['errors']} failed requests")
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            problems.append(f"{name}: throughput {result['throughput_rps']} req/s, baseline {base['throughput_rps']}")
+        for key in ("p50_ms", "p95_ms"):
+            if result[key] > base[key] * (1 + tolerance):
+                problems.append(f"{name}: {key} {result[key]}, baseline {base[key]}")
+    return problems
+
+
+async def run_benchmark(
+    scenarios: List[str],
+    tickets: int,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+    repeat: int = 1
+) -> Dict[str, Dict[str, float]]:
+    """Run scenarios against the app in this process (its database must already be seeded)"""
+    from app.database import async_engine
+    from app.main import app
+    from app.services.email_service import EmailService, get_email_service
+
+    email_service = EmailService(client=NullEmailClient())
+    email_service.sender_email = email_service.sender_email or "noreply@example.com"
+    app.dependency_overrides[get_email_service] = lambda: email_service
+
+    results = {}
+    try:
+        async with app.router.lifespan_context(app):
+            # Unhandled errors (e.g. SQLite "database is locked") count as failed requests
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for name in scenarios:
+                    runs = [
+                        await run_scenario(client, name, tickets, requests, concurrency, warmup if run == 0 else 0, seed + run)
+                        for run in range(repeat)
+                    ]
+                    results[name] = median_result(runs)
+                    print(f"{name:8s} {json.dumps(results[name])}", file=sys.stderr)
+    finally:
+        app.dependency_overrides.pop(get_email_service, None)
+        await async_engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", default="10k", help="data set size to seed (10k, 100k, 1m or a count)")
+    parser.add_argument("--database", help="database seeded by benchmarks.seed (copied, not modified)")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="recorded requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--warmup", type=int, default=100, help="unrecorded requests per scenario")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario (the median of each metric is reported)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="random seed (data and requests)")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="stored report to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write the report to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        # Configure the app before anything imports it
+        os.environ.update({
+            "DATABASE_URL": f"sqlite:///{path}",
+            "DB_MIGRATE_ON_STARTUP": "false",
+            "EMAIL_OUTBOX_WORKERS": "0",
+            # Lock waits under concurrent writes would flood stderr with slow-query lines
+            "SQL_SLOW_QUERY_MS": "0",
+            "SQL_REPEATED_STATEMENT_THRESHOLD": "0",
+        })
+        from sqlalchemy import create_engine, func, select
+
+        from app.models import Ticket
+        from benchmarks.seed import parse_size, seed_database
+
+        bind = create_engine(f"sqlite:///{path}")
+        if args.database:
+            shutil.copyfile(args.database, path)
+        else:
+            seed_database(bind, parse_size(args.tickets), args.seed)
+        with bind.connect() as conn:
+            tickets = conn.execute(select(func.max(Ticket.id))).scalar_one()
+        bind.dispose()
+
+        results = asyncio.run(run_benchmark(
+            args.scenarios, tickets, args.requests, args.concurrency, args.warmup, args.seed, args.repeat
+        ))
+
+    report = {
+        "environment": {
+            "tickets": tickets,
+            "database": "sqlite",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2) + "\n"
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        sys.stdout.write(output)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(output)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        problems = compare(report, baseline, args.tolerance)
+        if problems:
+            print("Regressions against the baseline:", file=sys.stderr)
+            for problem in problems:
+                print(f"  {problem}", file=sys.stderr)
+            raise SystemExit(1)
+        print("No regressions against the baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
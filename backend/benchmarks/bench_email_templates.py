@@ -0,0 +1,89 @@
+"""
+Micro-benchmark for email rendering.
+
+Reports the render cost per email (HTML + plain text) for:
+- single sends: one EmailService._build_* call pair per email, as the
+  outbox does for each row
+- batched sends: one company's templates fetched once and reused for a
+  whole batch of recipients, as a bulk job would
+- uncached: the company header/footer bound again for every email, for
+  comparison with the cached path
+
+Usage:
+    python -m benchmarks.bench_email_templates [--emails N] [--repeat R]
+"""
+
+import argparse
+import time
+
+from app.services.email_service import EmailService
+from app.services.email_templates import CompanyTemplates, get_company_templates
+
+RESPONSE_TEXT = (
+    "Thank you for sending the missing forms. We have updated your return "
+    "and the corrected assessment will be ready within 5 working days.\n\n"
+    "If you have questions about <line 3.1.4> & deductions, just reply.\n"
+) * 3
+
+
+def _recipients(count: int):
+    return [
+        (f"Customer {i}", i, f"Question about tax return {2000 + i % 25}")
+        for i in range(count)
+    ]
+
+
+def bench_single(service: EmailService, recipients) -> float:
+    """Seconds to render every recipient's email one send at a time"""
+    start = time.perf_counter()
+    for customer_name, ticket_id, ticket_title in recipients:
+        service._build_email_html(customer_name, ticket_id, ticket_title, RESPONSE_TEXT, "Agent")
+        service._build_email_text(customer_name, ticket_id, ticket_title, RESPONSE_TEXT, "Agent")
+    return time.perf_counter() - start
+
+
+def bench_batched(company_name: str, recipients) -> float:
+    """Seconds to render every recipient's email with the templates looked up once"""
+    start = time.perf_counter()
+    templates = get_company_templates(company_name)
+    render_html = templates.render_response_html
+    render_text = templates.render_response_text
+    for customer_name, ticket_id, ticket_title in recipients:
+        render_html(customer_name, ticket_id, ticket_title, RESPONSE_TEXT, "Agent")
+        render_text(customer_name, ticket_id, ticket_title, RESPONSE_TEXT, "Agent")
+    return time.perf_counter() - start
+
+
+def bench_uncached(company_name: str, recipients) -> float:
+    """Seconds to render every recipient's email, rebinding the company templates each time"""
+    start = time.perf_counter()
+    for customer_name, ticket_id, ticket_title in recipients:
+        templates = CompanyTemplates(company_name)
+        templates.render_response_html(customer_name, ticket_id, ticket_title, RESPONSE_TEXT, "Agent")
+        templates.render_response_text(customer_name, ticket_id, ticket_title, RESPONSE_TEXT, "Agent")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=10000, help="emails rendered per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per scenario (best is reported)")
+    args = parser.parse_args()
+
+    service = EmailService(client=object())
+    recipients = _recipients(args.emails)
+
+    # Warm the template cache so both scenarios measure rendering only
+    bench_single(service, recipients[:10])
+
+    for name, run in (
+        ("single", lambda: bench_single(service, recipients)),
+        ("batched", lambda: bench_batched(service.company_name, recipients)),
+        ("uncached", lambda: bench_uncached(service.company_name, recipients)),
+    ):
+        best = min(run() for _ in range(args.repeat))
+        print(f"{name:8s} {best / args.emails * 1e6:8.2f} us/email  ({args.emails} emails, best of {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
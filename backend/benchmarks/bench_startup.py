@@ -0,0 +1,118 @@
+"""
+Cold start benchmark.
+
+Measures what a scaled-to-zero container pays before it can serve:
+- import: `python -X importtime -c "import app.main"`, with the slowest
+  modules by cumulative import time
+- first /health: seconds from launching uvicorn until GET /health
+  returns 200, once with migrations in the lifespan and once with them
+  run beforehand as a deploy step (DB_MIGRATE_ON_STARTUP=false)
+
+Each run uses a fresh SQLite database in a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat R] [--top N]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEALTH_TIMEOUT_SECONDS = 60.0
+
+
+def _env(directory: str, **overrides: str) -> Dict[str, str]:
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'bench.db')}"}
+    env.update(overrides)
+    return env
+
+
+def import_times(top: int) -> Tuple[float, List[Tuple[float, str]]]:
+    """Total seconds to import app.main and the `top` slowest modules (cumulative seconds, name)"""
+    with tempfile.TemporaryDirectory() as directory:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app.main"],
+            cwd=BACKEND_DIR, env=_env(directory), capture_output=True, text=True, check=True
+        )
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative) / 1e6, name.rstrip()))
+    total = next(seconds for seconds, name in modules if name.strip() == "app.main")
+    slowest = sorted((m for m in modules if m[1].strip() != "app.main"), reverse=True)[:top]
+    return total, slowest
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_health(migrate_on_startup: bool) -> float:
+    """Seconds from launching uvicorn until /health answers"""
+    with tempfile.TemporaryDirectory() as directory:
+        env = _env(directory, DB_MIGRATE_ON_STARTUP=str(migrate_on_startup).lower(), EMAIL_OUTBOX_WORKERS="0")
+        if not migrate_on_startup:
+            # The deploy step, not counted
+            subprocess.run([sys.executable, "-m", "app.migrations"], cwd=BACKEND_DIR, env=env,
+                           check=True, capture_output=True)
+
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}/health"
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env
+        )
+        try:
+            while time.perf_counter() - start < HEALTH_TIMEOUT_SECONDS:
+                if server.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with code {server.returncode}")
+                try:
+                    with urllib.request.urlopen(url, timeout=1) as response:
+                        if response.status == 200:
+                            return time.perf_counter() - start
+                except (urllib.error.URLError, ConnectionError):
+                    time.sleep(0.01)
+            raise SystemExit(f"/health did not answer within {HEALTH_TIMEOUT_SECONDS:.0f}s")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per scenario (median and best are reported)")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    total, slowest = import_times(args.top)
+    print(f"import app.main             {total * 1000:>8.0f} ms")
+    for seconds, name in slowest:
+        print(f"  {name:40s} {seconds * 1000:>8.0f} ms")
+
+    scenarios = (("first /health (migrate)", True), ("first /health (no migrate)", False))
+    # Interleaved, so disk cache warm-up doesn't favour one scenario
+    runs = {label: [] for label, _ in scenarios}
+    for _ in range(args.repeat):
+        for label, migrate in scenarios:
+            runs[label].append(time_to_first_health(migrate))
+    for label, timings in runs.items():
+        print(f"{label:27s} {statistics.median(timings) * 1000:>8.0f} ms median, {min(timings) * 1000:.0f} ms best")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark for ticket list serialization.
+
+Compares, for N tickets:
+- response_model: load ORM objects, validate them into TicketResponse
+  (from_attributes), dump and json.dumps - what FastAPI does for
+  response_model=List[TicketResponse]
+- fast: select the TicketResponse columns, zip rows into dicts and
+  encode with orjson (app.serialization)
+
+Both include the query. The outputs are checked to be byte-identical.
+Runs against a throwaway SQLite database.
+
+Usage:
+    python -m benchmarks.bench_ticket_list [--tickets 10000 100000] [--repeat R]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Ticket
+from app.schemas import TicketResponse
+from app.serialization import TICKET_COLUMNS, FastJSONResponse, ticket_dicts
+
+_tickets = TypeAdapter(List[TicketResponse])
+
+
+def _populate(engine, count: int) -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        {
+            "title": f"Question about tax return {i}",
+            "description": "Customer asks about deductions for their home office. " * 4,
+            "category": ("vat", "income_tax", "deductions")[i % 3],
+            "priority": ("low", "medium", "high")[i % 3],
+            "status": ("new", "in_progress", "closed")[i % 3],
+            "customer_name": f"Customer {i}",
+            "customer_email": f"customer{i}@example.com",
+            "department": "returns",
+            "created_at": start + timedelta(minutes=i),
+            "updated_at": start + timedelta(minutes=i),
+            "tags": ["vip"] if i % 10 == 0 else None,
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Ticket), rows)
+
+
+def bench_response_model(engine) -> Tuple[float, bytes]:
+    """Seconds (and body) for the ORM + response_model path"""
+    start = time.perf_counter()
+    with Session(engine) as db:
+        tickets = db.execute(select(Ticket).order_by(Ticket.id)).scalars().all()
+        content = _tickets.dump_python(_tickets.validate_python(tickets, from_attributes=True), mode="json")
+    body = json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+    return time.perf_counter() - start, body
+
+
+def bench_fast(engine) -> Tuple[float, bytes]:
+    """Seconds (and body) for the column projection + orjson path"""
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        rows = conn.execute(select(*TICKET_COLUMNS).order_by(Ticket.id)).all()
+    body = FastJSONResponse(ticket_dicts(rows)).body
+    return time.perf_counter() - start, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, nargs="+", default=[10000, 100000], help="table sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario (best is reported)")
+    args = parser.parse_args()
+
+    for count in args.tickets:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+            Base.metadata.create_all(engine)
+            _populate(engine, count)
+
+            results = {}
+            for name, run in (("response_model", bench_response_model), ("fast", bench_fast)):
+                timings = [run(engine) for _ in range(args.repeat)]
+                results[name] = min(seconds for seconds, _ in timings), timings[0][1]
+            engine.dispose()
+
+        if results["response_model"][1] != results["fast"][1]:
+            raise SystemExit(f"Output differs at {count} tickets")
+        for name, (seconds, _) in results.items():
+            print(f"{count:>8} tickets  {name:15s} {count / seconds:>10,.0f} rows/s  ({seconds * 1000:.0f} ms)")
+        print(f"{count:>8} tickets  speedup         {results['response_model'][0] / results['fast'][0]:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
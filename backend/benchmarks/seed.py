@@ -0,0 +1,196 @@
+"""
+Deterministic synthetic data for benchmarks.
+
+Generates realistic tickets (categories, priorities, statuses and
+assignees with skewed distributions, timestamps spread over two years,
+resolution times and ratings for finished tickets) and 0-4 email
+responses per ticket. The same --seed and size always give the same rows,
+so runs against different builds compare like with like.
+
+Rows are bulk-inserted with explicit IDs in batches, ticket numbers are
+assigned per year with the sequences advanced past them (so the API
+keeps numbering from there), and the analytics rollups are rebuilt.
+
+Usage:
+    python -m benchmarks.seed --tickets 100000 --database bench-100k.db
+    (sizes: any count; 10k / 100k / 1M are the usual ones)
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.database import Base
+from app.models import EmailStatus, EmailType, Ticket, TicketNumberSequence, TicketResponse, TicketStatus
+from app.services.analytics import rebuild_rollups
+from app.services.ticket_numbers import format_ticket_number
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SEED = 20250101
+BATCH_SIZE = 10_000
+
+# Tickets are created evenly over this period, oldest first (IDs follow creation order)
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+SPAN = timedelta(days=730)
+
+CATEGORIES = ("income_tax", "vat", "deductions", "property_tax", "payroll", "corporate_tax")
+CATEGORY_WEIGHTS = (40, 20, 15, 10, 10, 5)
+PRIORITIES = ("low", "medium", "high", "critical")
+PRIORITY_WEIGHTS = (30, 50, 15, 5)
+DEPARTMENTS = ("returns", "compliance", "general")
+AGENTS = tuple(f"agent{n:02d}" for n in range(1, 26))
+FIRST_NAMES = ("Kari", "Ola", "Ingrid", "Lars", "Emma", "Jonas", "Nora", "Erik", "Sofie", "Henrik")
+LAST_NAMES = ("Nordmann", "Hansen", "Johansen", "Olsen", "Larsen", "Berg", "Haugen", "Dahl")
+SUBJECTS = (
+    "Question about my tax return", "VAT registration", "Home office deduction",
+    "Correction to last year's assessment", "Payment plan request", "Missing refund",
+)
+SENTENCES = (
+    "I submitted my return last month and have not heard back.",
+    "Could you explain how the deduction is calculated?",
+    "The amount on my assessment does not match my records.",
+    "I have attached the documents you asked for.",
+    "Please let me know if anything else is needed.",
+    "My employer reported the wrong income figure.",
+)
+TAGS = ("vip", "urgent", "complex", "follow_up")
+
+
+def parse_size(value: str) -> int:
+    """'100k' / '1m' / '2500' -> ticket count"""
+    return SIZES.get(value.lower()) or int(value)
+
+
+def _created_at(index: int, count: int) -> datetime:
+    return START + SPAN * index / count
+
+
+def generate_tickets(count: int, seed: int = DEFAULT_SEED) -> Iterator[Dict]:
+    """Ticket rows with IDs 1..count (ticket_number not set)"""
+    rng = random.Random(seed)
+    for index in range(count):
+        created_at = _created_at(index, count)
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        status = rng.choices(
+            (TicketStatus.NEW, TicketStatus.IN_PROGRESS, TicketStatus.PENDING_CUSTOMER, TicketStatus.RESOLVED, TicketStatus.CLOSED),
+            (10, 15, 5, 20, 50)
+        )[0]
+        assigned = status != TicketStatus.NEW or rng.random() < 0.3
+        finished = status in (TicketStatus.RESOLVED, TicketStatus.CLOSED)
+        resolution_minutes = int(rng.lognormvariate(7, 1)) if finished else None
+        resolved_at = created_at + timedelta(minutes=resolution_minutes) if finished else None
+        yield {
+            "id": index + 1,
+            "title": f"{rng.choice(SUBJECTS)} ({index + 1})",
+            "description": " ".join(rng.sample(SENTENCES, rng.randint(1, 4))),
+            "category": rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0],
+            "priority": rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0],
+            "status": status.value,
+            "customer_name": name,
+            "customer_email": f"customer{index + 1}@example.com",
+            "customer_phone": f"+47 {rng.randint(40000000, 99999999)}" if rng.random() < 0.6 else None,
+            "assigned_to": rng.choice(AGENTS) if assigned else None,
+            "assigned_at": created_at + timedelta(minutes=rng.randint(5, 600)) if assigned else None,
+            "department": rng.choice(DEPARTMENTS),
+            "created_at": created_at,
+            "updated_at": resolved_at or created_at,
+            "first_response_at": created_at + timedelta(minutes=rng.randint(10, 2880)) if assigned else None,
+            "resolved_at": resolved_at,
+            "closed_at": resolved_at if status == TicketStatus.CLOSED else None,
+            "resolution_time_minutes": resolution_minutes,
+            "tags": rng.sample(TAGS, rng.randint(1, 2)) if rng.random() < 0.15 else None,
+            "satisfaction_rating": rng.randint(1, 5) if finished and rng.random() < 0.4 else None,
+            "reopened_count": 1 if rng.random() < 0.03 else 0,
+            "escalated": rng.random() < 0.05,
+        }
+
+
+def generate_responses(count: int, seed: int = DEFAULT_SEED) -> Iterator[Dict]:
+    """0-4 sent email responses per ticket of a count-ticket data set"""
+    rng = random.Random(seed + 1)
+    for index in range(count):
+        ticket_id = index + 1
+        created_at = _created_at(index, count)
+        for _ in range(rng.choices((0, 1, 2, 3, 4), (30, 35, 20, 10, 5))[0]):
+            created_at += timedelta(minutes=rng.randint(10, 4320))
+            yield {
+                "ticket_id": ticket_id,
+                "subject": f"{settings.COMPANY_NAME} - Response to your case",
+                "response_text": " ".join(rng.sample(SENTENCES, rng.randint(2, 5))),
+                "sent_to": f"customer{ticket_id}@example.com",
+                "sent_by": rng.choice(AGENTS),
+                "created_at": created_at,
+                "sent_at": created_at + timedelta(seconds=rng.randint(1, 30)),
+                "email_status": EmailStatus.SENT.value,
+                "message_id": f"msg-{ticket_id}-{rng.getrandbits(32):08x}",
+                "email_type": EmailType.RESPONSE.value,
+                "attempts": 1,
+            }
+
+
+def _batches(rows: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    batch: List[Dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed_database(bind: Engine, count: int, seed: int = DEFAULT_SEED) -> Tuple[int, int]:
+    """Create the schema and insert the data set into an empty database. Returns (tickets, responses)."""
+    Base.metadata.create_all(bind)
+    prefix = settings.TICKET_NUMBER_PREFIX
+    next_values: Dict[int, int] = {}
+
+    for batch in _batches(generate_tickets(count, seed), BATCH_SIZE):
+        for row in batch:
+            year = row["created_at"].year
+            value = next_values.get(year, 1)
+            row["ticket_number"] = format_ticket_number(prefix, year, value)
+            next_values[year] = value + 1
+        with bind.begin() as conn:
+            conn.execute(insert(Ticket), batch)
+
+    responses = 0
+    for batch in _batches(generate_responses(count, seed), BATCH_SIZE):
+        with bind.begin() as conn:
+            conn.execute(insert(TicketResponse), batch)
+        responses += len(batch)
+
+    with bind.begin() as conn:
+        if next_values:
+            conn.execute(insert(TicketNumberSequence), [
+                {"prefix": prefix, "year": year, "next_value": value} for year, value in next_values.items()
+            ])
+    rebuild_rollups(bind)
+    return count, responses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=parse_size, default=SIZES["10k"], help="ticket count (e.g. 10k, 100k, 1m)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="random seed")
+    parser.add_argument("--database", required=True, help="SQLite file to create (must not exist)")
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        raise SystemExit(f"{args.database} already exists")
+    bind = create_engine(f"sqlite:///{args.database}")
+    start = time.perf_counter()
+    tickets, responses = seed_database(bind, args.tickets, args.seed)
+    bind.dispose()
+    print(f"Seeded {tickets:,} tickets and {responses:,} responses in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Shared pytest fixtures.
+
+Points the app at a throwaway SQLite database before it is imported, so
+tests never touch a developer's tickets.db.
+"""
+
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="cms-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["EMAIL_OUTBOX_WORKERS"] = "0"  # Tests drive the outbox explicitly
+os.environ["DB_MIGRATE_ON_STARTUP"] = "false"  # The client fixture creates the schema
+os.environ["SQL_QUERY_BUDGET_ENFORCE"] = "true"  # Routes over their query budget fail the test
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Base, engine, async_engine
+from app.main import app
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.email_service import EmailService, get_email_service
+from app.services.ticket_cache import ticket_cache
+from app.services.ticket_numbers import ticket_numbers
+
+from fakes import FakeEmailClient
+
+
+@pytest.fixture
+def client():
+    """Test client backed by a freshly created schema"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    ticket_cache.clear()  # IDs are reused by the new schema
+    ticket_numbers.clear()  # Reserved from the old schema's sequences
+    with TestClient(app) as test_client:
+        yield test_client
+        # Pooled async connections belong to this client's event loop
+        test_client.portal.call(async_engine.dispose)
+
+
+@pytest.fixture
+def fake_email(client):
+    """Route email through a fake ACS client"""
+    fake_client = FakeEmailClient()
+    service = EmailService(client=fake_client, circuit_breaker=CircuitBreaker(failure_threshold=100))
+    service.sender_email = "noreply@example.com"
+    app.dependency_overrides[get_email_service] = lambda: service
+    yield service, fake_client
+    app.dependency_overrides.pop(get_email_service, None)
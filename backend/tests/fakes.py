@@ -0,0 +1,41 @@
+"""
+Test doubles shared across test modules.
+"""
+
+import threading
+import time
+
+
+class FakePoller:
+    def __init__(self, client, message):
+        self.client = client
+        self.message = message
+
+    def result(self, timeout=None):
+        with self.client.lock:
+            self.client.in_flight += 1
+            self.client.max_in_flight = max(self.client.max_in_flight, self.client.in_flight)
+        try:
+            time.sleep(self.client.delay)
+            if self.client.error:
+                raise self.client.error
+            return {"messageId": f"msg-{len(self.client.sent)}"}
+        finally:
+            with self.client.lock:
+                self.client.in_flight -= 1
+
+
+class FakeEmailClient:
+    """Stands in for azure.communication.email.EmailClient"""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.sent = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def begin_send(self, message):
+        self.sent.append(message)
+        return FakePoller(self, message)
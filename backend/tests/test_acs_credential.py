@@ -0,0 +1,110 @@
+"""
+Tests for the ACS client lifecycle: token caching and background refresh
+(with a stub credential) and client re-initialization after failures.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from app.config import settings
+from app.services.acs_credential import ACS_SCOPE, CachedTokenCredential
+from app.services.email_service import EmailService
+
+from fakes import FakeEmailClient
+
+AccessToken = namedtuple("AccessToken", ["token", "expires_on"])
+
+
+class StubCredential:
+    """Hands out numbered tokens valid for `lifetime` seconds, each fetch taking `delay`"""
+
+    def __init__(self, lifetime=3600, delay=0.0, failures=0):
+        self.lifetime = lifetime
+        self.delay = delay
+        self.failures = failures  # Fetches to fail after the first
+        self.fetches = 0
+        self.lock = threading.Lock()
+
+    def get_token(self, *scopes, **kwargs):
+        time.sleep(self.delay)
+        with self.lock:
+            self.fetches += 1
+            if self.fetches > 1 and self.failures:
+                self.failures -= 1
+                raise RuntimeError("identity endpoint unavailable")
+            return AccessToken(f"token-{self.fetches}", time.time() + self.lifetime)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_token_is_cached():
+    stub = StubCredential()
+    credential = CachedTokenCredential(stub, refresh_margin=60)
+    try:
+        tokens = {credential.get_token(ACS_SCOPE).token for _ in range(20)}
+        assert tokens == {"token-1"}
+        assert stub.fetches == 1
+    finally:
+        credential.close()
+
+
+def test_token_refreshed_in_background_without_blocking_callers():
+    stub = StubCredential(delay=0.2)
+    # Refresh 0.3s after each fetch
+    credential = CachedTokenCredential(stub, refresh_margin=3600 - 0.3)
+    try:
+        credential.prefetch()
+        _wait_for(lambda: stub.fetches == 1)
+        slowest = 0.0
+        deadline = time.monotonic() + 1.0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            credential.get_token(ACS_SCOPE)
+            slowest = max(slowest, time.perf_counter() - start)
+            time.sleep(0.005)
+        assert stub.fetches >= 2
+        assert credential.get_token(ACS_SCOPE).token != "token-1"
+        # Every call was served from the cache, never waiting on a 0.2s fetch
+        assert slowest < 0.05
+    finally:
+        credential.close()
+
+
+def test_failed_refresh_is_retried_with_old_token_still_served():
+    stub = StubCredential(failures=2)
+    credential = CachedTokenCredential(stub, refresh_margin=3600 - 0.05, retry_seconds=0.05)
+    try:
+        assert credential.get_token(ACS_SCOPE).token == "token-1"
+        _wait_for(lambda: stub.fetches >= 4)  # Two failures, then success
+        assert credential.get_token(ACS_SCOPE).token == "token-4"
+    finally:
+        credential.close()
+
+
+def test_client_init_is_retried_after_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_CLIENT_RETRY_SECONDS", 0.1)
+    attempts = []
+
+    def factory():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise RuntimeError("no managed identity yet")
+        return FakeEmailClient()
+
+    service = EmailService(client_factory=factory)
+    service.endpoint = "https://example.communication.azure.com"
+    service.sender_email = "noreply@example.com"
+
+    assert not service.is_configured()
+    assert not service.is_configured()  # Within the backoff: not retried
+    assert len(attempts) == 1
+
+    time.sleep(0.15)
+    assert service.is_configured()
+    assert len(attempts) == 2
@@ -0,0 +1,75 @@
+"""
+Tests for the analytics rollups and endpoint.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.services.analytics import estimate_percentile, rebuild_rollups
+
+
+def _create_ticket(client, title, **fields):
+    payload = {"title": title, "category": "vat", **fields}
+    response = client.post("/api/tickets/", json=payload)
+    assert response.status_code == 201
+    return response.json()
+
+
+def _analytics(client, **params):
+    response = client.get("/api/analytics", params=params)
+    assert response.status_code == 200
+    return response.json()["groups"]
+
+
+def test_rollups_follow_creates_updates_and_deletes(client):
+    first = _create_ticket(client, "A", priority="high", department="returns")
+    _create_ticket(client, "B", priority="high", department="returns")
+    doomed = _create_ticket(client, "C", category="income_tax")
+    _create_ticket(client, "D", category="income_tax", priority="low")
+
+    created_at = datetime.fromisoformat(first["created_at"].replace("Z", "+00:00"))
+    client.put(f"/api/tickets/{first['id']}", json={
+        "status": "resolved",
+        "resolved_at": (created_at + timedelta(minutes=90)).isoformat(),
+        "satisfaction_rating": 4,
+        "escalated": True,
+    })
+    client.delete(f"/api/tickets/{doomed['id']}")
+
+    groups = _analytics(client, group_by="category")
+    by_category = {group["category"]: group for group in groups}
+    assert by_category["income_tax"]["tickets"] == 1
+    vat = by_category["vat"]
+    assert (vat["tickets"], vat["resolved"], vat["escalated"], vat["rated"]) == (2, 1, 1, 1)
+    assert vat["avg_resolution_minutes"] == 90
+    assert 60 <= vat["p50_resolution_minutes"] <= 120
+    assert vat["avg_satisfaction"] == 4
+    assert vat["avg_response_minutes"] is None
+
+    # Filters and multi-dimension grouping
+    groups = _analytics(client, group_by=["department", "priority"], category="vat")
+    assert [(g["department"], g["priority"], g["tickets"]) for g in groups] == [("returns", "high", 2)]
+
+    today = datetime.now(timezone.utc).date()
+    assert _analytics(client, date_from=(today + timedelta(days=1)).isoformat()) == []
+    [total] = _analytics(client, date_to=today.isoformat())
+    assert total["tickets"] == 3
+
+    # A rebuild from the tickets table gives the same numbers
+    incremental = _analytics(client, group_by=["day", "category", "department", "priority"])
+    assert rebuild_rollups() == 3
+    assert _analytics(client, group_by=["day", "category", "department", "priority"]) == incremental
+
+
+def test_unknown_group_by_is_rejected(client):
+    response = client.get("/api/analytics", params={"group_by": "customer_email"})
+    assert response.status_code == 422
+
+
+def test_estimate_percentile_interpolates_within_bucket():
+    # Ten tickets in [60, 120) minutes, ten in [120, 240)
+    buckets = {4: 10, 5: 10}
+    assert estimate_percentile(buckets, 50) == 120
+    assert estimate_percentile(buckets, 25) == 90
+    assert estimate_percentile({}, 50) is None
+    # Open-ended last bucket reports its lower bound
+    assert estimate_percentile({15: 3}, 95) == 43200
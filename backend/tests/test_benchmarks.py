@@ -0,0 +1,57 @@
+"""
+Tests for the benchmark data generator and load runner.
+"""
+
+import httpx
+
+from app.database import engine
+from app.main import app
+from benchmarks.bench_api import SCENARIOS, compare, percentile, run_scenario
+from benchmarks.seed import generate_responses, generate_tickets, seed_database
+
+
+def test_generator_is_deterministic():
+    assert list(generate_tickets(50, seed=7)) == list(generate_tickets(50, seed=7))
+    assert list(generate_responses(50, seed=7)) == list(generate_responses(50, seed=7))
+    assert list(generate_tickets(50, seed=7)) != list(generate_tickets(50, seed=8))
+
+
+def test_scenarios_run_against_seeded_data(client, fake_email):
+    tickets, responses = seed_database(engine, 40)
+    assert tickets == 40
+    assert client.get("/api/tickets/1").json()["ticket_number"].startswith("TAX-2024-")
+
+    async def run_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            return {name: await run_scenario(http, name, tickets, requests=10, concurrency=2) for name in SCENARIOS}
+
+    results = client.portal.call(run_all)
+    for name, result in results.items():
+        assert result["requests"] == 10, name
+        assert result["errors"] == 0, name
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 95) == 3
+
+
+def test_compare_flags_regressions():
+    environment = {"tickets": 10000, "concurrency": 8, "database": "sqlite"}
+    baseline = {"environment": environment, "scenarios": {
+        "get": {"throughput_rps": 400.0, "p50_ms": 20.0, "p95_ms": 25.0, "errors": 0},
+    }}
+    same = {"environment": environment, "scenarios": {"get": dict(baseline["scenarios"]["get"])}}
+    slower = {"environment": environment, "scenarios": {
+        "get": {"throughput_rps": 250.0, "p50_ms": 20.0, "p95_ms": 40.0, "errors": 0},
+    }}
+
+    assert compare(same, baseline, tolerance=0.25) == []
+    problems = compare(slower, baseline, tolerance=0.25)
+    assert any("throughput" in problem for problem in problems)
+    assert any("p95_ms" in problem for problem in problems)
+    assert compare({**same, "environment": {**environment, "tickets": 100}}, baseline, 0.25)
@@ -0,0 +1,116 @@
+"""
+Tests for bulk ticket updates.
+"""
+
+from sqlalchemy import event
+
+from app.database import async_engine
+from app.services import analytics
+from app.services.ticket_counts import ticket_counter
+
+
+def _create_ticket(client, title, **fields):
+    payload = {"title": title, "category": "vat", **fields}
+    response = client.post("/api/tickets/", json=payload)
+    assert response.status_code == 201
+    return response.json()
+
+
+def _bulk_update(client, **body):
+    return client.post("/api/tickets/bulk-update", json=body)
+
+
+def test_bulk_close_by_ids(client):
+    first = _create_ticket(client, "A", department="returns")
+    second = _create_ticket(client, "B")
+    untouched = _create_ticket(client, "C")
+    client.get(f"/api/tickets/{first['id']}")  # Cached
+
+    response = _bulk_update(client, ticket_ids=[second["id"], first["id"], 999], changes={"status": "closed"})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["updated"] == 2
+    assert [ticket["id"] for ticket in result["tickets"]] == [first["id"], second["id"]]
+    assert all(ticket["status"] == "closed" for ticket in result["tickets"])
+
+    assert client.get(f"/api/tickets/{first['id']}").json()["status"] == "closed"
+    assert client.get(f"/api/tickets/{untouched['id']}").json()["status"] == "new"
+    assert ticket_counter.by_status() == {"new": 1, "closed": 2}
+    groups = client.get("/api/analytics", params={"group_by": "category"}).json()["groups"]
+    assert groups[0]["resolved"] == 2
+
+
+def test_bulk_assign_by_filter(client):
+    _create_ticket(client, "A", department="returns")
+    _create_ticket(client, "B", department="returns")
+    _create_ticket(client, "C", department="compliance")
+
+    result = _bulk_update(
+        client, filter={"department": "returns"}, changes={"assigned_to": "Ola", "department": "general"}
+    ).json()
+    assert [ticket["title"] for ticket in result["tickets"]] == ["A", "B"]
+
+    groups = client.get("/api/tickets/counts", params={"group_by": "assigned_to"}).json()["groups"]
+    assert {group["value"]: group["total"] for group in groups} == {"Ola": 2, None: 1}
+
+
+def test_untracked_changes_are_one_update(client):
+    tickets = [_create_ticket(client, f"Ticket {n}") for n in range(5)]
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        result = _bulk_update(client, ticket_ids=[t["id"] for t in tickets], changes={"notes": "Handled"}).json()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+
+    assert result["updated"] == 5
+    assert [statement.split()[0] for statement in statements] == ["UPDATE"]
+
+
+def test_bulk_update_validation(client):
+    assert _bulk_update(client, ticket_ids=[1], changes={}).status_code == 422
+    assert _bulk_update(client, changes={"status": "closed"}).status_code == 422
+    assert _bulk_update(client, ticket_ids=[1], changes={"status": "gone"}).status_code == 422
+
+
+def test_bulk_update_rejects_empty_filter(client):
+    """An empty filter would match every ticket"""
+    ticket = _create_ticket(client, "Untouched")
+
+    for empty in ({}, {"status": None}):
+        response = _bulk_update(client, filter=empty, changes={"status": "closed"})
+        assert response.status_code == 422
+        assert "filter must set at least one field" in response.text
+
+    assert client.get(f"/api/tickets/{ticket['id']}").json()["status"] == "new"
+
+
+def test_rollup_upserts_are_split_under_the_parameter_limit(client, monkeypatch):
+    """Each rollup row is 13 parameters; a bulk update touching many keys mustn't exceed the limit in one statement"""
+    categories = ["vat", "income_tax", "deductions", "payroll", "property_tax"]
+    for category in categories:
+        _create_ticket(client, category, category=category, department="returns")
+    monkeypatch.setattr(analytics, "MAX_BIND_PARAMETERS", 2 * 13)
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO ticket_daily_stats"):
+            statements.append(len(parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        result = _bulk_update(client, filter={"department": "returns"}, changes={"escalated": True}).json()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+
+    assert result["updated"] == 5
+    # 5 keys, 2 rows per statement
+    assert statements == [26, 26, 13]
+    groups = client.get("/api/analytics", params={"group_by": "category"}).json()["groups"]
+    assert sum(group["escalated"] for group in groups) == 5
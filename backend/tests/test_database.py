@@ -0,0 +1,46 @@
+"""
+Tests for database engine configuration.
+"""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect, text
+
+from app.config import settings
+from app.database import Base, async_engine, engine, prewarm_pool
+from app.main import app
+
+
+def test_sqlite_connections_use_pragma_profile(client):
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -65536
+
+
+def test_pool_stats_endpoint(client):
+    client.get("/api/tickets/")  # Check out (and return) an async connection
+
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    pools = response.json()["pools"]
+    for name in ("sync", "async"):
+        assert pools[name]["size"] == 10
+        assert pools[name]["max_overflow"] == 20
+        assert pools[name]["checked_out"] == 0
+    assert pools["async"]["checked_in"] >= 1
+
+
+def test_prewarm_pool_opens_connections(client):
+    client.portal.call(async_engine.dispose)
+    # Bounded, so a stuck connect fails the test instead of hanging it
+    assert client.portal.call(prewarm_pool, 3, 10) == 3
+    assert async_engine.sync_engine.pool.checkedin() == 3
+
+
+def test_migrations_run_in_lifespan(monkeypatch):
+    Base.metadata.drop_all(bind=engine)
+    monkeypatch.setattr(settings, "DB_MIGRATE_ON_STARTUP", True)
+    with TestClient(app) as test_client:
+        assert test_client.get("/api/tickets/").status_code == 200
+        test_client.portal.call(async_engine.dispose)
+    assert inspect(engine).has_table("tickets")
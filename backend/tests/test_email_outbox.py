@@ -0,0 +1,129 @@
+"""
+Tests for the transactional email outbox.
+"""
+
+from app.database import SessionLocal
+from app.models import EmailStatus, TicketResponse
+from app.services.email_outbox import EmailOutbox
+
+
+def _create_ticket_and_respond(client):
+    ticket = client.post("/api/tickets/", json={
+        "title": "Refund",
+        "category": "income_tax",
+        "customer_name": "Kari",
+        "customer_email": "kari@example.com",
+    }).json()
+    response = client.post(f"/api/tickets/{ticket['id']}/respond", json={
+        "response": "Your refund is on its way",
+        "customer_email": "kari@example.com",
+        "customer_name": "Kari",
+        "ticket_title": "Refund",
+    })
+    assert response.status_code == 201
+    assert response.json()["email_status"] == EmailStatus.PENDING
+    return ticket
+
+
+def test_outbox_sends_queued_confirmation_and_response(client, fake_email):
+    service, fake_client = fake_email
+    ticket = _create_ticket_and_respond(client)
+
+    outbox = EmailOutbox(email_service=service)
+    assert client.portal.call(outbox.process_batch) == 2
+
+    responses = client.get(f"/api/tickets/{ticket['id']}/responses").json()
+    assert {r["email_type"]: r["email_status"] for r in responses} == {
+        "confirmation": EmailStatus.SENT,
+        "response": EmailStatus.SENT,
+    }
+    assert len(fake_client.sent) == 2
+    assert client.get(f"/api/tickets/{ticket['id']}").json()["first_response_at"] is not None
+    # The first response shows up in the response-time analytics
+    [analytics] = client.get("/api/analytics").json()["groups"]
+    assert analytics["responded"] == 1
+
+    # Nothing left to claim
+    assert client.portal.call(outbox.process_batch) == 0
+
+
+def test_outbox_backs_off_then_gives_up(client, fake_email):
+    service, fake_client = fake_email
+    fake_client.error = ConnectionError("ACS unreachable")
+    ticket = _create_ticket_and_respond(client)
+
+    outbox = EmailOutbox(email_service=service, max_attempts=2)
+    assert client.portal.call(outbox.process_batch) == 2
+
+    responses = client.get(f"/api/tickets/{ticket['id']}/responses").json()
+    assert all(r["email_status"] == EmailStatus.PENDING and r["attempts"] == 1 for r in responses)
+
+    # Backoff: not due yet
+    assert client.portal.call(outbox.process_batch) == 0
+
+    # Make the retries due now; the second failure is final
+    with SessionLocal() as db:
+        db.query(TicketResponse).update({TicketResponse.next_attempt_at: None})
+        db.commit()
+    assert client.portal.call(outbox.process_batch) == 2
+
+    responses = client.get(f"/api/tickets/{ticket['id']}/responses").json()
+    assert all(r["email_status"] == EmailStatus.FAILED and r["attempts"] == 2 for r in responses)
+    assert len(fake_client.sent) == 4
+
+
+def test_bulk_respond_queues_rendered_emails_and_tracks_progress(client, fake_email):
+    service, fake_client = fake_email
+    for name in ("Kari", "Ola"):
+        client.post("/api/tickets/", json={
+            "title": f"{name}'s return",
+            "category": "vat",
+            "customer_name": name,
+            "customer_email": f"{name.lower()}@example.com",
+        })
+    client.post("/api/tickets/", json={"title": "No email", "category": "vat"})
+    client.post("/api/tickets/", json={"title": "Other", "category": "income_tax", "customer_email": "x@example.com"})
+
+    response = client.post("/api/tickets/bulk-respond", json={
+        "filter": {"category": "vat"},
+        "template": "Hi {customer_name}, the deadline for case #{ticket_id} has moved.",
+    })
+    assert response.status_code == 202
+    job = response.json()
+    assert (job["total"], job["skipped"], job["pending"], job["completed"]) == (2, 1, 2, False)
+
+    outbox = EmailOutbox(email_service=service, batch_size=50)
+    client.portal.call(outbox.process_batch)
+
+    job = client.get(f"/api/email-jobs/{job['id']}").json()
+    assert (job["sent"], job["pending"], job["completed"]) == (2, 0, True)
+    bodies = [m["content"]["plainText"] for m in fake_client.sent if "deadline" in m["content"]["plainText"]]
+    assert len(bodies) == 2
+    assert any("Hi Ola, the deadline for case #" in body for body in bodies)
+
+
+def test_bulk_respond_rejects_unknown_placeholder(client, fake_email):
+    response = client.post("/api/tickets/bulk-respond", json={
+        "ticket_ids": [1],
+        "template": "Hi {first_name}",
+    })
+    assert response.status_code == 422
+
+
+def test_bulk_respond_requires_a_filter_or_all(client, fake_email):
+    for customer in ("Kari", "Ola"):
+        client.post("/api/tickets/", json={
+            "title": "Deadline", "category": "vat", "customer_name": customer,
+            "customer_email": f"{customer.lower()}@example.com",
+        })
+
+    for body in ({"filter": {}}, {"filter": {"status": None}}, {"filter": {"status": "new"}, "all": True}):
+        response = client.post("/api/tickets/bulk-respond", json={**body, "template": "Hi {customer_name}"})
+        assert response.status_code == 422, body
+    assert "filter must set at least one field" in client.post(
+        "/api/tickets/bulk-respond", json={"filter": {}, "template": "Hi"}
+    ).text
+
+    job = client.post("/api/tickets/bulk-respond", json={"all": True, "template": "Hi {customer_name}"})
+    assert job.status_code == 202
+    assert job.json()["total"] == 2
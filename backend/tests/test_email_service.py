@@ -0,0 +1,132 @@
+"""
+Tests for the email service's non-blocking send path, using a fake ACS client.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+from app.models import EmailStatus
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.email_service import EmailService
+
+from fakes import FakeEmailClient
+
+
+def _service(client, **kwargs):
+    service = EmailService(client=client, **kwargs)
+    service.sender_email = "noreply@example.com"
+    return service
+
+
+def _send(service, ticket_id=1):
+    return service.send_ticket_response(
+        ticket_id=ticket_id,
+        ticket_title="Refund",
+        customer_email="kari@example.com",
+        customer_name="Kari",
+        response_text="Your refund is on its way",
+    )
+
+
+def test_send_returns_message_id_from_fake_client():
+    client = FakeEmailClient()
+    status, message_id, error = asyncio.run(_send(_service(client)))
+
+    assert status == EmailStatus.SENT
+    assert message_id == "msg-1"
+    assert error is None
+    assert client.sent[0]["recipients"]["to"][0]["address"] == "kari@example.com"
+
+
+def test_slow_send_does_not_block_event_loop_and_respects_cap():
+    client = FakeEmailClient(delay=0.2)
+    service = _service(client, max_concurrency=2)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        results = await asyncio.gather(*(_send(service, i) for i in range(4)))
+        task.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(scenario())
+    assert all(status == EmailStatus.SENT for status, _, _ in results)
+    assert client.max_in_flight == 2
+    # The loop kept running while sends were in flight
+    assert ticks > 10
+
+
+def test_send_times_out():
+    service = _service(FakeEmailClient(delay=0.5), send_timeout=0.05)
+    status, _, error = asyncio.run(_send(service))
+
+    assert status == EmailStatus.FAILED
+    assert "timed out" in error
+
+
+def test_circuit_opens_after_repeated_failures_and_fails_fast():
+    client = FakeEmailClient(error=ConnectionError("ACS unreachable"))
+    service = _service(client, circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    async def scenario():
+        return [await _send(service) for _ in range(4)]
+
+    results = asyncio.run(scenario())
+    assert all(status == EmailStatus.FAILED for status, _, _ in results)
+    assert len(client.sent) == 2
+    assert "circuit open" in results[-1][2]
+
+
+def test_client_errors_do_not_open_circuit():
+    error = ValueError("Invalid recipient")
+    error.status_code = 400
+    client = FakeEmailClient(error=error)
+    service = _service(client, circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+
+    async def scenario():
+        return [await _send(service) for _ in range(3)]
+
+    asyncio.run(scenario())
+    assert len(client.sent) == 3
+    assert service.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_html_body_escapes_customer_text():
+    client = FakeEmailClient()
+    service = _service(client)
+    asyncio.run(service.send_ticket_response(
+        ticket_id=1,
+        ticket_title="<b>Refund</b>",
+        customer_email="kari@example.com",
+        customer_name="Kari & Ola",
+        response_text="<script>alert(1)</script>",
+        sent_by="Agent",
+    ))
+
+    content = client.sent[0]["content"]
+    assert "<script>" not in content["html"]
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in content["html"]
+    assert "Kari &amp; Ola" in content["html"]
+    assert "<strong>Agent</strong>" in content["html"]
+    # Plain-text body is not escaped
+    assert "<script>alert(1)</script>" in content["plainText"]
+
+
+def test_app_import_does_not_load_azure_sdk():
+    """The Azure SDK is imported with the first email client, not at startup"""
+    code = "import sys, app.main; print(any(name.startswith('azure') for name in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, "DATABASE_URL": "sqlite://"}
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,80 @@
+"""
+Tests for the /metrics endpoint and the metric types behind it.
+"""
+
+import re
+
+from app.metrics import Registry
+from app.services.email_outbox import EmailOutbox
+
+
+def _sample(text, name, **labels):
+    """Value of one sample in a Prometheus exposition (None if absent)"""
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        match = re.fullmatch(r"([a-zA-Z_:][\w:]*)(?:\{(.*)\})? (\S+)", line)
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ""))
+        if match.group(1) == name and found == labels:
+            return float(match.group(3))
+    return None
+
+
+def test_histogram_exposition():
+    registry = Registry()
+    latency = registry.histogram("job_seconds", "Job latency", ("kind",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        latency.labels("import").observe(value)
+    text = registry.render()
+
+    assert "# TYPE job_seconds histogram" in text
+    assert _sample(text, "job_seconds_bucket", kind="import", le="0.1") == 1
+    assert _sample(text, "job_seconds_bucket", kind="import", le="1") == 2
+    assert _sample(text, "job_seconds_bucket", kind="import", le="+Inf") == 3
+    assert _sample(text, "job_seconds_count", kind="import") == 3
+    assert _sample(text, "job_seconds_sum", kind="import") == 5.55
+
+
+def test_requests_recorded_per_route_template(client):
+    route = "/api/tickets/{ticket_id}"
+    # Metrics are process-wide, so compare against a scrape taken first
+    before = client.get("/metrics").text
+
+    def delta(text, name, **labels):
+        return (_sample(text, name, **labels) or 0) - (_sample(before, name, **labels) or 0)
+
+    ticket = client.post("/api/tickets/", json={"title": "A", "category": "vat"}).json()
+    for _ in range(3):
+        client.get(f"/api/tickets/{ticket['id']}")
+    client.get("/api/tickets/999999")
+    client.get("/no-such-path")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    assert delta(text, "http_requests_total", method="GET", route=route, status="200") == 3
+    assert delta(text, "http_requests_total", method="GET", route=route, status="404") == 1
+    assert delta(text, "http_requests_total", method="GET", route="<unmatched>", status="404") == 1
+    assert delta(text, "http_request_duration_seconds_count", method="GET", route=route) == 4
+    # The first GET reads the ticket, the cached ones don't touch the database
+    assert delta(text, "http_request_sql_statements_sum", method="POST", route="/api/tickets/") >= 3
+    assert delta(text, "http_request_sql_statements_sum", method="GET", route=route) == 2
+    assert _sample(text, "http_requests_in_flight") == 1  # This scrape
+    assert delta(text, "db_pool_checkouts_total", engine="async") >= 1
+    assert _sample(text, "db_pool_connections", engine="async", state="checked_out") is not None
+
+
+def test_email_outcomes_and_backlog(client, fake_email):
+    service, fake_client = fake_email
+    client.post("/api/tickets/", json={"title": "A", "category": "vat", "customer_email": "kari@example.com"})
+    assert _sample(client.get("/metrics").text, "email_outbox_backlog") == 1
+
+    before = _sample(client.get("/metrics").text, "email_sends_total", status="sent") or 0
+    client.portal.call(EmailOutbox(email_service=service).process_batch)
+
+    text = client.get("/metrics").text
+    assert _sample(text, "email_sends_total", status="sent") == before + 1
+    assert _sample(text, "email_send_duration_seconds_count", status="sent") >= 1
+    assert _sample(text, "email_outbox_backlog") == 0
@@ -0,0 +1,76 @@
+"""
+Query plan tests: list queries must be served by an index in the
+requested order, never by a full scan followed by a sort.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select, tuple_
+
+from app.database import engine
+from app.models import Ticket, TicketResponse, TicketTombstone
+from app.routes.tickets import ticket_list_query
+from app.services.ticket_detail import ticket_detail_query
+
+
+def _query_plan(query):
+    """SQLite EXPLAIN QUERY PLAN details for a SQLAlchemy statement"""
+    compiled = query.compile(dialect=engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return [row[-1] for row in rows]
+
+
+def _assert_index_scan(query, index_name):
+    plan = _query_plan(query)
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    assert any(f"INDEX {index_name}" in step for step in plan), plan
+
+
+CURSOR = (datetime(2025, 1, 1, tzinfo=timezone.utc), 42)
+
+
+@pytest.mark.parametrize("filters, index_name", [
+    ({}, "ix_tickets_created_at_id"),
+    ({"status": "new"}, "ix_tickets_status_created_at_id"),
+    ({"category": "vat"}, "ix_tickets_category_created_at_id"),
+    ({"status": "new", "category": "vat"}, "ix_tickets_category_status_created_at_id"),
+])
+@pytest.mark.parametrize("after", [None, CURSOR])
+def test_ticket_list_uses_index_without_sort(client, filters, index_name, after):
+    _assert_index_scan(ticket_list_query(after=after, limit=101, **filters), index_name)
+
+
+def test_changes_queries_use_index_without_sort(client):
+    _assert_index_scan(
+        select(Ticket)
+        .where(tuple_(Ticket.updated_at, Ticket.id) > tuple_(*CURSOR))
+        .order_by(Ticket.updated_at, Ticket.id)
+        .limit(101),
+        "ix_tickets_updated_at_id",
+    )
+    _assert_index_scan(
+        select(TicketTombstone)
+        .where(tuple_(TicketTombstone.deleted_at, TicketTombstone.id) > tuple_(*CURSOR))
+        .order_by(TicketTombstone.deleted_at, TicketTombstone.id)
+        .limit(101),
+        "ix_ticket_tombstones_deleted_at_id",
+    )
+
+
+def test_ticket_responses_use_index_without_sort(client):
+    _assert_index_scan(
+        select(TicketResponse)
+        .where(TicketResponse.ticket_id == 1)
+        .order_by(TicketResponse.created_at.desc()),
+        "ix_ticket_responses_ticket_id_created_at_id",
+    )
+
+
+@pytest.mark.parametrize("after", [None, CURSOR])
+def test_ticket_detail_query_uses_response_index(client, after):
+    plan = _query_plan(ticket_detail_query(7, after=after, limit=20))
+    assert any("INDEX ix_ticket_responses_ticket_id_created_at_id" in step for step in plan), plan
+    assert not any("SCAN ticket_responses" in step and "INDEX" not in step for step in plan), plan
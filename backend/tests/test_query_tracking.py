@@ -0,0 +1,89 @@
+"""
+Tests for the per-request SQL instrumentation.
+"""
+
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine
+from app.query_tracking import (
+    BUDGET_ATTRIBUTE, QueryBudgetExceeded, query_budget, redact_parameters, report_queries,
+    statement_shape, track_queries,
+)
+from app.routes.tickets import get_ticket
+
+
+def test_statement_shape_collapses_parameter_lists():
+    assert statement_shape("SELECT *\n  FROM tickets WHERE id IN (?, ?, ?)") == "SELECT * FROM tickets WHERE id IN (?)"
+    assert statement_shape("SELECT * FROM tickets WHERE id IN ($1, $2)") == "SELECT * FROM tickets WHERE id IN (?)"
+
+
+def test_redact_parameters_hides_values():
+    assert redact_parameters(("jane@example.com", 3, None)) == "(<str>, <int>, NULL)"
+    assert redact_parameters({"email": "jane@example.com"}) == "{email: <str>}"
+    assert redact_parameters([("a",), ("b",)], executemany=True) == "<2 parameter sets>"
+
+
+def test_tracks_statements_and_time_per_scope(client):
+    with track_queries() as outer:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with track_queries() as inner:
+                conn.execute(text("SELECT 2"))
+    assert outer.statements == 1
+    assert inner.statements == 1
+    assert outer.seconds > 0
+
+
+def test_slow_queries_are_logged_without_parameters(client, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SQL_SLOW_QUERY_MS", 1e-6)
+    with caplog.at_level(logging.WARNING, logger="app.query_tracking"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :email"), {"email": "jane@example.com"})
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("Slow query" in message and "<str>" in message for message in messages)
+    assert not any("jane@example.com" in message for message in messages)
+
+
+def test_repeated_statements_are_flagged(client, caplog):
+    with track_queries() as stats:
+        with engine.connect() as conn:
+            for ticket_id in range(settings.SQL_REPEATED_STATEMENT_THRESHOLD):
+                conn.execute(text("SELECT * FROM tickets WHERE id = :id"), {"id": ticket_id})
+
+    with caplog.at_level(logging.WARNING, logger="app.query_tracking"):
+        report_queries(stats, "GET /test")
+    assert "N+1" in caplog.text
+    assert "SELECT * FROM tickets WHERE id = ?" in caplog.text
+
+
+def test_query_budget(monkeypatch, caplog):
+    @query_budget(1)
+    def endpoint():
+        pass
+
+    with track_queries() as stats:
+        pass
+    stats.statements = 2
+
+    with pytest.raises(QueryBudgetExceeded, match="over its budget of 1"):
+        report_queries(stats, "GET /test", endpoint)
+
+    monkeypatch.setattr(settings, "SQL_QUERY_BUDGET_ENFORCE", False)
+    with caplog.at_level(logging.WARNING, logger="app.query_tracking"):
+        report_queries(stats, "GET /test", endpoint)
+    assert "over its budget of 1" in caplog.text
+
+
+def test_route_over_budget_fails_the_request(client, monkeypatch):
+    ticket = client.post("/api/tickets/", json={
+        "title": "Budget", "category": "Tax", "customer_name": "A", "customer_email": "a@example.com"
+    }).json()
+
+    monkeypatch.setattr(get_ticket, BUDGET_ATTRIBUTE, 0)
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(f"/api/tickets/{ticket['id']}")  # Cache miss: one SELECT
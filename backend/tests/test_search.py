@@ -0,0 +1,74 @@
+"""
+Tests for full-text ticket search.
+"""
+
+from app.database import SessionLocal
+from app.models import EmailStatus, EmailType, TicketResponse
+
+
+def _create_ticket(client, title, **fields):
+    payload = {"title": title, "category": "vat", **fields}
+    response = client.post("/api/tickets/", json=payload)
+    assert response.status_code == 201
+    return response.json()
+
+
+def _search(client, q, **params):
+    response = client.get("/api/tickets/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _hit_ids(results):
+    return [hit["ticket"]["id"] for hit in results["hits"]]
+
+
+def test_search_ranks_title_matches_first_and_highlights(client):
+    in_description = _create_ticket(client, "Question", description="Where is my <b>refund</b>?")
+    in_title = _create_ticket(client, "Refund missing")
+    _create_ticket(client, "Address change")
+
+    results = _search(client, "refund")
+    assert _hit_ids(results) == [in_title["id"], in_description["id"]]
+    assert results["has_more"] is False
+    assert results["hits"][0]["rank"] > results["hits"][1]["rank"]
+    # Snippets are escaped HTML with the match marked
+    assert "&lt;b&gt;<mark>refund</mark>&lt;/b&gt;" in results["hits"][1]["snippet"]
+
+
+def test_search_matches_every_word_as_prefix(client):
+    both = _create_ticket(client, "VAT refund", description="Quarterly return")
+    _create_ticket(client, "VAT registration")
+
+    assert _hit_ids(_search(client, "vat refu")) == [both["id"]]
+    assert _search(client, '"*)(') == {"hits": [], "has_more": False}
+
+
+def test_search_index_follows_updates_deletes_and_responses(client):
+    ticket = _create_ticket(client, "Payroll question")
+    client.put(f"/api/tickets/{ticket['id']}", json={"title": "Pension question", "notes": "call back Friday"})
+
+    assert _hit_ids(_search(client, "payroll")) == []
+    assert _hit_ids(_search(client, "pension")) == [ticket["id"]]
+    assert _hit_ids(_search(client, "friday")) == [ticket["id"]]
+
+    with SessionLocal() as db:
+        db.add(TicketResponse(
+            ticket_id=ticket["id"], subject="Re", response_text="Your deduction was approved",
+            sent_to="kari@example.com", email_status=EmailStatus.SENT, email_type=EmailType.RESPONSE,
+        ))
+        db.commit()
+    assert _hit_ids(_search(client, "deduction")) == [ticket["id"]]
+
+    client.delete(f"/api/tickets/{ticket['id']}")
+    assert _hit_ids(_search(client, "pension")) == []
+
+
+def test_search_is_paginated(client):
+    ids = [_create_ticket(client, f"Refund {i}")["id"] for i in range(5)]
+
+    first = _search(client, "refund", limit=3)
+    second = _search(client, "refund", limit=3, offset=3)
+    assert first["has_more"] is True
+    assert second["has_more"] is False
+    assert sorted(_hit_ids(first) + _hit_ids(second)) == ids
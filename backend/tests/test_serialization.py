@@ -0,0 +1,49 @@
+"""
+The fast list serialization must match the response_model output byte for byte.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.schemas import TicketResponse
+from app.serialization import TICKET_FIELDS, FastJSONResponse, ticket_dicts
+
+_tickets = TypeAdapter(List[TicketResponse])
+
+
+def _response_model_body(rows) -> bytes:
+    """What FastAPI renders for response_model=List[TicketResponse]"""
+    content = _tickets.dump_python(_tickets.validate_python(ticket_dicts(rows)), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+@pytest.mark.parametrize("created_at", [
+    datetime(2025, 3, 1, 12, 0, 0),
+    datetime(2025, 3, 1, 12, 0, 0, 680000),
+    datetime(2025, 3, 1, 12, 0, 0, 1, tzinfo=timezone.utc),
+    datetime(2025, 3, 1, 12, 0, 0, tzinfo=timezone(timedelta(hours=2))),
+])
+def test_fast_json_matches_response_model(created_at):
+    values = {field: None for field in TICKET_FIELDS}
+    values.update(
+        id=7, title='Ærlig "sak" \\ </script> \x00\x1f\x7f  😀', category="vat", priority="low",
+        status="new", created_at=created_at, updated_at=created_at, tags=["vip", "ø"],
+        escalated=False, reopened_count=0, satisfaction_rating=5, description="line\nbreak\ttab",
+    )
+    rows = [tuple(values[field] for field in TICKET_FIELDS)]
+    assert FastJSONResponse(ticket_dicts(rows)).body == _response_model_body(rows)
+
+
+def test_list_endpoint_matches_response_model(client):
+    for n in range(3):
+        client.post("/api/tickets/", json={"title": f"Case {n}", "category": "vat", "tags": ["a"]})
+    created = [client.get(f"/api/tickets/{n}").json() for n in (3, 2, 1)]
+
+    response = client.get("/api/tickets/", params={"limit": 2})
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == created[:2]
+    assert "x-next-cursor" in response.headers
@@ -0,0 +1,94 @@
+"""
+Tests for the ticket payload cache.
+"""
+
+import time
+
+from app.database import SessionLocal
+from app.models import Ticket
+from app.services.ticket_cache import MemoryCacheBackend, TicketCache, ticket_cache
+
+
+def _create_ticket(client, title, **fields):
+    payload = {"title": title, "category": "vat", **fields}
+    response = client.post("/api/tickets/", json=payload)
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_get_ticket_is_served_from_cache(client):
+    created = client.post("/api/tickets/", json={
+        "title": "Cached ticket", "category": "vat", "description": "Ærlig talt – æøå"
+    })
+    ticket_id = created.json()["id"]
+    before = ticket_cache.stats()
+
+    first = client.get(f"/api/tickets/{ticket_id}")
+    second = client.get(f"/api/tickets/{ticket_id}")
+    assert first.status_code == second.status_code == 200
+    # Same bytes FastAPI produces when it serializes the model itself
+    assert first.content == second.content == created.content
+
+    stats = ticket_cache.stats()
+    assert stats["misses"] == before["misses"] + 1
+    assert stats["hits"] == before["hits"] + 1
+
+
+def test_out_of_band_writes_show_after_invalidation(client):
+    ticket = _create_ticket(client, "Before")
+    client.get(f"/api/tickets/{ticket['id']}")
+    with SessionLocal() as db:
+        db.get(Ticket, ticket["id"]).title = "Changed elsewhere"
+        db.commit()
+
+    assert client.get(f"/api/tickets/{ticket['id']}").json()["title"] == "Before"
+    ticket_cache.invalidate(ticket["id"])
+    assert client.get(f"/api/tickets/{ticket['id']}").json()["title"] == "Changed elsewhere"
+
+
+def test_writes_invalidate_cached_ticket(client):
+    ticket = _create_ticket(client, "Before")
+    client.get(f"/api/tickets/{ticket['id']}")
+
+    client.put(f"/api/tickets/{ticket['id']}", json={"title": "After"})
+    assert client.get(f"/api/tickets/{ticket['id']}").json()["title"] == "After"
+
+    client.delete(f"/api/tickets/{ticket['id']}")
+    assert client.get(f"/api/tickets/{ticket['id']}").status_code == 404
+
+
+def test_cache_counters_endpoint(client):
+    response = client.get("/health/cache")
+    assert response.status_code == 200
+    assert {"hits", "misses", "evictions", "expirations"} <= response.json()["tickets"].keys()
+
+
+def test_memory_backend_evicts_lru_and_expires():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("a", b"1", ttl=60)
+    backend.set("b", b"2", ttl=60)
+    assert backend.get("a") == b"1"  # "b" is now least recently used
+    backend.set("c", b"3", ttl=60)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1"
+    backend.set("d", b"4", ttl=0.01)
+    time.sleep(0.02)
+    assert backend.get("d") is None
+
+    stats = backend.stats()
+    assert stats["evictions"] == 2  # "b", then "c" for "d"
+    assert stats["expirations"] == 1
+
+
+def test_fill_that_raced_with_a_write_is_dropped():
+    cache = TicketCache(MemoryCacheBackend(10), ttl=60)
+    started_at = cache._current
+
+    # The ticket changes while the stale read is in flight
+    cache.invalidate(1)
+    cache._fill(1, b"stale", started_at)
+    assert cache.backend.get("ticket:1") is None
+
+    cache._fill(1, b"fresh", cache._current)
+    assert cache.backend.get("ticket:1") == b"fresh"
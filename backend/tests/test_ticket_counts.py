@@ -0,0 +1,77 @@
+"""
+Tests for the cached ticket counts.
+"""
+
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models import Ticket
+from app.services.ticket_counts import CountKey, ticket_counter
+
+
+def _create_ticket(client, title, **fields):
+    payload = {"title": title, "category": "vat", **fields}
+    response = client.post("/api/tickets/", json=payload)
+    assert response.status_code == 201
+    return response.json()
+
+
+def _counts(client, **params):
+    response = client.get("/api/tickets/counts", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_counts_follow_ticket_writes(client):
+    first = _create_ticket(client, "A", department="returns")
+    second = _create_ticket(client, "B")
+    third = _create_ticket(client, "C", category="income_tax")
+
+    client.put(f"/api/tickets/{first['id']}", json={"status": "in_progress"})
+    client.put(f"/api/tickets/{second['id']}", json={"title": "B2"})  # No count change
+    client.delete(f"/api/tickets/{third['id']}")
+
+    counts = _counts(client)
+    assert counts == {"total": 2, "by_status": {"new": 1, "in_progress": 1}, "groups": None}
+
+    groups = _counts(client, group_by="department")["groups"]
+    assert groups == [
+        {"value": "returns", "total": 1, "by_status": {"in_progress": 1}},
+        {"value": None, "total": 1, "by_status": {"new": 1}},
+    ]
+
+
+def test_reconcile_picks_up_writes_made_elsewhere(client):
+    _create_ticket(client, "A")
+    with SessionLocal() as db:
+        db.add(Ticket(title="Imported", category="vat", status="closed"))
+        db.commit()
+
+    assert _counts(client)["by_status"] == {"new": 1}
+    client.portal.call(ticket_counter.reconcile)
+    assert _counts(client)["by_status"] == {"new": 1, "closed": 1}
+
+
+def test_reconcile_keeps_changes_applied_while_it_runs(client, monkeypatch):
+    _create_ticket(client, "A")
+
+    class WriteDuringQuery:
+        """A session whose query is overtaken by a write committed in another request"""
+
+        async def __aenter__(self):
+            self.db = AsyncSessionLocal()
+            return self
+
+        async def __aexit__(self, *exc_info):
+            await self.db.close()
+
+        async def execute(self, statement):
+            result = await self.db.execute(statement)
+            ticket_counter.apply(None, CountKey("closed", "vat", None, None))
+            return result
+
+    monkeypatch.setattr(ticket_counter, "session_factory", WriteDuringQuery)
+    client.portal.call(ticket_counter.reconcile)
+    assert _counts(client)["by_status"] == {"new": 1, "closed": 1}
+
+
+def test_counts_reject_unknown_group(client):
+    assert client.get("/api/tickets/counts", params={"group_by": "title"}).status_code == 422
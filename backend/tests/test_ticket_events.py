@@ -0,0 +1,50 @@
+"""
+Tests for the ticket change event hub.
+"""
+
+import asyncio
+import threading
+
+from app.services.ticket_events import TicketEventHub, TICKET_UPDATED, SUBSCRIBER_EVICTED
+
+
+def test_publish_fans_out_to_every_subscriber():
+    async def scenario():
+        hub = TicketEventHub(queue_size=10)
+        first, second = hub.subscribe(), hub.subscribe()
+        hub.publish(TICKET_UPDATED, 7, fields=["status"])
+        return await first.get(), await second.get()
+
+    first_event, second_event = asyncio.run(scenario())
+    assert first_event == second_event
+    assert first_event["type"] == TICKET_UPDATED
+    assert first_event["ticket_id"] == 7
+    assert first_event["fields"] == ["status"]
+
+
+def test_publish_from_worker_thread_reaches_loop_subscriber():
+    async def scenario():
+        hub = TicketEventHub(queue_size=10)
+        subscriber = hub.subscribe()
+        thread = threading.Thread(target=hub.publish, args=(TICKET_UPDATED, 3))
+        thread.start()
+        thread.join()
+        return await asyncio.wait_for(subscriber.get(), timeout=1)
+
+    assert asyncio.run(scenario())["ticket_id"] == 3
+
+
+def test_slow_subscriber_is_evicted_without_blocking_producer():
+    async def scenario():
+        hub = TicketEventHub(queue_size=2)
+        slow, fast = hub.subscribe(), hub.subscribe()
+        for ticket_id in range(3):
+            hub.publish(TICKET_UPDATED, ticket_id)
+            await fast.get()
+        return hub, slow
+
+    hub, slow = asyncio.run(scenario())
+    assert slow.evicted
+    assert hub.subscriber_count == 1
+    assert slow.queue.qsize() == 1
+    assert slow.queue.get_nowait()["type"] == SUBSCRIBER_EVICTED
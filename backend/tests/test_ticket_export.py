@@ -0,0 +1,72 @@
+"""
+Tests for the streaming ticket export.
+"""
+
+import csv
+import io
+import json
+
+from app.config import settings
+
+
+def _create_ticket(client, title, **fields):
+    payload = {"title": title, "category": "vat", **fields}
+    response = client.post("/api/tickets/", json=payload)
+    assert response.status_code == 201
+    return response.json()
+
+
+def _respond(client, ticket, text):
+    response = client.post(f"/api/tickets/{ticket['id']}/respond", json={
+        "response": text,
+        "customer_email": "kari@example.com",
+        "customer_name": "Kari",
+        "ticket_title": ticket["title"],
+    })
+    assert response.status_code == 201
+
+
+def test_ndjson_export_nests_responses(client, monkeypatch, fake_email):
+    # Small batches so a ticket's responses span fetches
+    monkeypatch.setattr(settings, "TICKET_EXPORT_BATCH_SIZE", 2)
+    first = _create_ticket(client, "First", tags=["vip"])
+    second = _create_ticket(client, "Second", category="income_tax")
+    for n in range(3):
+        _respond(client, first, f"Reply {n}")
+
+    response = client.get("/api/tickets/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [line["id"] for line in lines] == [first["id"], second["id"]]
+    assert [r["response_text"] for r in lines[0]["responses"]] == ["Reply 0", "Reply 1", "Reply 2"]
+    assert lines[1]["responses"] == []
+    # Ticket fields match the regular API
+    assert {key: value for key, value in lines[1].items() if key != "responses"} == second
+
+
+def test_csv_export_has_a_line_per_response(client, fake_email):
+    first = _create_ticket(client, "First", tags=["vip", "urgent"])
+    _create_ticket(client, "Second", category="income_tax")
+    _respond(client, first, "Hello,\\nthere")
+    _respond(client, first, "Again")
+
+    response = client.get("/api/tickets/export", params={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["title"], row["response_response_text"]) for row in rows] == [
+        ("First", "Hello,\\nthere"), ("First", "Again"), ("Second", ""),
+    ]
+    assert rows[0]["tags"] == "vip,urgent"
+
+
+def test_export_filters(client):
+    _create_ticket(client, "First")
+    _create_ticket(client, "Second", category="income_tax")
+
+    response = client.get(
+        "/api/tickets/export", params={"category": "income_tax", "include_responses": "false", "format": "csv"}
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["title"] for row in rows] == ["Second"]
+    assert "response_id" not in rows[0]
@@ -0,0 +1,96 @@
+"""
+Tests for bulk ticket import.
+"""
+
+import json
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import EmailType, TicketResponse
+from app.services.ticket_counts import ticket_counter
+
+
+CSV = (
+    "title,category,priority,customer_email,tags,description\n"
+    "Refund,vat,high,kari@example.com,\"vip, urgent\",\n"
+    "Missing category,,low,,,\n"
+    "Deduction,income_tax,medium,,,\"Two lines,\nwith a comma\"\n"
+    "Bad priority,vat,someday,,,\n"
+)
+
+
+def _import(client, body, content_type, **params):
+    response = client.post(
+        "/api/tickets/import", content=body, headers={"Content-Type": content_type}, params=params
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_csv_import_reports_row_errors(client):
+    result = _import(client, CSV.encode("utf-8-sig"), "text/csv", send_confirmations="false")
+
+    assert result["imported"] == 2
+    assert result["failed"] == 2
+    assert [error["row"] for error in result["errors"]] == [3, 6]
+    assert "category" in result["errors"][0]["error"]
+    assert "priority" in result["errors"][1]["error"]
+
+    tickets = client.get("/api/tickets/").json()
+    by_title = {ticket["title"]: ticket for ticket in tickets}
+    assert by_title["Refund"]["tags"] == ["vip", "urgent"]
+    assert by_title["Refund"]["status"] == "new"
+    assert by_title["Deduction"]["description"] == "Two lines,\nwith a comma"
+
+    # Counts, analytics and search see the imported tickets
+    assert client.get("/api/tickets/counts").json()["by_status"] == {"new": 2}
+    groups = client.get("/api/analytics", params={"group_by": "category"}).json()["groups"]
+    assert {group["category"]: group["tickets"] for group in groups} == {"income_tax": 1, "vat": 1}
+    hits = client.get("/api/tickets/search", params={"q": "comma"}).json()["hits"]
+    assert [hit["ticket"]["title"] for hit in hits] == ["Deduction"]
+
+
+def test_csv_import_keeps_literal_quotes_in_unquoted_fields(client):
+    body = (
+        "title,category,description\n"
+        "5\" monitor,vat,Arrived broken\n"
+        "Quoted,vat,\"Says \"\"hi\"\"\nover two lines\"\n"
+        "Last,vat,\n"
+    )
+    result = _import(client, body.encode(), "text/csv", send_confirmations="false")
+
+    assert (result["imported"], result["failed"]) == (3, 0)
+    by_title = {ticket["title"]: ticket for ticket in client.get("/api/tickets/").json()}
+    assert by_title['5" monitor']["description"] == "Arrived broken"
+    assert by_title["Quoted"]["description"] == 'Says "hi"\nover two lines'
+    assert "Last" in by_title
+
+
+def test_ndjson_import_in_batches(client, monkeypatch):
+    monkeypatch.setattr(settings, "TICKET_IMPORT_BATCH_SIZE", 10)
+    lines = [json.dumps({"title": f"Case {n}", "category": "vat"}) for n in range(25)]
+    lines.insert(3, "not json")
+    lines.insert(7, "[1, 2]")
+    body = "\n".join(lines).encode()
+
+    result = _import(client, body, "application/x-ndjson")
+    assert result["imported"] == 25
+    assert [error["row"] for error in result["errors"]] == [4, 8]
+    assert ticket_counter.by_status() == {"new": 25}
+
+
+def test_import_queues_confirmations_unless_skipped(client, fake_email):
+    _import(client, CSV.encode(), "text/csv", format="csv", send_confirmations="false")
+    result = _import(client, CSV.encode(), "text/csv")
+    assert result["confirmations"] == 1
+
+    with SessionLocal() as db:
+        emails = db.query(TicketResponse).all()
+    assert [(email.email_type, email.sent_to) for email in emails] == [
+        (EmailType.CONFIRMATION, "kari@example.com")
+    ]
+
+
+def test_import_needs_a_known_format(client):
+    response = client.post("/api/tickets/import", content=b"{}", headers={"Content-Type": "application/json"})
+    assert response.status_code == 415
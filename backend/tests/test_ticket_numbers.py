@@ -0,0 +1,68 @@
+"""
+Tests for ticket number allocation.
+"""
+
+import asyncio
+
+from sqlalchemy import select, update
+
+from app.database import SessionLocal
+from app.migrations import init_db
+from app.models import Ticket, TicketNumberSequence, utcnow
+from app.services.ticket_numbers import TicketNumberAllocator
+
+
+def _create_ticket(client, title):
+    response = client.post("/api/tickets/", json={"title": title, "category": "vat"})
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_created_tickets_are_numbered(client):
+    year = utcnow().year
+    numbers = [_create_ticket(client, f"Ticket {n}")["ticket_number"] for n in range(3)]
+    assert numbers == [f"TAX-{year}-0001", f"TAX-{year}-0002", f"TAX-{year}-0003"]
+
+
+def test_allocators_never_hand_out_the_same_number(client):
+    """Separate allocators (as in separate processes) get disjoint blocks"""
+    allocators = [TicketNumberAllocator(block_size=5) for _ in range(3)]
+
+    async def scenario():
+        singles = [allocator.next_number(2025) for allocator in allocators for _ in range(20)]
+        batches = [allocator.allocate(12, 2025) for allocator in allocators]
+        results = await asyncio.gather(*singles, *batches)
+        return [results[i] for i in range(len(singles))] + [n for batch in results[len(singles):] for n in batch]
+
+    numbers = client.portal.call(scenario)
+    assert len(numbers) == len(set(numbers)) == 96
+    assert all(number.startswith("TAX-2025-") for number in numbers)
+
+    with SessionLocal() as db:
+        sequence = db.get(TicketNumberSequence, ("TAX", 2025))
+        # Every number handed out came from a reserved block
+        assert max(int(number.rsplit("-", 1)[1]) for number in numbers) < sequence.next_value
+
+
+def test_years_are_numbered_separately(client):
+    allocator = TicketNumberAllocator(block_size=10)
+
+    async def scenario():
+        return [await allocator.next_number(2024), await allocator.next_number(2025), await allocator.next_number(2024)]
+
+    assert client.portal.call(scenario) == ["TAX-2024-0001", "TAX-2025-0001", "TAX-2024-0002"]
+
+
+def test_migration_numbers_existing_tickets(client):
+    first, second = _create_ticket(client, "A"), _create_ticket(client, "B")
+    with SessionLocal() as db:
+        db.execute(update(Ticket).values(ticket_number=None))
+        db.commit()
+
+    init_db()
+
+    with SessionLocal() as db:
+        numbers = db.scalars(select(Ticket.ticket_number).order_by(Ticket.id)).all()
+    # Reserved after the numbers the API already handed out
+    assert len(set(numbers + [first["ticket_number"], second["ticket_number"]])) == 4
+    assert numbers[0] < numbers[1]
@@ -1,9 +1,9 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useNavigate } from 'react-router-dom'
 import KanbanColumn from './KanbanColumn'
 import TicketModal from './TicketModal'
 import PowerBIEmbed from './PowerBIEmbed'
-import { fetchTickets, createTicket, updateTicket, deleteTicket, sendResponse } from '../services/api'
+import { fetchTickets, fetchTicketCounts, getTicketDetail, createTicket, updateTicket, deleteTicket, sendResponse } from '../services/api'
 import './Dashboard.css'
 
 /**
@@ -12,6 +12,10 @@ import './Dashboard.css'
 function Dashboard() {
   const navigate = useNavigate();
   const [tickets, setTickets] = useState([])
+  const [nextCursor, setNextCursor] = useState(null) // Cursor for the next page (null: all loaded)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const loadingMoreRef = useRef(false) // Guards against overlapping page loads from scroll events
+  const [counts, setCounts] = useState(null) // Server-side totals (only the loaded pages are in `tickets`)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
   const [searchTerm, setSearchTerm] = useState('')
@@ -30,8 +34,13 @@ function Dashboard() {
     try {
       setLoading(true)
       setError(null)
-      const data = await fetchTickets()
-      setTickets(data)
+      const [page, ticketCounts] = await Promise.all([
+        fetchTickets(),
+        fetchTicketCounts().catch(() => null),
+      ])
+      setTickets(page.tickets)
+      setNextCursor(page.nextCursor)
+      setCounts(ticketCounts)
     } catch (err) {
       setError('Failed to load tickets. Make sure the backend is running.')
       console.error(err)
@@ -40,6 +49,27 @@ function Dashboard() {
     }
   }
 
+  // Load the next page of tickets (called when a column is scrolled to the bottom)
+  const loadMoreTickets = async () => {
+    if (!nextCursor || loadingMoreRef.current) return
+    loadingMoreRef.current = true
+    setLoadingMore(true)
+    try {
+      const page = await fetchTickets({ cursor: nextCursor })
+      setTickets(prev => {
+        // Tickets created here since the first page may show up again
+        const seen = new Set(prev.map(ticket => ticket.id))
+        return [...prev, ...page.tickets.filter(ticket => !seen.has(ticket.id))]
+      })
+      setNextCursor(page.nextCursor)
+    } catch (err) {
+      console.error('Failed to load more tickets', err)
+    } finally {
+      loadingMoreRef.current = false
+      setLoadingMore(false)
+    }
+  }
+
   const handleCreateTicket = async (ticketData) => {
     try {
       const newTicket = await createTicket(ticketData)
@@ -98,8 +128,9 @@ function Dashboard() {
       
       console.log('✅ Email sent successfully:', response);
       
-      // Reload tickets to get updated first_response_at timestamp
-      await loadTickets();
+      // Refresh this ticket only (e.g. first_response_at) - reloading would drop the pages scrolled in
+      const { responses, responses_next_cursor, ...updatedTicket } = await getTicketDetail(ticketId, { limit: 1 });
+      setTickets(prev => prev.map(ticket => (ticket.id === ticketId ? updatedTicket : ticket)));
       
       return response;
     } catch (error) {
@@ -252,7 +283,7 @@ function Dashboard() {
 
         <div className="stats-bar">
           <div className="stat">
-            <span className="stat-value">{tickets.length}</span>
+            <span className="stat-value">{counts ? counts.total : tickets.length}</span>
             <span className="stat-label">Total Tickets</span>
           </div>
           <div className="stat">
@@ -281,6 +312,9 @@ function Dashboard() {
             onEditTicket={handleEditTicket}
             onDeleteTicket={handleDeleteTicket}
             onRespond={handleRespond}
+            hasMore={Boolean(nextCursor)}
+            loadingMore={loadingMore}
+            onLoadMore={loadMoreTickets}
           />
           <KanbanColumn
             status="in_progress"
@@ -291,6 +325,9 @@ function Dashboard() {
             onEditTicket={handleEditTicket}
             onDeleteTicket={handleDeleteTicket}
             onRespond={handleRespond}
+            hasMore={Boolean(nextCursor)}
+            loadingMore={loadingMore}
+            onLoadMore={loadMoreTickets}
           />
           <KanbanColumn
             status="resolved"
@@ -301,6 +338,9 @@ function Dashboard() {
             onEditTicket={handleEditTicket}
             onDeleteTicket={handleDeleteTicket}
             onRespond={handleRespond}
+            hasMore={Boolean(nextCursor)}
+            loadingMore={loadingMore}
+            onLoadMore={loadMoreTickets}
           />
         </main>
       ) : (
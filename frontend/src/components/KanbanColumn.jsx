@@ -2,13 +2,20 @@ import { useState } from 'react';
 import TicketCard from './TicketCard';
 import './KanbanColumn.css';
 
+// Load the next page when scrolled within this distance of the bottom
+const LOAD_MORE_THRESHOLD_PX = 200;
+
 /**
  * KanbanColumn - A single column in the Kanban board
  * 
  * Displays tickets for a specific status (new, in_progress, done)
  * Handles drop events to update ticket status
+ * Asks for the next page of tickets when scrolled near the bottom
  */
-const KanbanColumn = ({ status, title, tickets, onUpdateTicket, onEditTicket, onDeleteTicket, onRespond, icon }) => {
+const KanbanColumn = ({
+  status, title, tickets, onUpdateTicket, onEditTicket, onDeleteTicket, onRespond, icon,
+  hasMore = false, loadingMore = false, onLoadMore,
+}) => {
   const [isDragOver, setIsDragOver] = useState(false);
 
   const handleDragOver = (e) => {
@@ -30,6 +37,13 @@ const KanbanColumn = ({ status, title, tickets, onUpdateTicket, onEditTicket, on
     }
   };
 
+  const handleScroll = (e) => {
+    const el = e.currentTarget;
+    if (hasMore && onLoadMore && el.scrollHeight - el.scrollTop - el.clientHeight < LOAD_MORE_THRESHOLD_PX) {
+      onLoadMore();
+    }
+  };
+
   const getStatusClass = (status) => {
     switch (status) {
       case 'new':
@@ -59,7 +73,7 @@ const KanbanColumn = ({ status, title, tickets, onUpdateTicket, onEditTicket, on
         <span className="column-count">{tickets.length}</span>
       </div>
 
-      <div className="column-content">
+      <div className="column-content" onScroll={handleScroll}>
         {tickets.length === 0 ? (
           <div className="empty-column">
             <p>No tickets</p>
@@ -76,6 +90,11 @@ const KanbanColumn = ({ status, title, tickets, onUpdateTicket, onEditTicket, on
             />
           ))
         )}
+        {hasMore && (
+          <button className="load-more" onClick={onLoadMore} disabled={loadingMore}>
+            {loadingMore ? 'Loading…' : 'Load more'}
+          </button>
+        )}
       </div>
     </div>
   );
@@ -14,23 +14,79 @@ console.log('🌐 API Base URL:', API_BASE_URL);
 console.log('📅 Build timestamp:', new Date().toISOString());
 
 /**
- * Fetch all tickets
+ * Fetch one page of tickets, newest first
+ *
+ * The list endpoint is cursor-paginated: pass the returned `nextCursor`
+ * back as `cursor` for the following page (the dashboard does this as the
+ * user scrolls). `nextCursor` is null on the last page.
  */
-export const fetchTickets = async () => {
+export const fetchTickets = async ({ cursor = null, limit = 100 } = {}) => {
   try {
-    const response = await fetch(`${API_BASE_URL}/tickets/`);
-    
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) params.set('cursor', cursor);
+
+    const response = await fetch(`${API_BASE_URL}/tickets/?${params}`);
+
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
-    
-    return await response.json();
+
+    return {
+      tickets: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+    };
   } catch (error) {
     console.error('❌ Error fetching tickets:', error);
     throw error;
   }
 };
 
+/**
+ * Full-text search over tickets (titles, descriptions, notes, responses)
+ *
+ * Returns { hits: [{ ticket, rank, snippet }], has_more }, best match first.
+ * `snippet` is escaped HTML with the matched words wrapped in <mark>.
+ */
+export const searchTickets = async (query, { limit = 20, offset = 0 } = {}) => {
+  try {
+    const params = new URLSearchParams({ q: query, limit: String(limit), offset: String(offset) });
+    const response = await fetch(`${API_BASE_URL}/tickets/search?${params}`);
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    return await response.json();
+  } catch (error) {
+    console.error('❌ Error searching tickets:', error);
+    throw error;
+  }
+};
+
+/**
+ * Ticket counts per status (cheap to poll - served from a server-side cache)
+ *
+ * Pass groupBy ('category', 'department' or 'assigned_to') to also get
+ * per-group counts in `groups`.
+ */
+export const fetchTicketCounts = async (groupBy = null) => {
+  try {
+    const params = new URLSearchParams();
+    if (groupBy) params.set('group_by', groupBy);
+
+    const response = await fetch(`${API_BASE_URL}/tickets/counts?${params}`);
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    return await response.json();
+  } catch (error) {
+    console.error('❌ Error fetching ticket counts:', error);
+    throw error;
+  }
+};
+
 /**
  * Create a new ticket
  */
@@ -124,6 +180,27 @@ export const sendResponse = async (ticketId, responseData) => {
   }
 };
 
+/**
+ * Get a ticket with its latest responses (newest first) in one request.
+ * Pass detail.responses_next_cursor as `cursor` to load older responses.
+ */
+export const getTicketDetail = async (ticketId, { limit = 20, cursor = null } = {}) => {
+  try {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`${API_BASE_URL}/tickets/${ticketId}/detail?${params}`);
+    
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    
+    return await response.json();
+  } catch (error) {
+    console.error('❌ Error fetching ticket detail:', error);
+    throw error;
+  }
+};
+
 /**
  * Get all responses for a ticket
  */